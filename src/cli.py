@@ -0,0 +1,309 @@
+"""
+GalTransl DumpInjector 命令行入口
+无界面的批量提取/注入，供构建服务器等环境使用
+
+用法:
+    python -m src.cli extract --mode regex --script 脚本目录 --json JSON目录 --message-regex 正则
+    python -m src.cli inject --mode vntext --script 脚本目录 --json 译文目录 --output 输出目录
+
+未在命令行指定的参数从配置目录（--config，默认config）中读取，
+不同的配置目录即不同的配置方案。结果以JSON输出到标准输出，
+工具输出与进度信息输出到标准错误。
+
+注意：本模块不得导入tkinter/ttkbootstrap或gui包。
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from . import __version__
+from .models.config import Config
+
+
+MODES = ("regex", "vntext", "msgtool")
+
+# 不写入结果的字段（工具输出已实时转发到标准错误）
+_EXCLUDED_FIELDS = {"stdout"}
+
+
+def to_jsonable(value: Any) -> Any:
+    """将处理结果（数据类、枚举等）转换为可JSON序列化的对象"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            f.name: to_jsonable(getattr(value, f.name))
+            for f in fields(value)
+            if f.name not in _EXCLUDED_FIELDS
+        }
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def _optional(value: Optional[str], *defaults: str) -> Optional[str]:
+    """空字符串或界面中的“自动”选项视为未指定"""
+    if not value or value in defaults:
+        return None
+    return value
+
+
+def _pick(value: Any, fallback: Any) -> Any:
+    """命令行参数未指定时使用配置值"""
+    return fallback if value is None else value
+
+
+def _stderr_line(text: str):
+    """输出一行到标准错误"""
+    print(text, file=sys.stderr, flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="GalTransl DumpInjector 命令行批量提取/注入"
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--mode", choices=MODES, required=True, help="处理模式")
+    common.add_argument("--config", default="config", help="配置目录（默认: config）")
+    common.add_argument("--script", help="日文脚本目录")
+    common.add_argument("--engine", help="VNTextPatch/msg-tool引擎（默认自动判断）")
+    common.add_argument("--encoding", help="脚本编码（regex: 日文脚本编码；msgtool: 文件编码）")
+    common.add_argument("--tool-dir", help="VNTextPatch/msg-tool工具目录")
+    common.add_argument("--parallel", action="store_true", help="regex模式使用多进程并行处理")
+    common.add_argument("--workers", type=int, help="并行进程数或最大并发进程数")
+    common.add_argument("--shards", type=int, default=1, help="外部工具的分片数（默认: 1）")
+    common.add_argument("--incremental", dest="incremental", action="store_true", default=None,
+                        help="保存增量清单并跳过未修改的脚本（regex模式）")
+    common.add_argument("--no-incremental", dest="incremental", action="store_false",
+                        help="不使用增量清单，重新处理全部脚本（regex模式）")
+    common.add_argument("--message-regex", help="正文正则表达式（regex模式）")
+    common.add_argument("--name-regex", help="人名正则表达式（regex模式）")
+    common.add_argument("--quiet", action="store_true", help="不输出工具日志")
+    common.add_argument("--progress", action="store_true", help="在标准错误输出进度")
+    common.add_argument("--indent", type=int, default=None, help="结果JSON的缩进")
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    extract = subparsers.add_parser("extract", parents=[common], help="提取脚本文本到JSON")
+    extract.add_argument("--json", help="JSON保存目录")
+    extract.add_argument("--emit-spans", action="store_true", help="保存位置索引（regex模式）")
+    extract.add_argument("--bytes-mode", action="store_true",
+                         help="按脚本编码的字节直接匹配，只解码捕获的文本（regex模式）")
+    
+    inject = subparsers.add_parser("inject", parents=[common], help="注入JSON文本回脚本")
+    inject.add_argument("--json", help="译文JSON目录")
+    inject.add_argument("--json-jp", help="日文JSON目录（regex模式）")
+    inject.add_argument("--output", help="输出脚本目录")
+    inject.add_argument("--cn-encoding", help="中文脚本编码（regex模式）")
+    inject.add_argument("--patched-encoding", help="注入编码（msgtool模式）")
+    inject.add_argument("--gbk", action="store_true", default=None, help="使用GBK编码注入（vntext模式）")
+    inject.add_argument("--sjis-replace", dest="sjis_replacement", action="store_true", default=None,
+                        help="启用SJIS替换")
+    inject.add_argument("--no-sjis-replace", dest="sjis_replacement", action="store_false",
+                        help="禁用SJIS替换")
+    inject.add_argument("--sjis-chars", help="SJIS替换字符")
+    inject.add_argument("--sjis-incremental", dest="sjis_incremental", action="store_true", default=None,
+                        help="生成_replaced文件夹时只重写变化的JSON文件")
+    inject.add_argument("--no-sjis-incremental", dest="sjis_incremental", action="store_false",
+                        help="每次重新生成整个_replaced文件夹")
+    inject.add_argument("--sjis-parallel", dest="sjis_parallel", action="store_true", default=None,
+                        help="生成_replaced文件夹时使用多进程并行处理")
+    inject.add_argument("--no-sjis-parallel", dest="sjis_parallel", action="store_false",
+                        help="生成_replaced文件夹时逐个处理")
+    inject.add_argument("--sjis-folder", dest="sjis_in_memory", action="store_false",
+                        help="SJIS替换生成_replaced文件夹，而不是在内存中完成（regex模式）")
+    inject.add_argument("--use-spans", action="store_true", help="使用位置索引注入（regex模式）")
+    inject.add_argument("--positional", action="store_true", help="按顺序逐条对应译文（regex模式）")
+    inject.add_argument("--remove-stale", action="store_true",
+                        help="增量注入时删除源脚本已不存在的输出文件（regex模式）")
+    
+    return parser
+
+
+def _run_regex(args: argparse.Namespace, config: Config, output_callback, progress_callback):
+    """正则表达式模式"""
+    from .core.regex_processor import RegexProcessor
+    
+    processor = RegexProcessor()
+    message_regex = _pick(args.message_regex, config.message_regex)
+    name_regex = _optional(_pick(args.name_regex, config.name_regex))
+    encoding = _pick(args.encoding, config.japanese_encoding)
+    incremental = _pick(args.incremental, config.regex_incremental)
+    
+    if args.command == "extract":
+        return processor.extract_with_regex(
+            _pick(args.script, config.script_jp_folder),
+            _pick(args.json, config.json_jp_folder),
+            message_regex, name_regex, encoding, output_callback,
+            parallel=args.parallel,
+            max_workers=args.workers,
+            emit_spans=args.emit_spans,
+            progress_callback=progress_callback,
+            incremental=incremental,
+            bytes_mode=args.bytes_mode
+        )
+    
+    return processor.inject_with_regex(
+        _pick(args.script, config.script_jp_folder),
+        _pick(args.json_jp, config.json_jp_folder),
+        _pick(args.json, config.json_cn_folder),
+        _pick(args.output, config.script_cn_folder),
+        message_regex, name_regex, encoding,
+        _pick(args.cn_encoding, config.chinese_encoding),
+        _pick(args.sjis_replacement, config.sjis_replacement),
+        args.sjis_chars or "",
+        output_callback,
+        parallel=args.parallel,
+        max_workers=args.workers,
+        use_spans=args.use_spans,
+        positional=args.positional,
+        progress_callback=progress_callback,
+        sjis_in_memory=args.sjis_in_memory,
+        incremental=incremental,
+        remove_stale_outputs=args.remove_stale,
+        sjis_incremental=_pick(args.sjis_incremental, config.sjis_incremental),
+        sjis_parallel=_pick(args.sjis_parallel, config.sjis_parallel)
+    )
+
+
+def _run_vntext(args: argparse.Namespace, config: Config, output_callback, progress_callback):
+    """VNTextPatch模式"""
+    from .core.vntext_processor import VNTextProcessor
+    
+    processor = VNTextProcessor(args.tool_dir) if args.tool_dir else VNTextProcessor()
+    engine = _optional(args.engine, "自动判断")
+    
+    if args.command == "extract":
+        return processor.extract_text(
+            _pick(args.script, config.script_jp_folder),
+            _pick(args.json, config.json_jp_folder),
+            engine, output_callback,
+            shards=args.shards,
+            max_concurrency=args.workers,
+            progress_callback=progress_callback
+        )
+    
+    return processor.inject_text(
+        _pick(args.script, config.script_jp_folder),
+        _pick(args.json, config.json_cn_folder),
+        _pick(args.output, config.script_cn_folder),
+        engine,
+        _pick(args.gbk, config.gbk_encoding),
+        _pick(args.sjis_replacement, config.sjis_replacement),
+        args.sjis_chars or "",
+        output_callback,
+        shards=args.shards,
+        max_concurrency=args.workers,
+        progress_callback=progress_callback,
+        sjis_incremental=_pick(args.sjis_incremental, config.sjis_incremental),
+        sjis_parallel=_pick(args.sjis_parallel, config.sjis_parallel)
+    )
+
+
+def _run_msgtool(args: argparse.Namespace, config: Config, output_callback, progress_callback):
+    """msg-tool模式"""
+    from .core.msgtool_processor import MsgToolProcessor
+    
+    processor = MsgToolProcessor(args.tool_dir) if args.tool_dir else MsgToolProcessor()
+    engine = _optional(_pick(args.engine, config.msgtool_selected_engine), "自动检测")
+    encoding = _optional(_pick(args.encoding, config.msgtool_encoding), "默认编码")
+    
+    if args.command == "extract":
+        return processor.extract_text(
+            _pick(args.script, config.msgtool_script_jp_folder),
+            _pick(args.json, config.msgtool_json_jp_folder),
+            engine, encoding, output_callback,
+            shards=args.shards,
+            max_concurrency=args.workers,
+            progress_callback=progress_callback
+        )
+    
+    return processor.inject_text(
+        _pick(args.script, config.msgtool_script_jp_folder),
+        _pick(args.json, config.msgtool_json_cn_folder),
+        _pick(args.output, config.msgtool_script_cn_folder),
+        engine, encoding,
+        _optional(_pick(args.patched_encoding, config.msgtool_patched_encoding), "默认编码"),
+        _pick(args.sjis_replacement, config.msgtool_sjis_replacement),
+        _pick(args.sjis_chars, config.msgtool_sjis_chars),
+        output_callback,
+        shards=args.shards,
+        max_concurrency=args.workers,
+        progress_callback=progress_callback,
+        sjis_incremental=_pick(args.sjis_incremental, config.sjis_incremental),
+        sjis_parallel=_pick(args.sjis_parallel, config.sjis_parallel)
+    )
+
+
+_RUNNERS: Dict[str, Callable] = {
+    "regex": _run_regex,
+    "vntext": _run_vntext,
+    "msgtool": _run_msgtool,
+}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """执行命令并返回结果字典
+    
+    Returns:
+        Dict[str, Any]: 包含command、mode、success、message、timings与result的结果
+    """
+    start_time = time.perf_counter()
+    config = Config(args.config)
+    
+    output_callback = None if args.quiet else _stderr_line
+    progress_callback = None
+    if args.progress:
+        progress_callback = lambda event: _stderr_line(f"[{event.percent:5.1f}%] {event.format()}")
+    
+    runner_start = time.perf_counter()
+    try:
+        result = _RUNNERS[args.mode](args, config, output_callback, progress_callback)
+        success = bool(result.success)
+        message = result.message
+        payload = to_jsonable(result)
+    except Exception as e:
+        success = False
+        message = f"执行异常: {str(e)}"
+        payload = None
+    end_time = time.perf_counter()
+    
+    return {
+        "command": args.command,
+        "mode": args.mode,
+        "success": success,
+        "message": message,
+        "timings": {
+            "startup": runner_start - start_time,
+            "run": end_time - runner_start,
+            "total": end_time - start_time,
+        },
+        "result": payload,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行主函数
+    
+    Returns:
+        int: 退出码（0成功，1失败，2参数错误）
+    """
+    args = build_parser().parse_args(argv)
+    report = run(args)
+    print(json.dumps(report, ensure_ascii=False, indent=args.indent))
+    return 0 if report["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
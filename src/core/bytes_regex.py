@@ -0,0 +1,252 @@
+"""
+字节级正则匹配
+将正则表达式转换为脚本编码下的字节模式，直接在文件映射上匹配，只解码捕获的文本
+"""
+
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from ..models.translation_data import TranslationData
+from ..utils.mapped_file import MappedFile
+from .message_scanner import iter_messages
+
+
+# 需要检查匹配位置是否落在字符边界上的多字节编码（标准化后的编解码器名称）
+MULTIBYTE_ENCODINGS = {
+    'shift_jis', 'cp932', 'shift_jis_2004', 'shift_jisx0213',
+    'gbk', 'gb2312', 'gb18030', 'cp936',
+    'big5', 'big5hkscs', 'cp950',
+    'euc_jp', 'euc_jis_2004', 'euc_jisx0213', 'euc_kr', 'cp949',
+}
+
+# 不需要边界检查的编码（UTF-8可自同步，单字节编码没有边界问题）
+SELF_SYNCHRONIZING_ENCODINGS = {'utf-8', 'ascii', 'latin-1', 'iso8859-1', 'cp1252'}
+
+# 字节模式下语义与文本模式不同的转义
+_UNSUPPORTED_ESCAPES = set("wWsSdDbBuUNpP")
+_INLINE_FLAG_CHARS = set("aiLmsux-")
+_SUPPORTED_FLAGS = re.MULTILINE | re.DOTALL | re.UNICODE
+
+
+def translate_pattern(pattern: str, encoding: str, dotall: bool = False) -> bytes:
+    """将正则表达式文本转换为指定编码下的字节正则表达式
+    
+    ASCII部分原样保留，非ASCII字面字符按编码转换为字节序列（作为整体分组，
+    使量词作用于整个字符）。文本模式读取时\\r\\n与\\r都被统一为\\n，因此非DOTALL的.
+    转换为[^\\r\\n]。语义会改变的写法（\\w、\\d、\\b等Unicode类、字符类中的
+    非ASCII字符、不带*或+的.、内联标志）不支持。
+    
+    Raises:
+        ValueError: 表达式无法按字节匹配
+    """
+    out = []
+    in_class = False
+    class_start = 0
+    i = 0
+    n = len(pattern)
+    
+    while i < n:
+        c = pattern[i]
+        
+        if c == '\\':
+            if i + 1 >= n:
+                raise ValueError("正则表达式以反斜杠结尾")
+            nxt = pattern[i + 1]
+            if nxt in _UNSUPPORTED_ESCAPES:
+                raise ValueError(f"字节模式不支持 \\{nxt}")
+            if nxt == 'x':
+                code = pattern[i + 2:i + 4]
+                if len(code) != 2 or int(code, 16) >= 0x80:
+                    raise ValueError("字节模式只支持ASCII范围的\\x转义")
+            if ord(nxt) >= 0x80:
+                if in_class:
+                    raise ValueError("字节模式不支持字符类中的非ASCII字符")
+                out.append(_escape_encoded(nxt, encoding))
+            else:
+                out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        
+        if ord(c) >= 0x80:
+            if in_class:
+                raise ValueError("字节模式不支持字符类中的非ASCII字符")
+            out.append(_escape_encoded(c, encoding))
+        elif in_class:
+            # 紧跟[或[^的]是字面字符
+            if c == ']' and i > class_start:
+                in_class = False
+            out.append(c)
+        elif c == '[':
+            in_class = True
+            class_start = i + 1
+            if pattern.startswith('^', class_start):
+                out.append('[^')
+                class_start += 1
+                i += 2
+                continue
+            out.append(c)
+        elif c == '.':
+            # 单个.在字节模式下只匹配一个字节，只允许 .* .+ 形式
+            if not pattern.startswith(('*', '+'), i + 1):
+                raise ValueError("字节模式只支持 .* 或 .+ 形式的任意字符匹配")
+            out.append(c if dotall else r'[^\r\n]')
+        elif c == '(' and pattern.startswith('?', i + 1) and i + 2 < n and pattern[i + 2] in _INLINE_FLAG_CHARS:
+            raise ValueError("字节模式不支持内联标志")
+        else:
+            out.append(c)
+        i += 1
+    
+    if in_class:
+        raise ValueError("字符类未闭合")
+    
+    return "".join(out).encode('ascii')
+
+
+def _escape_encoded(char: str, encoding: str) -> str:
+    """将非ASCII字符转换为编码后的字节转义序列"""
+    try:
+        data = char.encode(encoding)
+    except UnicodeEncodeError:
+        raise ValueError(f"字符 {char} 无法用 {encoding} 编码")
+    return "(?:" + "".join(f"\\x{b:02x}" for b in data) + ")"
+
+
+def _is_newline_sensitive(pattern: str, flags: int) -> bool:
+    """表达式的匹配结果是否可能受换行符（\\r\\n在文本模式下为一个字符）影响"""
+    return (
+        bool(flags & re.DOTALL)
+        or bool(flags & re.MULTILINE and '^' in pattern)
+        or any(token in pattern for token in ('$', '{', '\n', '\r', '\\n', '\\r'))
+    )
+
+
+@dataclass
+class BytesRegex:
+    """按字节匹配的消息/人名正则表达式（可在子进程间传递）"""
+    message_regex: re.Pattern
+    name_regex: Optional[re.Pattern]
+    encoding: str
+    check_alignment: bool
+    newline_sensitive: bool
+    
+    # 向前查找边界锚点的初始窗口
+    ALIGNMENT_WINDOW = 256
+    
+    @classmethod
+    def compile(
+        cls,
+        message_regex: re.Pattern,
+        name_regex: Optional[re.Pattern],
+        encoding: str
+    ) -> 'BytesRegex':
+        """将文本正则表达式转换为字节正则表达式
+        
+        Raises:
+            ValueError: 编码或表达式不支持字节匹配
+        """
+        try:
+            codec_name = codecs.lookup(encoding).name
+        except LookupError:
+            raise ValueError(f"未知的编码: {encoding}")
+        if codec_name not in MULTIBYTE_ENCODINGS and codec_name not in SELF_SYNCHRONIZING_ENCODINGS:
+            raise ValueError(f"字节模式不支持编码 {encoding}")
+        
+        newline_sensitive = False
+        compiled = []
+        for regex in (message_regex, name_regex):
+            if regex is None:
+                compiled.append(None)
+                continue
+            if regex.flags & ~_SUPPORTED_FLAGS:
+                raise ValueError("字节模式不支持忽略大小写等标志")
+            compiled.append(re.compile(
+                translate_pattern(regex.pattern, encoding, bool(regex.flags & re.DOTALL)),
+                regex.flags & (re.MULTILINE | re.DOTALL)
+            ))
+            newline_sensitive = newline_sensitive or _is_newline_sensitive(regex.pattern, regex.flags)
+        
+        return cls(
+            message_regex=compiled[0],
+            name_regex=compiled[1],
+            encoding=codec_name,
+            check_alignment=codec_name in MULTIBYTE_ENCODINGS,
+            newline_sensitive=newline_sensitive
+        )
+    
+    def extract_file(self, file_path: str) -> Optional[TranslationData]:
+        """按字节匹配提取文件
+        
+        Returns:
+            Optional[TranslationData]: 翻译数据；匹配位置不在字符边界上，或换行符可能影响
+                匹配结果时返回None，应改用文本模式
+        """
+        with MappedFile(file_path) as mapped:
+            return self.extract(mapped.buffer)
+    
+    def extract(self, buf) -> Optional[TranslationData]:
+        """从字节缓冲区提取文本，参见extract_file"""
+        if self.newline_sensitive and buf.find(b'\r') != -1:
+            return None
+        
+        translation_data = TranslationData()
+        
+        for message_match, name_match in iter_messages(buf, self.message_regex, self.name_regex):
+            if not self._match_aligned(buf, message_match):
+                return None
+            
+            name = None
+            if name_match:
+                if not self._match_aligned(buf, name_match):
+                    return None
+                name = self._decode(name_match.group(1))
+            
+            translation_data.add_entry(self._decode(message_match.group(1)), name if name else None)
+        
+        return translation_data
+    
+    def _decode(self, data: Optional[bytes]) -> Optional[str]:
+        """解码捕获的文本（与文本模式读取一致：忽略无效字节并统一换行符）"""
+        if data is None:
+            return None
+        text = data.decode(self.encoding, errors='ignore')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def _match_aligned(self, buf, match: re.Match) -> bool:
+        """检查匹配与第一个捕获组的边界是否都落在字符边界上"""
+        if not self.check_alignment:
+            return True
+        positions = {*match.span(), *match.span(1)}
+        return all(self._is_aligned(buf, pos) for pos in positions if pos >= 0)
+    
+    def _is_aligned(self, buf, pos: int) -> bool:
+        """检查位置是否位于字符边界
+        
+        从pos向前找到不可能是多字节字符后续字节的锚点（0x00-0x2F），
+        从锚点之后解码到pos，没有残留的未完成字节即为字符边界。
+        """
+        if pos == 0:
+            return True
+        
+        window = self.ALIGNMENT_WINDOW
+        while True:
+            begin = max(0, pos - window)
+            reversed_segment = buf[begin:pos][::-1]
+            found = _ANCHOR_PATTERN.search(reversed_segment)
+            if found:
+                anchor = pos - found.start()
+                break
+            if begin == 0:
+                anchor = 0
+                break
+            window *= 2
+        
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='ignore')
+        decoder.decode(buf[anchor:pos], final=False)
+        return not decoder.getstate()[0]
+
+
+_ANCHOR_PATTERN = re.compile(rb'[\x00-\x2f]')
@@ -163,6 +163,56 @@ class FileOperations:
         except Exception as e:
             raise RuntimeError(f"查找文件失败 {directory}: {e}")
     
+    @staticmethod
+    def link_file(src_path: str, dst_path: str, create_dirs: bool = True) -> str:
+        """为文件创建链接（优先硬链接，其次符号链接，均不可用时复制）
+        
+        Returns:
+            str: 实际使用的方式（"hardlink"、"symlink"或"copy"）
+        """
+        try:
+            if create_dirs:
+                dst_dir = os.path.dirname(dst_path)
+                if dst_dir:
+                    FileOperations.ensure_dir_exists(dst_dir)
+            
+            try:
+                os.link(src_path, dst_path)
+                return "hardlink"
+            except OSError:
+                pass
+            
+            try:
+                os.symlink(os.path.abspath(src_path), dst_path)
+                return "symlink"
+            except OSError:
+                pass
+            
+            shutil.copy2(src_path, dst_path)
+            return "copy"
+        except Exception as e:
+            raise RuntimeError(f"链接文件失败 {src_path} -> {dst_path}: {e}")
+    
+    @staticmethod
+    def partition_files_by_size(files: List[str], shard_count: int) -> List[List[str]]:
+        """按文件总大小将文件均衡划分为多个分片（不返回空分片）"""
+        shard_count = max(1, min(shard_count, len(files)))
+        shards: List[List[str]] = [[] for _ in range(shard_count)]
+        shard_sizes = [0] * shard_count
+        
+        # 从大到小依次放入当前总大小最小的分片
+        sized_files = sorted(
+            ((FileOperations.get_file_size(f), f) for f in files),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        for size, file_path in sized_files:
+            index = shard_sizes.index(min(shard_sizes))
+            shards[index].append(file_path)
+            shard_sizes[index] += size
+        
+        return [shard for shard in shards if shard]
+    
     @staticmethod
     def safe_filename(filename: str) -> str:
         """生成安全的文件名"""
@@ -318,6 +368,13 @@ class TempFileManager:
         except Exception as e:
             raise RuntimeError(f"创建临时目录失败: {e}")
     
+    def keep(self, path: str):
+        """保留指定的临时文件或目录，清理时不删除"""
+        if path in self.temp_files:
+            self.temp_files.remove(path)
+        if path in self.temp_dirs:
+            self.temp_dirs.remove(path)
+    
     def cleanup(self):
         """清理所有临时文件和目录"""
         # 清理临时文件
@@ -0,0 +1,32 @@
+"""
+正文与人名扫描
+按顺序逐条生成正文匹配及其前面的人名匹配，供文本匹配与字节匹配共用
+"""
+
+import re
+from typing import AnyStr, Iterator, Optional, Tuple
+
+
+def iter_messages(
+    content: AnyStr,
+    message_regex: re.Pattern,
+    name_regex: Optional[re.Pattern] = None
+) -> Iterator[Tuple[re.Match, Optional[re.Match]]]:
+    """按顺序生成 (正文匹配, 人名匹配)
+
+    人名是上一条正文之后、本条正文捕获组之前的第一个人名匹配。各条正文的查找区间互不
+    重叠，人名查找总共只扫描一遍文本；正文匹配按需生成，不预先构造完整列表。
+    正文表达式没有捕获组时不生成任何结果，人名表达式没有捕获组时人名匹配均为None。
+    """
+    if not message_regex.groups:
+        return
+    if name_regex is not None and not name_regex.groups:
+        name_regex = None
+
+    last_start = 0
+    for message_match in message_regex.finditer(content):
+        name_match = None
+        if name_regex is not None:
+            name_match = name_regex.search(content, last_start, message_match.start(1))
+        yield message_match, name_match
+        last_start = message_match.end(1)
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from ..utils.msgtool_executor import MsgToolExecutor
 from ..utils.command_executor import ExecutionResult, ExecutionStatus, AsyncCommandExecutor
 from ..utils.validators import MsgToolValidator, ValidationSummary
+from ..utils.progress import ProgressEvent, ToolOutputProgressParser
 from ..core.sjis_handler import SJISHandler, SJISExtBinaryHandler
 from ..core.file_operations import FileOperations
 
@@ -68,8 +69,15 @@ class MsgToolProcessor:
         """
         return self.executor.get_code_page(encoding)
     
-    def get_tool_info(self) -> Dict[str, Any]:
-        """获取工具信息"""
+    def get_tool_info(self, refresh: bool = False) -> Dict[str, Any]:
+        """获取工具信息
+        
+        Args:
+            refresh: 是否忽略缓存重新探测可用性与版本
+        """
+        if refresh:
+            self.executor.invalidate_capabilities()
+        
         info = {
             "available": self.is_tool_available(),
             "directory": self.msgtool_dir,
@@ -96,7 +104,10 @@ class MsgToolProcessor:
         json_folder: str,
         engine: Optional[str] = None,
         encoding: Optional[str] = None,
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        shards: int = 1,
+        max_concurrency: Optional[int] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None
     ) -> MsgToolProcessResult:
         """提取脚本文本到JSON
         
@@ -106,6 +117,9 @@ class MsgToolProcessor:
             engine: 指定的引擎（可选）
             encoding: 指定的文件编码（可选）
             output_callback: 实时输出回调函数
+            shards: 分片数，大于1时并发运行多个msg-tool进程（仅适用于脚本相互独立的引擎）
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            progress_callback: 结构化进度回调（从工具输出中识别已处理的文件）
         
         Returns:
             MsgToolProcessResult: 处理结果
@@ -133,10 +147,24 @@ class MsgToolProcessor:
             # 确保输出目录存在
             FileOperations.ensure_dir_exists(json_folder)
             
+            progress = None
+            if progress_callback:
+                progress = ToolOutputProgressParser.create(script_folder, progress_callback)
+                output_callback = progress.wrap(output_callback)
+            
             # 执行提取命令
-            result = self.executor.extract(
-                script_folder, json_folder, engine, encoding, output_callback
-            )
+            if shards > 1:
+                result = self.executor.extract_sharded(
+                    script_folder, json_folder, engine, encoding,
+                    shards, max_concurrency, output_callback
+                )
+            else:
+                result = self.executor.extract(
+                    script_folder, json_folder, engine, encoding, output_callback
+                )
+            
+            if progress:
+                progress.finish()
             
             # 分析执行结果
             if result.status == ExecutionStatus.COMPLETED:
@@ -175,7 +203,12 @@ class MsgToolProcessor:
         patched_encoding: Optional[str] = None,
         sjis_replacement: bool = False,
         sjis_replace_chars: str = "",
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        shards: int = 1,
+        max_concurrency: Optional[int] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        sjis_incremental: bool = False,
+        sjis_parallel: bool = False
     ) -> MsgToolProcessResult:
         """注入JSON文本回脚本
         
@@ -189,6 +222,11 @@ class MsgToolProcessor:
             sjis_replacement: 是否启用SJIS替换模式
             sjis_replace_chars: SJIS替换字符
             output_callback: 实时输出回调函数
+            shards: 分片数，大于1时并发运行多个msg-tool进程（仅适用于脚本相互独立的引擎）
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            progress_callback: 结构化进度回调（从工具输出中识别已处理的文件）
+            sjis_incremental: SJIS替换时只重写源文件或映射发生变化的JSON文件
+            sjis_parallel: SJIS替换时使用多进程并行处理
         
         Returns:
             MsgToolProcessResult: 处理结果
@@ -223,7 +261,10 @@ class MsgToolProcessor:
             if sjis_replacement:
                 try:
                     sjis_result = self.sjis_handler.process_json_folder(
-                        json_folder, sjis_replace_chars
+                        json_folder, sjis_replace_chars,
+                        incremental=sjis_incremental,
+                        parallel=sjis_parallel,
+                        max_workers=max_concurrency
                     )
                     actual_json_folder = sjis_result.replaced_folder
                     sjis_config = sjis_result.config_string
@@ -240,11 +281,26 @@ class MsgToolProcessor:
             # 清理可能存在的sjis_ext.bin文件
             SJISExtBinaryHandler.process_sjis_ext_output(output_folder)
             
+            progress = None
+            if progress_callback:
+                progress = ToolOutputProgressParser.create(script_folder, progress_callback)
+                output_callback = progress.wrap(output_callback)
+            
             # 执行注入命令
-            result = self.executor.inject(
-                script_folder, actual_json_folder, output_folder, 
-                engine, encoding, patched_encoding, output_callback
-            )
+            if shards > 1:
+                result = self.executor.inject_sharded(
+                    script_folder, actual_json_folder, output_folder,
+                    engine, encoding, patched_encoding,
+                    shards, max_concurrency, output_callback
+                )
+            else:
+                result = self.executor.inject(
+                    script_folder, actual_json_folder, output_folder, 
+                    engine, encoding, patched_encoding, output_callback
+                )
+            
+            if progress:
+                progress.finish()
             
             # 检查sjis_ext.bin文件
             sjis_ext_content = SJISExtBinaryHandler.get_sjis_ext_content(output_folder)
@@ -289,7 +345,8 @@ class MsgToolProcessor:
         engine: Optional[str] = None,
         encoding: Optional[str] = None,
         output_callback: Optional[Callable[[str], None]] = None,
-        completion_callback: Optional[Callable[[MsgToolProcessResult], None]] = None
+        completion_callback: Optional[Callable[[MsgToolProcessResult], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None
     ) -> str:
         """异步提取脚本文本到JSON
         
@@ -300,6 +357,7 @@ class MsgToolProcessor:
             encoding: 指定的文件编码（可选）
             output_callback: 实时输出回调函数
             completion_callback: 完成回调函数
+            progress_callback: 结构化进度回调
         
         Returns:
             str: 任务ID
@@ -312,7 +370,8 @@ class MsgToolProcessor:
             """在后台线程中执行提取"""
             try:
                 result = self.extract_text(
-                    script_folder, json_folder, engine, encoding, output_callback
+                    script_folder, json_folder, engine, encoding, output_callback,
+                    progress_callback=progress_callback
                 )
                 if completion_callback:
                     completion_callback(result)
@@ -343,7 +402,10 @@ class MsgToolProcessor:
         sjis_replacement: bool = False,
         sjis_replace_chars: str = "",
         output_callback: Optional[Callable[[str], None]] = None,
-        completion_callback: Optional[Callable[[MsgToolProcessResult], None]] = None
+        completion_callback: Optional[Callable[[MsgToolProcessResult], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        sjis_incremental: bool = False,
+        sjis_parallel: bool = False
     ) -> str:
         """异步注入JSON文本回脚本
         
@@ -358,6 +420,9 @@ class MsgToolProcessor:
             sjis_replace_chars: SJIS替换字符
             output_callback: 实时输出回调函数
             completion_callback: 完成回调函数
+            progress_callback: 结构化进度回调
+            sjis_incremental: SJIS替换时只重写源文件或映射发生变化的JSON文件
+            sjis_parallel: SJIS替换时使用多进程并行处理
         
         Returns:
             str: 任务ID
@@ -372,7 +437,10 @@ class MsgToolProcessor:
                 result = self.inject_text(
                     script_folder, json_folder, output_folder,
                     engine, encoding, patched_encoding, sjis_replacement,
-                    sjis_replace_chars, output_callback
+                    sjis_replace_chars, output_callback,
+                    progress_callback=progress_callback,
+                    sjis_incremental=sjis_incremental,
+                    sjis_parallel=sjis_parallel
                 )
                 if completion_callback:
                     completion_callback(result)
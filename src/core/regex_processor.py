@@ -3,17 +3,42 @@
 处理正则表达式模式的文本提取和注入
 """
 
+import hashlib
+import json
 import os
 import re
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Optional, Callable, Dict, Any, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 
 from ..utils.validators import RegexModeValidator, ValidationSummary
 from ..utils.encoding_utils import EncodingUtils
+from ..utils.progress import ProgressEvent, ProgressReporter
 from ..core.file_operations import FileOperations, ScriptFileIterator
 from ..core.sjis_handler import SJISHandler
-from ..models.translation_data import TranslationData, TranslationMapping
+from ..core.bytes_regex import BytesRegex
+from ..core.message_scanner import iter_messages
+from ..models.translation_data import TranslationData, TranslationMapping, SpanIndex
+from ..models.manifest import ExtractionManifest, ManifestEntry, InjectionManifest, InjectionEntry
+
+
+@dataclass
+class FileInjectionStats:
+    """单个文件的注入统计"""
+    filename: str
+    hits: int = 0
+    misses: int = 0
+    untranslated: int = 0
+    sjis_hanzi: List[str] = field(default_factory=list)
+    sjis_kanji: List[str] = field(default_factory=list)
+    sjis_count: int = 0
+    spliced: bool = False
+    
+    @property
+    def total(self) -> int:
+        """消息匹配总数"""
+        return self.hits + self.misses + self.untranslated
 
 
 @dataclass
@@ -23,8 +48,271 @@ class RegexProcessResult:
     message: str
     processed_files: int = 0
     total_matches: int = 0
+    failed_files: int = 0
     sjis_config: Optional[str] = None
     execution_time: float = 0.0
+    file_stats: List[FileInjectionStats] = field(default_factory=list)
+    
+    @property
+    def total_misses(self) -> int:
+        """未找到译文的消息数"""
+        return sum(stats.misses for stats in self.file_stats)
+    
+    @property
+    def total_untranslated(self) -> int:
+        """译文与原文相同或为空的消息数"""
+        return sum(stats.untranslated for stats in self.file_stats)
+
+
+class _MessageReplacer:
+    """消息替换回调，在替换的同时统计命中情况"""
+    
+    def __init__(self, translation_mapping: TranslationMapping):
+        self.translation_mapping = translation_mapping
+        self.hits = 0
+        self.misses = 0
+        self.untranslated = 0
+    
+    def _lookup(self, original_message: Optional[str]) -> Optional[str]:
+        """查找消息的译文"""
+        if original_message is None:
+            return None
+        return self.translation_mapping.get_message_translation(original_message)
+    
+    def __call__(self, match: re.Match) -> str:
+        try:
+            original_message = match.group(1)
+        except IndexError:
+            self.misses += 1
+            return match.group()
+        
+        translated = self._lookup(original_message)
+        if original_message is None or translated is None:
+            self.misses += 1
+            return match.group()
+        
+        if not translated or translated == original_message:
+            self.untranslated += 1
+            return match.group()
+        
+        self.hits += 1
+        return match.group().replace(original_message, translated)
+
+
+class _PositionalMessageReplacer(_MessageReplacer):
+    """按位置对应译文的消息替换回调
+    
+    第i个匹配直接使用第i条译文；原文与JSON不一致时回退到本文件的字典查找，
+    该字典仅在首次需要时构建。
+    """
+    
+    def __init__(self, jp_data: TranslationData, cn_data: TranslationData):
+        super().__init__(TranslationMapping())
+        self.jp_data = jp_data
+        self.cn_data = cn_data
+        self._index = 0
+        self._mapping_built = False
+    
+    def get_mapping(self) -> TranslationMapping:
+        """获取本文件的翻译映射（按需构建）"""
+        if not self._mapping_built:
+            self.translation_mapping.add_mapping(self.jp_data, self.cn_data)
+            self._mapping_built = True
+        return self.translation_mapping
+    
+    def _lookup(self, original_message: Optional[str]) -> Optional[str]:
+        index = self._index
+        self._index += 1
+        
+        if original_message is None:
+            return None
+        if index < len(self.jp_data) and self.jp_data[index].message == original_message:
+            return self.cn_data[index].message
+        return self.get_mapping().get_message_translation(original_message)
+
+
+def _extract_file_task(
+    file_path: str,
+    json_path: str,
+    message_regex: re.Pattern,
+    name_regex: Optional[re.Pattern],
+    encoding: str,
+    emit_spans: bool = False,
+    bytes_regex: Optional[BytesRegex] = None
+) -> int:
+    """提取单个文件并保存JSON（可在子进程中执行）
+    
+    指定bytes_regex时先按字节匹配，匹配位置不在字符边界上等情况下回退为文本匹配。
+    
+    Returns:
+        int: 提取的文本条数
+    """
+    matches = bytes_regex.extract_file(file_path) if bytes_regex and not emit_spans else None
+    if matches is None:
+        matches, span_index = RegexProcessor._extract_from_single_file(
+            file_path, message_regex, name_regex, encoding
+        )
+    matches.save_to_file(json_path)
+    
+    # 保存位置索引，未启用时清理旧索引以免与新JSON不一致
+    spans_path = SpanIndex.sidecar_path(json_path)
+    if emit_spans:
+        span_index.save_to_file(spans_path)
+    elif os.path.exists(spans_path):
+        os.remove(spans_path)
+    
+    return len(matches)
+
+
+# SJIS内存替换使用的(映射字典, 转换表)
+SJISMapping = Tuple[Dict[str, str], Dict[int, str]]
+
+_worker_sjis_mapping: Optional[SJISMapping] = None
+
+
+def _init_inject_worker(sjis_mapping: Optional[SJISMapping]):
+    """初始化注入子进程，SJIS映射每个进程只传递一次"""
+    global _worker_sjis_mapping
+    _worker_sjis_mapping = sjis_mapping
+
+
+def _inject_file_task(
+    file_path: str,
+    filename: str,
+    json_jp_folder: str,
+    json_cn_folder: str,
+    output_folder: str,
+    message_regex: re.Pattern,
+    name_regex: Optional[re.Pattern],
+    japanese_encoding: str,
+    chinese_encoding: str,
+    use_spans: bool = False,
+    positional: bool = False
+) -> FileInjectionStats:
+    """使用独立的翻译映射注入单个文件（可在子进程中执行）"""
+    return RegexProcessor._inject_to_single_file(
+        file_path, filename, json_jp_folder, json_cn_folder, output_folder,
+        message_regex, name_regex, japanese_encoding, chinese_encoding,
+        TranslationMapping(), use_spans, positional, _worker_sjis_mapping
+    )
+
+
+class _IncrementalInjection:
+    """增量注入状态
+    
+    按输出文件夹中的注入清单判断输出是否需要重新生成。共享翻译映射时（逐个注入且不按
+    顺序对应），输出还取决于之前的文件加入映射的人名（先加入者优先），因此额外比较加入
+    本文件后人名映射的摘要；上次存在未找到译文的文件可能由其他文件的译文补全，总是重新生成。
+    """
+    
+    def __init__(
+        self,
+        manifest: InjectionManifest,
+        config_key: str,
+        json_jp_folder: str,
+        json_cn_folder: str,
+        output_folder: str,
+        use_spans: bool,
+        shared_mapping: bool
+    ):
+        self.manifest = manifest
+        self.config_key = config_key
+        self.json_jp_folder = json_jp_folder
+        self.json_cn_folder = json_cn_folder
+        self.output_folder = output_folder
+        self.use_spans = use_spans
+        self.shared_mapping = shared_mapping
+        self.skipped_files = 0
+        self._snapshots: Dict[str, InjectionEntry] = {}
+        self._digest_cache: Tuple[int, str] = (-1, "")
+    
+    def input_paths(self, filename: str, file_path: str) -> Dict[str, str]:
+        """获取生成输出文件所用的各输入文件路径"""
+        json_base_name = os.path.splitext(filename)[0] + ".json"
+        jp_json_path = os.path.join(self.json_jp_folder, json_base_name)
+        paths = {
+            "script": file_path,
+            "jp_json": jp_json_path,
+            "cn_json": os.path.join(self.json_cn_folder, json_base_name),
+        }
+        if self.use_spans:
+            paths["spans"] = SpanIndex.sidecar_path(jp_json_path)
+        return paths
+    
+    def lookup(self, filename: str, file_path: str) -> Optional[InjectionEntry]:
+        """检查输出文件的输入与参数是否未变化"""
+        try:
+            return self.manifest.lookup(
+                filename, self.input_paths(filename, file_path),
+                os.path.join(self.output_folder, filename), self.config_key
+            )
+        except OSError:
+            return None
+    
+    @staticmethod
+    def depends_on_mapping(entry: InjectionEntry) -> bool:
+        """输出是否使用了共享翻译映射（缺少JSON时复制原文件，按位置拼接时不使用映射）"""
+        return (
+            entry.inputs.get("jp_json") is not None
+            and entry.inputs.get("cn_json") is not None
+            and not entry.stats.get("spliced", False)
+        )
+    
+    def mapping_digest(self, mapping: TranslationMapping) -> str:
+        """计算人名映射的摘要（人名只增不改，数量不变时沿用上次结果）"""
+        count = len(mapping.name_dict)
+        if self._digest_cache[0] != count:
+            text = json.dumps(list(mapping.name_dict.items()), ensure_ascii=False)
+            self._digest_cache = (count, hashlib.sha1(text.encode('utf-8')).hexdigest())
+        return self._digest_cache[1]
+    
+    def begin(self, filename: str, file_path: str):
+        """在注入前记录输入文件的指纹"""
+        try:
+            self._snapshots[filename] = self.manifest.snapshot(
+                self.input_paths(filename, file_path), self.config_key
+            )
+        except OSError:
+            self._snapshots.pop(filename, None)
+    
+    def record(
+        self,
+        filename: str,
+        stats: FileInjectionStats,
+        mapping: Optional[TranslationMapping] = None
+    ):
+        """记录注入成功的输出文件"""
+        entry = self._snapshots.pop(filename, None)
+        if entry is None:
+            self.manifest.discard(filename)
+            return
+        entry.stats = asdict(stats)
+        if mapping is not None:
+            entry.mapping_digest = self.mapping_digest(mapping)
+        try:
+            self.manifest.record(filename, entry, os.path.join(self.output_folder, filename))
+        except OSError:
+            self.manifest.discard(filename)
+    
+    def discard(self, filename: str):
+        """移除注入失败的输出文件的记录"""
+        self._snapshots.pop(filename, None)
+        self.manifest.discard(filename)
+    
+    def remove_stale_outputs(self, tasks: List[Tuple[str, str]]) -> int:
+        """删除源脚本已不存在的输出文件
+        
+        Returns:
+            int: 删除的文件数
+        """
+        removed = 0
+        for filename in self.manifest.stale_outputs(filename for filename, _ in tasks):
+            output_path = os.path.join(self.output_folder, filename)
+            if os.path.exists(output_path):
+                os.remove(output_path)
+                removed += 1
+            self.manifest.discard(filename)
+        return removed
 
 
 class RegexProcessor:
@@ -41,7 +329,13 @@ class RegexProcessor:
         message_pattern: str,
         name_pattern: Optional[str] = None,
         encoding: str = "sjis",
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        emit_spans: bool = False,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        incremental: bool = False,
+        bytes_mode: bool = False
     ) -> RegexProcessResult:
         """使用正则表达式提取文本
         
@@ -52,6 +346,13 @@ class RegexProcessor:
             name_pattern: 人名提取正则表达式（可选）
             encoding: 脚本文件编码
             output_callback: 进度回调函数
+            parallel: 是否使用多进程并行提取
+            max_workers: 并行进程数（默认为CPU核心数）
+            emit_spans: 是否在JSON旁保存位置索引（.spans），供按位置注入使用
+            progress_callback: 结构化进度回调（按文件数与字节数节流发送）
+            incremental: 是否在JSON文件夹中保存提取清单，并跳过内容与参数均未变化的脚本
+            bytes_mode: 是否将正则表达式转换为脚本编码的字节模式直接匹配文件，只解码捕获的文本
+                （不支持位置索引；表达式或文件不适用时自动使用文本匹配）
         
         Returns:
             RegexProcessResult: 处理结果
@@ -83,43 +384,82 @@ class RegexProcessor:
                     message=f"正则表达式编译失败: {str(e)}"
                 )
             
+            # 位置索引按字符偏移记录，需要文本匹配
+            bytes_regex = None
+            if bytes_mode and not emit_spans:
+                try:
+                    bytes_regex = BytesRegex.compile(message_regex, name_regex, encoding)
+                except ValueError as e:
+                    if output_callback:
+                        output_callback(f"无法使用字节匹配，改用文本匹配: {str(e)}")
+            
             # 确保输出目录存在
             FileOperations.ensure_dir_exists(json_folder)
             
             # 处理脚本文件
-            iterator = ScriptFileIterator(script_folder)
-            processed_files = 0
-            total_matches = 0
+            tasks = [
+                (filename, file_path,
+                 os.path.join(json_folder, os.path.splitext(filename)[0] + ".json"))
+                for filename, file_path in ScriptFileIterator(script_folder)
+            ]
+            progress = self._create_progress(
+                progress_callback, [file_path for _, file_path, _ in tasks]
+            )
             
-            for filename, file_path in iterator:
-                if output_callback:
-                    output_callback(f"处理文件: {filename}")
-                
-                try:
-                    matches = self._extract_from_single_file(
-                        file_path, message_regex, name_regex, encoding
-                    )
-                    
-                    # 保存JSON文件
-                    json_filename = os.path.splitext(filename)[0] + ".json"
-                    json_path = os.path.join(json_folder, json_filename)
-                    matches.save_to_file(json_path)
-                    
-                    processed_files += 1
-                    total_matches += len(matches)
-                
-                except Exception as e:
-                    if output_callback:
-                        output_callback(f"处理文件 {filename} 时出错: {str(e)}")
-                    continue
+            # 跳过清单中内容与参数均未变化的脚本
+            manifest = None
+            snapshots: Dict[str, ManifestEntry] = {}
+            pending = tasks
+            skipped_files = 0
+            skipped_matches = 0
+            
+            if incremental:
+                config_key = ExtractionManifest.compute_config_key(
+                    encoding, message_regex.pattern, message_regex.flags,
+                    name_regex.pattern if name_regex else None,
+                    name_regex.flags if name_regex else None,
+                    emit_spans
+                )
+                manifest = ExtractionManifest.for_folder(json_folder)
+                pending, snapshots, skipped_files, skipped_matches = self._filter_unchanged_files(
+                    tasks, manifest, config_key, emit_spans, progress
+                )
+                if skipped_files and output_callback:
+                    output_callback(f"跳过 {skipped_files} 个未修改的文件")
+            
+            if parallel:
+                file_matches, failed_files = self._extract_files_parallel(
+                    pending, message_regex, name_regex, encoding,
+                    output_callback, max_workers, emit_spans, progress, bytes_regex
+                )
+            else:
+                file_matches, failed_files = self._extract_files_sequential(
+                    pending, message_regex, name_regex, encoding, output_callback,
+                    emit_spans, progress, bytes_regex
+                )
+            
+            if manifest:
+                self._update_extraction_manifest(
+                    manifest, tasks, pending, snapshots, file_matches, output_callback
+                )
+            
+            if progress:
+                progress.finish()
             
+            processed_files = skipped_files + len(file_matches)
+            total_matches = skipped_matches + sum(file_matches.values())
             execution_time = time.time() - start_time
             
+            message = f"提取完成，处理了 {processed_files} 个文件，共提取 {total_matches} 条文本"
+            if skipped_files:
+                message += f"（其中 {skipped_files} 个文件未修改，已跳过）"
+            
             return RegexProcessResult(
                 success=True,
-                message=f"提取完成，处理了 {processed_files} 个文件，共提取 {total_matches} 条文本",
+                message=message,
                 processed_files=processed_files,
                 total_matches=total_matches,
+                failed_files=failed_files,
                 execution_time=execution_time
             )
         
@@ -130,6 +470,162 @@ class RegexProcessor:
                 execution_time=time.time() - start_time
             )
     
+    def _extract_files_sequential(
+        self,
+        tasks: List[Tuple[str, str, str]],
+        message_regex: re.Pattern,
+        name_regex: Optional[re.Pattern],
+        encoding: str,
+        output_callback: Optional[Callable[[str], None]],
+        emit_spans: bool = False,
+        progress: Optional[ProgressReporter] = None,
+        bytes_regex: Optional[BytesRegex] = None
+    ) -> Tuple[Dict[str, int], int]:
+        """逐个提取脚本文件
+        
+        Returns:
+            Tuple[Dict[str, int], int]: (成功文件的提取文本条数, 失败文件数)
+        """
+        file_matches: Dict[str, int] = {}
+        failed_files = 0
+        
+        for filename, file_path, json_path in tasks:
+            if output_callback:
+                output_callback(f"处理文件: {filename}")
+            
+            try:
+                file_matches[filename] = _extract_file_task(
+                    file_path, json_path, message_regex, name_regex, encoding,
+                    emit_spans, bytes_regex
+                )
+            except Exception as e:
+                failed_files += 1
+                if output_callback:
+                    output_callback(f"处理文件 {filename} 时出错: {str(e)}")
+            finally:
+                if progress:
+                    progress.advance(filename, FileOperations.get_file_size(file_path))
+        
+        return file_matches, failed_files
+    
+    def _extract_files_parallel(
+        self,
+        tasks: List[Tuple[str, str, str]],
+        message_regex: re.Pattern,
+        name_regex: Optional[re.Pattern],
+        encoding: str,
+        output_callback: Optional[Callable[[str], None]],
+        max_workers: Optional[int] = None,
+        emit_spans: bool = False,
+        progress: Optional[ProgressReporter] = None,
+        bytes_regex: Optional[BytesRegex] = None
+    ) -> Tuple[Dict[str, int], int]:
+        """使用进程池并行提取脚本文件
+        
+        每个文件的结果完成后立即通过回调输出，统计结果与逐个提取一致。
+        
+        Returns:
+            Tuple[Dict[str, int], int]: (成功文件的提取文本条数, 失败文件数)
+        """
+        file_matches: Dict[str, int] = {}
+        failed_files = 0
+        
+        if not tasks:
+            return file_matches, failed_files
+        
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {
+                pool.submit(
+                    _extract_file_task, file_path, json_path,
+                    message_regex, name_regex, encoding, emit_spans, bytes_regex
+                ): (filename, file_path)
+                for filename, file_path, json_path in tasks
+            }
+            
+            for future in as_completed(futures):
+                filename, file_path = futures[future]
+                try:
+                    matches = future.result()
+                    file_matches[filename] = matches
+                    if output_callback:
+                        output_callback(f"处理文件: {filename} ({matches} 条)")
+                except Exception as e:
+                    failed_files += 1
+                    if output_callback:
+                        output_callback(f"处理文件 {filename} 时出错: {str(e)}")
+                if progress:
+                    progress.advance(filename, FileOperations.get_file_size(file_path))
+        
+        return file_matches, failed_files
+    
+    @staticmethod
+    def _filter_unchanged_files(
+        tasks: List[Tuple[str, str, str]],
+        manifest: ExtractionManifest,
+        config_key: str,
+        emit_spans: bool,
+        progress: Optional[ProgressReporter] = None
+    ) -> Tuple[List[Tuple[str, str, str]], Dict[str, ManifestEntry], int, int]:
+        """按提取清单筛选需要重新提取的脚本
+        
+        Returns:
+            Tuple: (待提取任务, 待提取文件处理前的清单快照, 跳过的文件数, 跳过文件的文本条数)
+        """
+        pending = []
+        snapshots: Dict[str, ManifestEntry] = {}
+        skipped_files = 0
+        skipped_matches = 0
+        skipped_bytes = 0
+        
+        for filename, file_path, json_path in tasks:
+            try:
+                entry = None
+                if not emit_spans or os.path.exists(SpanIndex.sidecar_path(json_path)):
+                    entry = manifest.lookup(filename, file_path, json_path, config_key)
+                if entry is not None:
+                    skipped_files += 1
+                    skipped_matches += entry.matches
+                    skipped_bytes += entry.size
+                    continue
+                snapshots[filename] = manifest.snapshot(file_path, config_key)
+            except OSError:
+                pass  # 无法读取的文件交给提取流程报告错误
+            pending.append((filename, file_path, json_path))
+        
+        if progress and skipped_files:
+            progress.advance("", skipped_bytes, files=skipped_files)
+        
+        return pending, snapshots, skipped_files, skipped_matches
+    
+    @staticmethod
+    def _update_extraction_manifest(
+        manifest: ExtractionManifest,
+        tasks: List[Tuple[str, str, str]],
+        pending: List[Tuple[str, str, str]],
+        snapshots: Dict[str, ManifestEntry],
+        file_matches: Dict[str, int],
+        output_callback: Optional[Callable[[str], None]] = None
+    ):
+        """记录本次提取成功的文件并保存清单"""
+        for filename, _, json_path in pending:
+            entry = snapshots.get(filename)
+            if entry is None or filename not in file_matches:
+                manifest.discard(filename)
+                continue
+            entry.matches = file_matches[filename]
+            try:
+                manifest.record(filename, entry, json_path)
+            except OSError:
+                manifest.discard(filename)
+        
+        manifest.retain(filename for filename, _, _ in tasks)
+        try:
+            manifest.save()
+        except OSError as e:
+            if output_callback:
+                output_callback(f"保存提取清单失败: {str(e)}")
+    
     def inject_with_regex(
         self,
         script_folder: str,
@@ -142,7 +638,17 @@ class RegexProcessor:
         chinese_encoding: str = "gbk",
         sjis_replacement: bool = False,
         sjis_replace_chars: str = "",
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        use_spans: bool = False,
+        positional: bool = False,
+        sjis_in_memory: bool = True,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        incremental: bool = False,
+        remove_stale_outputs: bool = False,
+        sjis_incremental: bool = False,
+        sjis_parallel: bool = False
     ) -> RegexProcessResult:
         """使用正则表达式注入文本
         
@@ -158,6 +664,16 @@ class RegexProcessor:
             sjis_replacement: 是否启用SJIS替换
             sjis_replace_chars: SJIS替换字符
             output_callback: 进度回调函数
+            parallel: 是否使用多进程并行注入（每个文件使用独立的翻译映射）
+            max_workers: 并行进程数（默认为CPU核心数）
+            use_spans: 是否优先使用提取时保存的位置索引直接拼接译文
+            positional: 是否按JSON中的顺序逐条对应译文（不构建跨文件的消息字典）
+            sjis_in_memory: SJIS替换是否在加载译文时于内存中完成（不生成_replaced文件夹）
+            progress_callback: 结构化进度回调（按文件数与字节数节流发送）
+            incremental: 是否在输出文件夹中保存注入清单，并跳过输入与参数均未变化的输出
+            remove_stale_outputs: 增量注入时是否删除清单中记录、但源脚本已不存在的输出文件
+            sjis_incremental: 生成_replaced文件夹时只重写源文件或映射发生变化的JSON文件
+            sjis_parallel: 生成_replaced文件夹时使用多进程并行处理
         
         Returns:
             RegexProcessResult: 处理结果
@@ -195,11 +711,26 @@ class RegexProcessor:
             # 处理SJIS替换
             actual_json_cn_folder = json_cn_folder
             sjis_config = None
+            sjis_mapping = None
             
-            if sjis_replacement:
+            if sjis_replacement and sjis_in_memory:
+                char_dict = self.sjis_handler.mapper.get_mapping_dict(sjis_replace_chars)
+                if not char_dict:
+                    return RegexProcessResult(
+                        success=False,
+                        message="SJIS字符替换失败: 没有找到可用的字符映射"
+                    )
+                sjis_mapping = (
+                    char_dict,
+                    self.sjis_handler.mapper.get_translation_table(sjis_replace_chars)
+                )
+            elif sjis_replacement:
                 try:
                     sjis_result = self.sjis_handler.process_json_folder(
-                        json_cn_folder, sjis_replace_chars
+                        json_cn_folder, sjis_replace_chars,
+                        incremental=sjis_incremental,
+                        parallel=sjis_parallel,
+                        max_workers=max_workers
                     )
                     actual_json_cn_folder = sjis_result.replaced_folder
                     sjis_config = sjis_result.config_string
@@ -213,50 +744,109 @@ class RegexProcessor:
                         message=f"SJIS字符替换失败: {str(e)}"
                     )
             
-            # 清空翻译映射
-            self._translation_mapping.clear()
-            
             # 处理脚本文件
-            iterator = ScriptFileIterator(script_folder)
-            processed_files = 0
-            total_replacements = 0
+            tasks = list(ScriptFileIterator(script_folder))
+            progress = self._create_progress(
+                progress_callback, [file_path for _, file_path in tasks]
+            )
             
-            for filename, file_path in iterator:
-                if output_callback:
-                    output_callback(f"处理文件: {filename}")
+            incremental_state = None
+            if incremental:
+                shared_mapping = not parallel and not positional
+                config_key = InjectionManifest.compute_config_key(
+                    japanese_encoding, chinese_encoding,
+                    message_regex.pattern, message_regex.flags,
+                    name_regex.pattern if name_regex else None,
+                    name_regex.flags if name_regex else None,
+                    use_spans, positional, shared_mapping,
+                    sorted(sjis_mapping[0].items()) if sjis_mapping else None
+                )
+                incremental_state = _IncrementalInjection(
+                    InjectionManifest.for_folder(output_folder), config_key,
+                    json_jp_folder, actual_json_cn_folder, output_folder,
+                    use_spans, shared_mapping
+                )
+                if remove_stale_outputs:
+                    removed = incremental_state.remove_stale_outputs(tasks)
+                    if removed and output_callback:
+                        output_callback(f"删除 {removed} 个源脚本已不存在的输出文件")
+            
+            if parallel:
+                file_stats, failed_files = self._inject_files_parallel(
+                    tasks, json_jp_folder, actual_json_cn_folder, output_folder,
+                    message_regex, name_regex, japanese_encoding, chinese_encoding,
+                    output_callback, max_workers, use_spans, positional, sjis_mapping, progress,
+                    incremental_state
+                )
+            else:
+                # 清空翻译映射
+                self._translation_mapping.clear()
                 
+                file_stats, failed_files = self._inject_files_sequential(
+                    tasks, json_jp_folder, actual_json_cn_folder, output_folder,
+                    message_regex, name_regex, japanese_encoding, chinese_encoding,
+                    output_callback, use_spans, positional, sjis_mapping, progress,
+                    incremental_state
+                )
+            
+            skipped_files = 0
+            if incremental_state:
+                skipped_files = incremental_state.skipped_files
+                if skipped_files and output_callback:
+                    output_callback(f"跳过 {skipped_files} 个输入未变化的文件")
+                # 源脚本已不存在的输出保留记录，供之后指定删除时使用
                 try:
-                    replacements = self._inject_to_single_file(
-                        file_path, filename, json_jp_folder, actual_json_cn_folder,
-                        output_folder, message_regex, name_regex,
-                        japanese_encoding, chinese_encoding
+                    incremental_state.manifest.save()
+                except OSError as e:
+                    if output_callback:
+                        output_callback(f"保存注入清单失败: {str(e)}")
+            
+            if progress:
+                progress.finish()
+            
+            # 汇总内存中的SJIS替换结果（与替换文件夹相同的JSON文件顺序；没有对应脚本、
+            # 注入失败或直接复制的文件未在内存中替换，由汇总时读取统计）
+            if sjis_mapping:
+                known_results = {
+                    json_name: (stats.sjis_hanzi, stats.sjis_kanji, stats.sjis_count)
+                    for stats, json_name in (
+                        (stats, os.path.splitext(stats.filename)[0] + ".json") for stats in file_stats
+                    )
+                    if os.path.exists(os.path.join(json_jp_folder, json_name))
+                }
+                try:
+                    sjis_result = self.sjis_handler.summarize_json_folder(
+                        json_cn_folder, sjis_mapping[0], known_results
                     )
-                    
-                    processed_files += 1
-                    total_replacements += replacements
-                
                 except Exception as e:
-                    if output_callback:
-                        output_callback(f"处理文件 {filename} 时出错: {str(e)}")
-                    
-                    # 复制原文件到输出目录
-                    try:
-                        output_path = os.path.join(output_folder, filename)
-                        shutil.copy(file_path, output_path)
-                    except Exception:
-                        pass
-                    continue
+                    return RegexProcessResult(
+                        success=False,
+                        message=f"SJIS字符替换失败: {str(e)}"
+                    )
+                sjis_config = sjis_result.config_string
+                
+                if output_callback:
+                    output_callback(f"SJIS替换完成，替换了 {sjis_result.replacement_count} 个字符")
             
             execution_time = time.time() - start_time
             
-            return RegexProcessResult(
+            result = RegexProcessResult(
                 success=True,
-                message=f"注入完成，处理了 {processed_files} 个文件，共替换 {total_replacements} 处文本",
-                processed_files=processed_files,
-                total_matches=total_replacements,
+                message="注入完成",
+                processed_files=len(file_stats),
+                total_matches=sum(stats.hits for stats in file_stats),
+                failed_files=failed_files,
                 sjis_config=sjis_config,
-                execution_time=execution_time
+                execution_time=execution_time,
+                file_stats=file_stats
             )
+            result.message = (
+                f"注入完成，处理了 {result.processed_files} 个文件，共替换 {result.total_matches} 处文本"
+                f"（未找到译文 {result.total_misses} 处，未翻译 {result.total_untranslated} 处）"
+            )
+            if skipped_files:
+                result.message += f"，其中 {skipped_files} 个文件未变化，已跳过"
+            return result
         
         except Exception as e:
             return RegexProcessResult(
@@ -265,49 +855,264 @@ class RegexProcessor:
                 execution_time=time.time() - start_time
             )
     
-    def _extract_from_single_file(
+    def _inject_files_sequential(
         self,
+        tasks: List[Tuple[str, str]],
+        json_jp_folder: str,
+        json_cn_folder: str,
+        output_folder: str,
+        message_regex: re.Pattern,
+        name_regex: Optional[re.Pattern],
+        japanese_encoding: str,
+        chinese_encoding: str,
+        output_callback: Optional[Callable[[str], None]],
+        use_spans: bool = False,
+        positional: bool = False,
+        sjis_mapping: Optional[SJISMapping] = None,
+        progress: Optional[ProgressReporter] = None,
+        incremental: Optional[_IncrementalInjection] = None
+    ) -> Tuple[List[FileInjectionStats], int]:
+        """逐个注入脚本文件，所有文件共享同一个翻译映射
+        
+        增量注入时跳过的文件仍按顺序将译文加入翻译映射，保证后续文件的结果与完整注入一致。
+        
+        Returns:
+            Tuple[List[FileInjectionStats], int]: (成功文件的注入统计, 失败文件数)
+        """
+        file_stats = []
+        failed_files = 0
+        mapping = None if positional else self._translation_mapping
+        
+        for filename, file_path in tasks:
+            if incremental:
+                cached = self._reuse_injection(
+                    incremental, filename, file_path, json_jp_folder, json_cn_folder,
+                    mapping, sjis_mapping
+                )
+                if cached is not None:
+                    file_stats.append(cached)
+                    if progress:
+                        progress.advance(filename, FileOperations.get_file_size(file_path))
+                    continue
+                incremental.begin(filename, file_path)
+            
+            if output_callback:
+                output_callback(f"处理文件: {filename}")
+            
+            try:
+                stats = self._inject_to_single_file(
+                    file_path, filename, json_jp_folder, json_cn_folder,
+                    output_folder, message_regex, name_regex,
+                    japanese_encoding, chinese_encoding,
+                    self._translation_mapping, use_spans, positional, sjis_mapping
+                )
+                file_stats.append(stats)
+                if incremental:
+                    incremental.record(filename, stats, mapping)
+            except Exception as e:
+                failed_files += 1
+                if output_callback:
+                    output_callback(f"处理文件 {filename} 时出错: {str(e)}")
+                self._copy_original_file(file_path, output_folder, filename)
+                if incremental:
+                    incremental.discard(filename)
+            finally:
+                if progress:
+                    progress.advance(filename, FileOperations.get_file_size(file_path))
+        
+        return file_stats, failed_files
+    
+    def _inject_files_parallel(
+        self,
+        tasks: List[Tuple[str, str]],
+        json_jp_folder: str,
+        json_cn_folder: str,
+        output_folder: str,
+        message_regex: re.Pattern,
+        name_regex: Optional[re.Pattern],
+        japanese_encoding: str,
+        chinese_encoding: str,
+        output_callback: Optional[Callable[[str], None]],
+        max_workers: Optional[int] = None,
+        use_spans: bool = False,
+        positional: bool = False,
+        sjis_mapping: Optional[SJISMapping] = None,
+        progress: Optional[ProgressReporter] = None,
+        incremental: Optional[_IncrementalInjection] = None
+    ) -> Tuple[List[FileInjectionStats], int]:
+        """使用进程池并行注入脚本文件
+        
+        每个文件只使用自身JSON构建的翻译映射，输出文件由子进程独立写入。
+        
+        Returns:
+            Tuple[List[FileInjectionStats], int]: (成功文件的注入统计, 失败文件数)
+        """
+        file_stats = []
+        failed_files = 0
+        
+        if incremental:
+            pending = []
+            for filename, file_path in tasks:
+                cached = self._reuse_injection(
+                    incremental, filename, file_path, json_jp_folder, json_cn_folder
+                )
+                if cached is not None:
+                    file_stats.append(cached)
+                    if progress:
+                        progress.advance(filename, FileOperations.get_file_size(file_path))
+                else:
+                    incremental.begin(filename, file_path)
+                    pending.append((filename, file_path))
+            tasks = pending
+        
+        if not tasks:
+            return file_stats, failed_files
+        
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_init_inject_worker,
+            initargs=(sjis_mapping,)
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _inject_file_task, file_path, filename,
+                    json_jp_folder, json_cn_folder, output_folder,
+                    message_regex, name_regex, japanese_encoding, chinese_encoding,
+                    use_spans, positional
+                ): (filename, file_path)
+                for filename, file_path in tasks
+            }
+            
+            for future in as_completed(futures):
+                filename, file_path = futures[future]
+                try:
+                    stats = future.result()
+                    file_stats.append(stats)
+                    if incremental:
+                        incremental.record(filename, stats)
+                    if output_callback:
+                        output_callback(f"处理文件: {filename} ({stats.hits} 处)")
+                except Exception as e:
+                    failed_files += 1
+                    if output_callback:
+                        output_callback(f"处理文件 {filename} 时出错: {str(e)}")
+                    self._copy_original_file(file_path, output_folder, filename)
+                    if incremental:
+                        incremental.discard(filename)
+                if progress:
+                    progress.advance(filename, FileOperations.get_file_size(file_path))
+        
+        return file_stats, failed_files
+    
+    @staticmethod
+    def _create_progress(
+        progress_callback: Optional[Callable[[ProgressEvent], None]],
+        file_paths: List[str]
+    ) -> Optional[ProgressReporter]:
+        """按待处理文件创建进度报告器，未提供回调时返回None"""
+        if progress_callback is None:
+            return None
+        return ProgressReporter.for_files(progress_callback, file_paths)
+    
+    @staticmethod
+    def _reuse_injection(
+        incremental: _IncrementalInjection,
+        filename: str,
+        file_path: str,
+        json_jp_folder: str,
+        json_cn_folder: str,
+        mapping: Optional[TranslationMapping] = None,
+        sjis_mapping: Optional[SJISMapping] = None
+    ) -> Optional[FileInjectionStats]:
+        """检查能否沿用上次注入的输出文件
+        
+        Args:
+            mapping: 共享翻译映射（逐个注入时），沿用的文件也会按顺序加入其中
+        
+        Returns:
+            Optional[FileInjectionStats]: 可沿用时返回上次的注入统计，否则返回None
+        """
+        entry = incremental.lookup(filename, file_path)
+        if entry is None:
+            return None
+        
+        if incremental.shared_mapping and mapping is not None and incremental.depends_on_mapping(entry):
+            try:
+                RegexProcessor._add_file_mapping(
+                    filename, json_jp_folder, json_cn_folder, mapping, sjis_mapping
+                )
+            except Exception:
+                return None
+            if entry.stats.get("misses", 0) or entry.mapping_digest != incremental.mapping_digest(mapping):
+                return None
+        
+        incremental.skipped_files += 1
+        return FileInjectionStats(**entry.stats)
+    
+    @staticmethod
+    def _add_file_mapping(
+        filename: str,
+        json_jp_folder: str,
+        json_cn_folder: str,
+        mapping: TranslationMapping,
+        sjis_mapping: Optional[SJISMapping] = None
+    ):
+        """将文件的译文加入翻译映射（与注入时加入的内容相同）"""
+        json_base_name = os.path.splitext(filename)[0] + ".json"
+        cn_json_path = os.path.join(json_cn_folder, json_base_name)
+        if sjis_mapping:
+            with open(cn_json_path, 'r', encoding='utf-8') as f:
+                cn_text, _, _, _ = SJISHandler.replace_text(f.read(), *sjis_mapping)
+            cn_data = TranslationData.from_json_text(cn_text)
+        else:
+            cn_data = TranslationData.load_from_file(cn_json_path)
+        jp_data = TranslationData.load_from_file(os.path.join(json_jp_folder, json_base_name))
+        mapping.add_mapping(jp_data, cn_data)
+    
+    @staticmethod
+    def _copy_original_file(file_path: str, output_folder: str, filename: str):
+        """复制原文件到输出目录"""
+        try:
+            output_path = os.path.join(output_folder, filename)
+            shutil.copy(file_path, output_path)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _extract_from_single_file(
         file_path: str,
         message_regex: re.Pattern,
         name_regex: Optional[re.Pattern],
         encoding: str
-    ) -> TranslationData:
-        """从单个文件提取文本"""
+    ) -> Tuple[TranslationData, SpanIndex]:
+        """从单个文件提取文本
+        
+        Returns:
+            Tuple[TranslationData, SpanIndex]: (翻译数据, 各条目在脚本中的位置索引)
+        """
         # 读取文件内容
         content, actual_encoding = EncodingUtils.read_file_with_encoding(file_path, encoding)
         
         translation_data = TranslationData()
+        span_index = SpanIndex.for_content(content)
         
-        # 提取消息
-        message_matches = list(message_regex.finditer(content))
-        last_start = 0
-        
-        for message_match in message_matches:
-            try:
-                message = message_match.group(1)
-            except IndexError:
-                continue  # 跳过没有捕获组的匹配
-            
-            start = message_match.start(1)
+        # 按顺序提取消息及其前面的人名
+        for message_match, name_match in iter_messages(content, message_regex, name_regex):
             name = ""
-            
-            # 在消息之前查找人名
-            if name_regex:
-                name_match = name_regex.search(content, last_start, start)
-                if name_match:
-                    try:
-                        name = name_match.group(1)
-                    except IndexError:
-                        name = ""
+            name_span = None
+            if name_match:
+                name = name_match.group(1)
+                name_span = name_match.span(1)
             
             # 添加到翻译数据
-            translation_data.add_entry(message, name if name else None)
-            last_start = message_match.end(1)
+            translation_data.add_entry(message_match.group(1), name if name else None)
+            span_index.add_span(message_match.span(1), name_span if name else None)
         
-        return translation_data
+        return translation_data, span_index
     
+    @staticmethod
     def _inject_to_single_file(
-        self,
         file_path: str,
         filename: str,
         json_jp_folder: str,
@@ -316,9 +1121,21 @@ class RegexProcessor:
         message_regex: re.Pattern,
         name_regex: Optional[re.Pattern],
         japanese_encoding: str,
-        chinese_encoding: str
-    ) -> int:
-        """注入单个文件"""
+        chinese_encoding: str,
+        translation_mapping: TranslationMapping,
+        use_spans: bool = False,
+        positional: bool = False,
+        sjis_mapping: Optional[SJISMapping] = None
+    ) -> FileInjectionStats:
+        """注入单个文件
+        
+        Args:
+            translation_mapping: 用于查找译文的翻译映射，本文件的JP/CN对会加入其中
+            use_spans: 存在有效的位置索引时按位置拼接译文，否则回退到正则替换
+            positional: 按顺序对应译文，仅在不一致时使用本文件的字典查找，
+                此时不会修改translation_mapping
+            sjis_mapping: 加载译文时在内存中执行SJIS替换所用的(映射字典, 转换表)
+        """
         # 构建JSON文件路径
         json_base_name = os.path.splitext(filename)[0] + ".json"
         jp_json_path = os.path.join(json_jp_folder, json_base_name)
@@ -329,53 +1146,124 @@ class RegexProcessor:
             # 如果JSON文件不存在，直接复制原文件
             output_path = os.path.join(output_folder, filename)
             shutil.copy(file_path, output_path)
-            return 0
-        
-        # 加载翻译数据
-        jp_data = TranslationData.load_from_file(jp_json_path)
-        cn_data = TranslationData.load_from_file(cn_json_path)
+            return FileInjectionStats(filename=filename)
         
-        # 构建映射
-        self._translation_mapping.add_mapping(jp_data, cn_data)
+        # 加载翻译数据（需要时在内存中执行SJIS字符替换）
+        sjis_hanzi: List[str] = []
+        sjis_kanji: List[str] = []
+        sjis_count = 0
+        if sjis_mapping:
+            with open(cn_json_path, 'r', encoding='utf-8') as f:
+                cn_text = f.read()
+            cn_text, sjis_hanzi, sjis_kanji, sjis_count = SJISHandler.replace_text(
+                cn_text, *sjis_mapping
+            )
+            cn_data = TranslationData.from_json_text(cn_text)
+        else:
+            cn_data = TranslationData.load_from_file(cn_json_path)
         
         # 读取脚本内容
         content, _ = EncodingUtils.read_file_with_encoding(file_path, japanese_encoding)
+        output_path = os.path.join(output_folder, filename)
         
-        # 替换消息
-        replacement_count = 0
-        content = message_regex.sub(
-            lambda m: self._replace_message(m, replacement_count), content
-        )
-        replacement_count = len(message_regex.findall(content))
+        # 按位置索引直接拼接译文
+        if use_spans:
+            spans_path = SpanIndex.sidecar_path(jp_json_path)
+            if os.path.exists(spans_path):
+                span_index = SpanIndex.load_from_file(spans_path)
+                if span_index.matches_content(content) and len(span_index) == len(cn_data):
+                    content, stats = RegexProcessor._splice_translations(
+                        content, span_index, cn_data, filename
+                    )
+                    EncodingUtils.write_file_with_encoding(output_path, content, chinese_encoding)
+                    stats.sjis_hanzi, stats.sjis_kanji, stats.sjis_count = (
+                        sjis_hanzi, sjis_kanji, sjis_count
+                    )
+                    return stats
+        
+        jp_data = TranslationData.load_from_file(jp_json_path)
+        # 按位置对应译文时不经过add_mapping，需在此检查条数一致
+        if len(jp_data) != len(cn_data):
+            raise ValueError("日文和中文数据长度不匹配")
+        
+        # 替换消息（替换的同时统计命中情况）
+        if positional:
+            replacer = _PositionalMessageReplacer(jp_data, cn_data)
+            content = message_regex.sub(replacer, content)
+        else:
+            translation_mapping.add_mapping(jp_data, cn_data)
+            replacer = _MessageReplacer(translation_mapping)
+            content = message_regex.sub(replacer, content)
         
         # 替换人名
         if name_regex:
-            content = name_regex.sub(self._replace_name, content)
+            name_mapping = replacer.get_mapping() if positional else translation_mapping
+            content = name_regex.sub(
+                lambda m: RegexProcessor._replace_name(m, name_mapping), content
+            )
         
         # 写入输出文件
-        output_path = os.path.join(output_folder, filename)
         EncodingUtils.write_file_with_encoding(output_path, content, chinese_encoding)
         
-        return replacement_count
+        return FileInjectionStats(
+            filename=filename,
+            hits=replacer.hits,
+            misses=replacer.misses,
+            untranslated=replacer.untranslated,
+            sjis_hanzi=sjis_hanzi,
+            sjis_kanji=sjis_kanji,
+            sjis_count=sjis_count
+        )
     
-    def _replace_message(self, match: re.Match, count_ref: List[int]) -> str:
-        """替换消息回调函数"""
-        try:
-            original_message = match.group(1)
-            translated = self._translation_mapping.get_message_translation(original_message)
-            
-            if translated:
-                return match.group().replace(original_message, translated)
+    @staticmethod
+    def _splice_translations(
+        content: str,
+        span_index: SpanIndex,
+        cn_data: TranslationData,
+        filename: str
+    ) -> Tuple[str, FileInjectionStats]:
+        """按位置索引将译文拼接进脚本内容
+        
+        第i个索引位置对应第i条译文，只做一次切片拼接，不执行正则匹配。
+        
+        Returns:
+            Tuple[str, FileInjectionStats]: (注入后的内容, 注入统计)
+        """
+        stats = FileInjectionStats(filename=filename, spliced=True)
+        edits = []
+        
+        for (message_span, name_span), cn_entry in zip(
+            zip(span_index.message_spans, span_index.name_spans), cn_data
+        ):
+            start, end = message_span
+            if cn_entry.message and cn_entry.message != content[start:end]:
+                edits.append((start, end, cn_entry.message))
+                stats.hits += 1
             else:
-                return match.group()
-        except (IndexError, AttributeError):
-            return match.group()
+                stats.untranslated += 1
+            
+            if name_span and cn_entry.name:
+                edits.append((name_span[0], name_span[1], cn_entry.name))
+        
+        edits.sort()
+        pieces = []
+        position = 0
+        for start, end, replacement in edits:
+            if start < position:
+                continue  # 跳过重叠的位置
+            pieces.append(content[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(content[position:])
+        
+        return "".join(pieces), stats
     
-    def _replace_name(self, match: re.Match) -> str:
+    @staticmethod
+    def _replace_name(match: re.Match, translation_mapping: TranslationMapping) -> str:
         """替换人名回调函数"""
         try:
             original_name = match.group(1)
-            translated = self._translation_mapping.get_name_translation(original_name)
+            translated = translation_mapping.get_name_translation(original_name)
             
             if translated:
                 return match.group().replace(original_name, translated)
@@ -4,8 +4,14 @@ SJIS字符替换处理器
 """
 
 import os
+import json
+import pickle
 import shutil
-from typing import Dict, List, Tuple, Optional
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 
 from ..core.file_operations import FileOperations, JSONFileOperations
@@ -20,44 +26,273 @@ class SJISReplacementResult:
     kanji_chars: List[str]
     replacement_count: int
     config_string: str
+    processed_files: int = 0
+    skipped_files: int = 0
+
+
+class SJISReplacementManifest:
+    """SJIS替换增量清单
+    
+    保存在替换文件夹中，记录每个源文件的修改时间、大小、内容哈希和替换结果，
+    以及生成时使用的映射哈希。映射变化时清单整体失效。
+    """
+    
+    FILENAME = ".sjis_manifest"
+    VERSION = 1
+    
+    def __init__(self, mapping_hash: str = ""):
+        self.mapping_hash = mapping_hash
+        self.files: Dict[str, Dict[str, Any]] = {}
+    
+    @staticmethod
+    def hash_mapping(char_dict: Dict[str, str]) -> str:
+        """计算映射字典的哈希"""
+        digest = hashlib.sha1()
+        for orig_char, replace_char in sorted(char_dict.items()):
+            digest.update(f"{orig_char}\t{replace_char}\n".encode("utf-8"))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """计算文件内容的哈希"""
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @classmethod
+    def load(cls, folder: str) -> 'SJISReplacementManifest':
+        """从文件夹加载清单，不存在或损坏时返回空清单"""
+        manifest = cls()
+        manifest_path = os.path.join(folder, cls.FILENAME)
+        
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                manifest.mapping_hash = data.get("mapping_hash", "")
+                manifest.files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        
+        return manifest
+    
+    def save(self, folder: str):
+        """保存清单到文件夹"""
+        manifest_path = os.path.join(folder, self.FILENAME)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.VERSION,
+                "mapping_hash": self.mapping_hash,
+                "files": self.files
+            }, f, ensure_ascii=False)
+    
+    def get_unchanged(
+        self,
+        filename: str,
+        input_file: str,
+        output_file: str
+    ) -> Optional[Dict[str, Any]]:
+        """获取未变化文件的清单记录，文件需要重新处理时返回None"""
+        entry = self.files.get(filename)
+        if entry is None or not os.path.exists(output_file):
+            return None
+        
+        stat = os.stat(input_file)
+        if entry.get("mtime") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return entry
+        
+        # 修改时间变化但内容相同时无需重写
+        if entry.get("size") == stat.st_size and entry.get("hash") == self.hash_file(input_file):
+            entry["mtime"] = stat.st_mtime_ns
+            return entry
+        
+        return None
+    
+    def update(
+        self,
+        filename: str,
+        input_file: str,
+        hanzi_chars: List[str],
+        kanji_chars: List[str],
+        replacement_count: int
+    ):
+        """更新文件的清单记录"""
+        stat = os.stat(input_file)
+        self.files[filename] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": self.hash_file(input_file),
+            "hanzi": hanzi_chars,
+            "kanji": kanji_chars,
+            "count": replacement_count
+        }
+
+
+_worker_char_dict: Dict[str, str] = {}
+_worker_translation_table: Dict[int, str] = {}
+
+
+def _init_replacement_worker(char_dict: Dict[str, str]):
+    """初始化替换子进程，每个进程只构建一次转换表"""
+    global _worker_char_dict, _worker_translation_table
+    _worker_char_dict = char_dict
+    _worker_translation_table = SJISCharacterMapper._build_translation_table(char_dict)
+
+
+def _replace_json_file_task(input_file: str, output_file: str) -> Tuple[List[str], List[str], int]:
+    """在子进程中替换单个JSON文件"""
+    return SJISHandler._process_single_json_file(
+        input_file, output_file, _worker_char_dict, _worker_translation_table
+    )
 
 
 class SJISCharacterMapper:
-    """SJIS字符映射器"""
+    """SJIS字符映射器
+    
+    解析后的映射会缓存到映射文件旁的.cache文件中（以源文件的修改时间和大小为键），
+    源文件变化时自动重建。通过get_shared()获取的实例在进程内共享。
+    """
     
-    def __init__(self, mapping_file: str = "resources/hanzi2kanji_table.txt"):
+    CACHE_SUFFIX = ".cache"
+    CACHE_VERSION = 1
+    
+    _shared_instances: Dict[str, 'SJISCharacterMapper'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, mapping_file: str = "resources/hanzi2kanji_table.txt", use_cache: bool = True):
         self.mapping_file = mapping_file
+        self.use_cache = use_cache
         self._char_dict: Dict[str, str] = {}
+        self._translation_table: Dict[int, str] = {}
+        self._source_key: Optional[Tuple[int, int]] = None
         self._load_mapping()
     
+    @classmethod
+    def get_shared(cls, mapping_file: str = "resources/hanzi2kanji_table.txt") -> 'SJISCharacterMapper':
+        """获取进程内共享的映射器实例，映射文件变化时重新加载"""
+        key = os.path.abspath(mapping_file)
+        with cls._shared_lock:
+            mapper = cls._shared_instances.get(key)
+            if mapper is None or not mapper.is_current():
+                mapper = cls(mapping_file)
+                cls._shared_instances[key] = mapper
+            return mapper
+    
+    @classmethod
+    def clear_shared(cls):
+        """清除共享实例"""
+        with cls._shared_lock:
+            cls._shared_instances.clear()
+    
+    @property
+    def cache_file(self) -> str:
+        """缓存文件路径"""
+        return self.mapping_file + self.CACHE_SUFFIX
+    
+    def _get_source_key(self) -> Tuple[int, int]:
+        """获取映射文件的(修改时间, 大小)"""
+        stat = os.stat(self.mapping_file)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def is_current(self) -> bool:
+        """检查加载的映射是否与映射文件一致"""
+        try:
+            return self._get_source_key() == self._source_key
+        except OSError:
+            return False
+    
     def _load_mapping(self):
         """加载字符映射表"""
         try:
             if not os.path.exists(self.mapping_file):
                 raise FileNotFoundError(f"映射文件不存在: {self.mapping_file}")
             
-            with open(self.mapping_file, "r", encoding="utf-8") as f:
-                for line in f.readlines():
-                    line = line.strip()
-                    if line and '\t' in line:
-                        parts = line.split('\t')
-                        if len(parts) >= 2:
-                            orig_char, replace_char = parts[0], parts[1]
-                            self._char_dict[orig_char] = replace_char
+            self._source_key = self._get_source_key()
+            if self.use_cache and self._load_cache():
+                return
+            
+            self._char_dict = self._parse_mapping_file(self.mapping_file)
+            self._translation_table = self._build_translation_table(self._char_dict)
+            
+            if self.use_cache:
+                self._save_cache()
         except Exception as e:
             raise RuntimeError(f"加载字符映射失败: {e}")
     
+    @staticmethod
+    def _parse_mapping_file(mapping_file: str) -> Dict[str, str]:
+        """解析映射文本文件"""
+        char_dict = {}
+        with open(mapping_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and '\t' in line:
+                    parts = line.split('\t')
+                    if len(parts) >= 2:
+                        orig_char, replace_char = parts[0], parts[1]
+                        char_dict[orig_char] = replace_char
+        return char_dict
+    
+    def _load_cache(self) -> bool:
+        """从缓存文件加载映射，缓存无效时返回False"""
+        try:
+            with open(self.cache_file, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != self.CACHE_VERSION or data.get("source") != self._source_key:
+                return False
+            self._char_dict = data["char_dict"]
+            self._translation_table = data["translation_table"]
+            return True
+        except Exception:
+            return False
+    
+    def _save_cache(self):
+        """保存映射到缓存文件（写入失败时忽略）"""
+        try:
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, "wb") as f:
+                pickle.dump({
+                    "version": self.CACHE_VERSION,
+                    "source": self._source_key,
+                    "char_dict": self._char_dict,
+                    "translation_table": self._translation_table
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+        except Exception:
+            try:
+                os.remove(temp_file)
+            except Exception:
+                pass
+    
+    @staticmethod
+    def _build_translation_table(char_dict: Dict[str, str]) -> Dict[int, str]:
+        """将映射字典转换为str.translate使用的转换表（仅单字符映射）"""
+        return {
+            ord(orig_char): replace_char
+            for orig_char, replace_char in char_dict.items()
+            if len(orig_char) == 1
+        }
+    
     def get_mapping_dict(self, filter_chars: str = "") -> Dict[str, str]:
         """获取映射字典，可选择性过滤字符"""
         if not filter_chars:
             return self._char_dict.copy()
         
-        filtered_dict = {}
-        for orig_char, replace_char in self._char_dict.items():
-            if orig_char in filter_chars:
-                filtered_dict[orig_char] = replace_char
+        filter_set = set(filter_chars)
+        return {
+            orig_char: replace_char
+            for orig_char, replace_char in self._char_dict.items()
+            if orig_char in filter_set
+        }
+    
+    def get_translation_table(self, filter_chars: str = "") -> Dict[int, str]:
+        """获取str.translate使用的转换表，可选择性过滤字符"""
+        if not filter_chars:
+            return self._translation_table
         
-        return filtered_dict
+        return self._build_translation_table(self.get_mapping_dict(filter_chars))
     
     def get_replacement_for_char(self, char: str) -> Optional[str]:
         """获取单个字符的替换"""
@@ -77,74 +312,112 @@ class SJISHandler:
     
     def __init__(self, resources_dir: str = "resources"):
         self.resources_dir = resources_dir
-        self.mapper = SJISCharacterMapper(
+        self.mapper = SJISCharacterMapper.get_shared(
             os.path.join(resources_dir, "hanzi2kanji_table.txt")
         )
     
     def process_json_folder(
         self, 
         json_cn_folder: str, 
-        replace_chars: str = ""
+        replace_chars: str = "",
+        incremental: bool = False,
+        parallel: bool = False,
+        max_workers: Optional[int] = None
     ) -> SJISReplacementResult:
         """处理JSON文件夹，执行SJIS字符替换
         
         Args:
             json_cn_folder: 中文JSON文件夹路径
             replace_chars: 要替换的字符（空字符串表示全量替换）
+            incremental: 是否增量处理，仅重写源文件或映射发生变化的文件
+            parallel: 是否使用多进程并行处理
+            max_workers: 并行进程数（默认为CPU核心数）
         
         Returns:
             SJISReplacementResult: 替换结果
         """
-        # 获取映射字典
+        # 获取映射字典和转换表
         char_dict = self.mapper.get_mapping_dict(replace_chars)
         
         if not char_dict:
             raise ValueError("没有找到可用的字符映射")
         
+        translation_table = self.mapper.get_translation_table(replace_chars)
+        
         # 创建替换后的文件夹
         replaced_folder = json_cn_folder + "_replaced"
         
         try:
-            # 清理并重新创建替换文件夹
-            if os.path.exists(replaced_folder):
+            # 加载增量清单，映射变化时整体重建
+            mapping_hash = SJISReplacementManifest.hash_mapping(char_dict)
+            manifest = None
+            if incremental:
+                manifest = SJISReplacementManifest.load(replaced_folder)
+                if manifest.mapping_hash != mapping_hash:
+                    manifest = SJISReplacementManifest(mapping_hash)
+                    if os.path.exists(replaced_folder):
+                        FileOperations.delete_directory(replaced_folder)
+            elif os.path.exists(replaced_folder):
+                # 清理并重新创建替换文件夹
                 FileOperations.delete_directory(replaced_folder)
             FileOperations.ensure_dir_exists(replaced_folder)
             
-            hanzi_chars_list = []
-            kanji_chars_list = []
-            replacement_count = 0
+            # 收集需要处理的JSON文件
+            json_files = self.find_json_files(json_cn_folder)
             
-            # 处理每个JSON文件
-            json_files = FileOperations.find_files_by_extension(
-                json_cn_folder, ['.json'], recursive=False
-            )
+            file_results: Dict[str, Tuple[List[str], List[str], int]] = {}
+            pending: List[Tuple[str, str, str]] = []
             
             for json_file in json_files:
                 filename = os.path.basename(json_file)
                 output_file = os.path.join(replaced_folder, filename)
                 
-                # 处理单个文件
-                file_hanzi, file_kanji, file_count = self._process_single_json_file(
-                    json_file, output_file, char_dict
-                )
-                
-                # 合并结果
-                for hanzi, kanji in zip(file_hanzi, file_kanji):
-                    if hanzi not in hanzi_chars_list:
-                        hanzi_chars_list.append(hanzi)
-                        kanji_chars_list.append(kanji)
+                if manifest is not None:
+                    entry = manifest.get_unchanged(filename, json_file, output_file)
+                    if entry is not None:
+                        file_results[filename] = (entry["hanzi"], entry["kanji"], entry["count"])
+                        continue
                 
-                replacement_count += file_count
+                pending.append((filename, json_file, output_file))
             
-            # 生成配置字符串
-            config_string = self._generate_config_string(hanzi_chars_list, kanji_chars_list)
+            # 处理变化的文件
+            if parallel and len(pending) > 1:
+                workers = max_workers or os.cpu_count() or 1
+                with ProcessPoolExecutor(
+                    max_workers=min(workers, len(pending)),
+                    initializer=_init_replacement_worker,
+                    initargs=(char_dict,)
+                ) as pool:
+                    results = pool.map(
+                        _replace_json_file_task,
+                        [json_file for _, json_file, _ in pending],
+                        [output_file for _, _, output_file in pending],
+                        chunksize=max(1, len(pending) // (workers * 4))
+                    )
+                    for (filename, _, _), result in zip(pending, results):
+                        file_results[filename] = result
+            else:
+                for filename, json_file, output_file in pending:
+                    file_results[filename] = self._process_single_json_file(
+                        json_file, output_file, char_dict, translation_table
+                    )
             
-            return SJISReplacementResult(
+            # 更新清单并清理源文件已删除的输出
+            if manifest is not None:
+                for filename, json_file, _ in pending:
+                    manifest.update(filename, json_file, *file_results[filename])
+                
+                for filename in set(manifest.files) - set(file_results):
+                    del manifest.files[filename]
+                    FileOperations.delete_file(os.path.join(replaced_folder, filename))
+                
+                manifest.save(replaced_folder)
+            
+            return self.create_replacement_result(
+                [file_results[os.path.basename(json_file)] for json_file in json_files],
                 replaced_folder=replaced_folder,
-                hanzi_chars=hanzi_chars_list,
-                kanji_chars=kanji_chars_list,
-                replacement_count=replacement_count,
-                config_string=config_string
+                processed_files=len(pending),
+                skipped_files=len(json_files) - len(pending)
             )
         
         except Exception as e:
@@ -156,11 +429,76 @@ class SJISHandler:
                     pass
             raise RuntimeError(f"SJIS字符替换失败: {e}")
     
+    @staticmethod
+    def find_json_files(json_cn_folder: str) -> List[str]:
+        """获取需要替换的JSON文件（替换结果按此顺序合并）"""
+        return FileOperations.find_files_by_extension(json_cn_folder, ['.json'], recursive=False)
+    
+    def summarize_json_folder(
+        self,
+        json_cn_folder: str,
+        char_dict: Dict[str, str],
+        known_results: Dict[str, Tuple[List[str], List[str], int]]
+    ) -> SJISReplacementResult:
+        """按process_json_folder的文件顺序汇总替换结果（不写入文件）
+        
+        Args:
+            json_cn_folder: 中文JSON文件夹路径
+            char_dict: 替换所用的映射字典
+            known_results: 已在内存中替换的文件结果（键为JSON文件名），其余文件读取后统计
+        """
+        file_results = []
+        for json_file in self.find_json_files(json_cn_folder):
+            file_result = known_results.get(os.path.basename(json_file))
+            if file_result is None:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    file_result = self.count_replacements(f.read(), char_dict)
+            file_results.append(file_result)
+        return self.create_replacement_result(file_results)
+    
+    def create_replacement_result(
+        self,
+        file_results: List[Tuple[List[str], List[str], int]],
+        replaced_folder: str = "",
+        processed_files: int = 0,
+        skipped_files: int = 0
+    ) -> SJISReplacementResult:
+        """合并各文件的替换结果
+        
+        Args:
+            file_results: 按文件顺序排列的(汉字列表, 日文汉字列表, 替换数量)
+            replaced_folder: 替换后的文件夹（内存替换时为空）
+        """
+        # 合并结果（保持首次出现的顺序）
+        used_chars: Dict[str, str] = {}
+        replacement_count = 0
+        for file_hanzi, file_kanji, file_count in file_results:
+            for hanzi, kanji in zip(file_hanzi, file_kanji):
+                used_chars.setdefault(hanzi, kanji)
+            replacement_count += file_count
+        
+        hanzi_chars_list = list(used_chars.keys())
+        kanji_chars_list = list(used_chars.values())
+        
+        # 生成配置字符串
+        config_string = self._generate_config_string(hanzi_chars_list, kanji_chars_list)
+        
+        return SJISReplacementResult(
+            replaced_folder=replaced_folder,
+            hanzi_chars=hanzi_chars_list,
+            kanji_chars=kanji_chars_list,
+            replacement_count=replacement_count,
+            config_string=config_string,
+            processed_files=processed_files,
+            skipped_files=skipped_files
+        )
+    
+    @staticmethod
     def _process_single_json_file(
-        self, 
         input_file: str, 
         output_file: str, 
-        char_dict: Dict[str, str]
+        char_dict: Dict[str, str],
+        translation_table: Optional[Dict[int, str]] = None
     ) -> Tuple[List[str], List[str], int]:
         """处理单个JSON文件
         
@@ -172,24 +510,9 @@ class SJISHandler:
             with open(input_file, "r", encoding="utf-8") as f:
                 input_content = f.read()
             
-            output_content = ""
-            hanzi_chars = []
-            kanji_chars = []
-            replacement_count = 0
-            
-            # 逐字符处理
-            for char in input_content:
-                if char in char_dict:
-                    replacement_char = char_dict[char]
-                    output_content += replacement_char
-                    
-                    if char not in hanzi_chars:
-                        hanzi_chars.append(char)
-                        kanji_chars.append(replacement_char)
-                    
-                    replacement_count += 1
-                else:
-                    output_content += char
+            output_content, hanzi_chars, kanji_chars, replacement_count = SJISHandler.replace_text(
+                input_content, char_dict, translation_table
+            )
             
             # 写入输出文件
             with open(output_file, "w", encoding="utf-8") as f:
@@ -200,6 +523,50 @@ class SJISHandler:
         except Exception as e:
             raise RuntimeError(f"处理文件失败 {input_file}: {e}")
     
+    @staticmethod
+    def replace_text(
+        text: str,
+        char_dict: Dict[str, str],
+        translation_table: Optional[Dict[int, str]] = None
+    ) -> Tuple[str, List[str], List[str], int]:
+        """对文本执行字符替换
+        
+        Returns:
+            Tuple[str, List[str], List[str], int]: (替换后文本, 汉字列表, 日文汉字列表, 替换数量)
+        """
+        hanzi_chars, kanji_chars, replacement_count = SJISHandler.count_replacements(text, char_dict)
+        
+        if not hanzi_chars:
+            return text, hanzi_chars, kanji_chars, replacement_count
+        
+        if translation_table is None:
+            translation_table = SJISCharacterMapper._build_translation_table(char_dict)
+        
+        return text.translate(translation_table), hanzi_chars, kanji_chars, replacement_count
+    
+    @staticmethod
+    def count_replacements(
+        text: str,
+        char_dict: Dict[str, str]
+    ) -> Tuple[List[str], List[str], int]:
+        """统计文本中需要替换的字符
+        
+        Returns:
+            Tuple[List[str], List[str], int]: (汉字列表, 日文汉字列表, 替换数量)，按首次出现的顺序
+        """
+        hanzi_chars = []
+        kanji_chars = []
+        replacement_count = 0
+        
+        for char, count in Counter(text).items():
+            replacement_char = char_dict.get(char)
+            if replacement_char is not None:
+                hanzi_chars.append(char)
+                kanji_chars.append(replacement_char)
+                replacement_count += count
+        
+        return hanzi_chars, kanji_chars, replacement_count
+    
     def _generate_config_string(self, hanzi_chars: List[str], kanji_chars: List[str]) -> str:
         """生成配置字符串"""
         source_chars = "".join(kanji_chars)
@@ -315,16 +682,7 @@ class SJISReplacementValidator:
             return False, f"映射文件不存在: {mapping_file}"
         
         try:
-            with open(mapping_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            
-            valid_lines = 0
-            for line in lines:
-                line = line.strip()
-                if line and '\t' in line:
-                    parts = line.split('\t')
-                    if len(parts) >= 2:
-                        valid_lines += 1
+            valid_lines = SJISCharacterMapper.get_shared(mapping_file).get_mapping_stats()["total_mappings"]
             
             if valid_lines == 0:
                 return False, "映射文件中没有有效的映射条目"
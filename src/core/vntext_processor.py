@@ -9,6 +9,8 @@ from dataclasses import dataclass
 
 from ..utils.command_executor import VNTextPatchExecutor, ExecutionResult, ExecutionStatus
 from ..utils.validators import VNTextPatchValidator, ValidationSummary
+from ..utils.capability_cache import CapabilityCache
+from ..utils.progress import ProgressEvent, ToolOutputProgressParser
 from ..core.sjis_handler import SJISHandler, SJISExtBinaryHandler
 from ..core.file_operations import FileOperations
 
@@ -36,7 +38,10 @@ class VNTextProcessor:
         script_folder: str,
         json_folder: str,
         engine: Optional[str] = None,
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        shards: int = 1,
+        max_concurrency: Optional[int] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None
     ) -> VNTextProcessResult:
         """提取脚本文本到JSON
         
@@ -45,6 +50,9 @@ class VNTextProcessor:
             json_folder: JSON保存文件夹路径
             engine: 指定的引擎（可选）
             output_callback: 实时输出回调函数
+            shards: 分片数，大于1时并发运行多个VNTextPatch进程
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            progress_callback: 结构化进度回调（从工具输出中识别已处理的文件）
         
         Returns:
             VNTextProcessResult: 处理结果
@@ -65,10 +73,24 @@ class VNTextProcessor:
             # 确保输出目录存在
             FileOperations.ensure_dir_exists(json_folder)
             
+            progress = None
+            if progress_callback:
+                progress = ToolOutputProgressParser.create(script_folder, progress_callback)
+                output_callback = progress.wrap(output_callback)
+            
             # 执行提取命令
-            result = self.executor.extract(
-                script_folder, json_folder, engine, output_callback
-            )
+            if shards > 1:
+                result = self.executor.extract_sharded(
+                    script_folder, json_folder, engine,
+                    shards, max_concurrency, output_callback
+                )
+            else:
+                result = self.executor.extract(
+                    script_folder, json_folder, engine, output_callback
+                )
+            
+            if progress:
+                progress.finish()
             
             # 分析执行结果
             if result.status == ExecutionStatus.COMPLETED:
@@ -106,7 +128,12 @@ class VNTextProcessor:
         use_gbk: bool = False,
         sjis_replacement: bool = False,
         sjis_replace_chars: str = "",
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        shards: int = 1,
+        max_concurrency: Optional[int] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        sjis_incremental: bool = False,
+        sjis_parallel: bool = False
     ) -> VNTextProcessResult:
         """注入JSON文本回脚本
         
@@ -119,6 +146,11 @@ class VNTextProcessor:
             sjis_replacement: 是否启用SJIS替换模式
             sjis_replace_chars: SJIS替换字符
             output_callback: 实时输出回调函数
+            shards: 分片数，大于1时并发运行多个VNTextPatch进程
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            progress_callback: 结构化进度回调（从工具输出中识别已处理的文件）
+            sjis_incremental: SJIS替换时只重写源文件或映射发生变化的JSON文件
+            sjis_parallel: SJIS替换时使用多进程并行处理
         
         Returns:
             VNTextProcessResult: 处理结果
@@ -146,7 +178,10 @@ class VNTextProcessor:
             if sjis_replacement:
                 try:
                     sjis_result = self.sjis_handler.process_json_folder(
-                        json_folder, sjis_replace_chars
+                        json_folder, sjis_replace_chars,
+                        incremental=sjis_incremental,
+                        parallel=sjis_parallel,
+                        max_workers=max_concurrency
                     )
                     actual_json_folder = sjis_result.replaced_folder
                     sjis_config = sjis_result.config_string
@@ -163,11 +198,25 @@ class VNTextProcessor:
             # 清理可能存在的sjis_ext.bin文件
             SJISExtBinaryHandler.process_sjis_ext_output(output_folder)
             
+            progress = None
+            if progress_callback:
+                progress = ToolOutputProgressParser.create(script_folder, progress_callback)
+                output_callback = progress.wrap(output_callback)
+            
             # 执行注入命令
-            result = self.executor.inject(
-                script_folder, actual_json_folder, output_folder, 
-                engine, use_gbk, output_callback
-            )
+            if shards > 1:
+                result = self.executor.inject_sharded(
+                    script_folder, actual_json_folder, output_folder,
+                    engine, use_gbk, shards, max_concurrency, output_callback
+                )
+            else:
+                result = self.executor.inject(
+                    script_folder, actual_json_folder, output_folder, 
+                    engine, use_gbk, output_callback
+                )
+            
+            if progress:
+                progress.finish()
             
             # 检查sjis_ext.bin文件
             sjis_ext_content = SJISExtBinaryHandler.get_sjis_ext_content(output_folder)
@@ -256,8 +305,22 @@ class VNTextProcessor:
             "whale"
         ]
     
-    def check_vntextpatch_availability(self) -> VNTextProcessResult:
-        """检查VNTextPatch工具是否可用"""
+    def check_vntextpatch_availability(self, refresh: bool = False) -> VNTextProcessResult:
+        """检查VNTextPatch工具是否可用
+        
+        结果按工具目录缓存，目录内容变化后自动重新检查。
+        
+        Args:
+            refresh: 是否忽略缓存重新检查
+        """
+        if refresh:
+            CapabilityCache.invalidate(self.vntextpatch_dir, "vntextpatch_status")
+        return CapabilityCache.get_or_probe(
+            "vntextpatch_status", self.vntextpatch_dir, self._probe_vntextpatch_availability
+        )
+    
+    def _probe_vntextpatch_availability(self) -> VNTextProcessResult:
+        """检查两个VNTextPatch可执行文件是否存在"""
         try:
             vntextpatch_exe = os.path.join(self.vntextpatch_dir, "VNTextPatch.exe")
             vntextpatch_gbk_exe = os.path.join(self.vntextpatch_dir, "VNTextPatchGBK.exe")
@@ -132,6 +132,12 @@ class MainWindow:
             #     if hasattr(tab, 'cleanup'):
             #         tab.cleanup()
             
+            # 关闭输出组件的日志文件
+            for tab in self.tabs.values():
+                output_display = getattr(tab, 'output_display', None)
+                if output_display is not None:
+                    output_display.close()
+            
 
             
         except Exception as e:
@@ -169,7 +169,8 @@ class MsgToolTab:
         self.output_display = RealTimeOutputDisplay(
             self.frame,
             height=14,
-            width=50
+            width=50,
+            max_lines=5000
         )
         
         # 状态栏
@@ -370,6 +371,13 @@ class MsgToolTab:
         # 取消按钮状态
         cancel_state = "normal" if is_processing else "disabled"
         self.cancel_button.config(state=cancel_state)
+        
+        # 显示/隐藏进度条
+        if is_processing:
+            self.output_display.show_progress(True)
+            self.output_display.update_progress(0, "")
+        else:
+            self.output_display.show_progress(False)
     
     def _extract_text(self):
         """提取文本到JSON"""
@@ -404,7 +412,8 @@ class MsgToolTab:
                 engine if engine != "自动检测" else None,
                 encoding,
                 self.output_display.append_line,  # 使用append_line确保换行
-                on_completion
+                on_completion,
+                self.output_display.create_progress_callback()
             )
             
         except Exception as e:
@@ -478,7 +487,10 @@ class MsgToolTab:
                 sjis_replacement,
                 sjis_chars,
                 self.output_display.append_line,  # 使用append_line确保换行
-                on_completion
+                on_completion,
+                self.output_display.create_progress_callback(),
+                sjis_incremental=self.config.sjis_incremental,
+                sjis_parallel=self.config.sjis_parallel
             )
             
         except Exception as e:
@@ -553,6 +565,8 @@ class MsgToolTab:
         """清理资源"""
         if self._is_processing:
             self._cancel_operation()
+        
+        self.output_display.close()
     
     def _on_script_jp_path_changed(self, path: str):
         """当日文脚本文件夹路径变化时，自动更新相关文件夹路径"""
@@ -160,11 +160,20 @@ class RegexTab:
             command=self._test_regex
         )
         
+        # 增量处理选项（在JSON/输出文件夹中保存清单）
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.incremental_check = ttk.Checkbutton(
+            self.test_frame,
+            text="增量处理（跳过未修改的文件）",
+            variable=self.incremental_var
+        )
+        
         # 输出显示
         self.output_display = RealTimeOutputDisplay(
             self.frame,
             height=10,
-            width=50
+            width=50,
+            max_lines=5000
         )
         
         # 状态栏
@@ -254,6 +263,7 @@ class RegexTab:
         self.test_frame.grid(row=row, column=0, columnspan=3, 
                            sticky="ew", padx=5, pady=5)
         self.test_regex_button.pack(side=tk.LEFT, padx=5)
+        self.incremental_check.pack(side=tk.LEFT, padx=5)
         row += 1
         
         # 输出显示
@@ -290,6 +300,8 @@ class RegexTab:
         
         self.sjis_replace_var.set(self.config.sjis_replacement)
         self._toggle_sjis_options()
+        
+        self.incremental_var.set(self.config.regex_incremental)
     
     def _save_config(self):
         """保存界面值到配置"""
@@ -304,6 +316,7 @@ class RegexTab:
         self.config.chinese_encoding = self.cn_encoding_var.get()
         
         self.config.sjis_replacement = self.sjis_replace_var.get()
+        self.config.regex_incremental = self.incremental_var.get()
         
         #self.config.save_config()
     
@@ -318,6 +331,7 @@ class RegexTab:
         message_pattern = self.message_regex_var.get()
         name_pattern = self.name_regex_var.get()
         encoding = self.jp_encoding_var.get()
+        incremental = self.incremental_var.get()
         
         # 验证参数
         if not script_folder:
@@ -338,6 +352,7 @@ class RegexTab:
         
         # 创建输出回调
         output_callback = self.output_display.create_output_callback()
+        progress_callback = self.output_display.create_progress_callback()
         
         # 异步执行提取
         import threading
@@ -346,7 +361,9 @@ class RegexTab:
                 result = self.processor.extract_with_regex(
                     script_folder, json_folder, message_pattern,
                     name_pattern if name_pattern else None,
-                    encoding, output_callback
+                    encoding, output_callback,
+                    progress_callback=progress_callback,
+                    incremental=incremental
                 )
                 
                 # 在主线程中更新界面
@@ -373,6 +390,7 @@ class RegexTab:
         cn_encoding = self.cn_encoding_var.get()
         sjis_replacement = self.sjis_replace_var.get()
         sjis_chars = self.sjis_char_var.get()
+        incremental = self.incremental_var.get()
         
         # 验证参数
         if not script_folder:
@@ -401,6 +419,7 @@ class RegexTab:
         
         # 创建输出回调
         output_callback = self.output_display.create_output_callback()
+        progress_callback = self.output_display.create_progress_callback()
         
         # 异步执行注入
         import threading
@@ -410,7 +429,9 @@ class RegexTab:
                     script_folder, json_jp_folder, json_cn_folder, output_folder,
                     message_pattern, name_pattern if name_pattern else None,
                     jp_encoding, cn_encoding, sjis_replacement, sjis_chars,
-                    output_callback
+                    output_callback,
+                    progress_callback=progress_callback,
+                    incremental=incremental
                 )
                 
                 # 在主线程中更新界面
@@ -573,5 +594,5 @@ class RegexTab:
         if self._is_processing:
             self._cancel_operation()
         
-        self.output_display.stop_output_monitoring()
+        self.output_display.close()
         self._save_config()
\ No newline at end of file
@@ -149,7 +149,8 @@ class VNTextTab:
         self.output_display = RealTimeOutputDisplay(
             self.frame,
             height=14,
-            width=50
+            width=50,
+            max_lines=5000
         )
         
         # 状态栏
@@ -296,6 +297,7 @@ class VNTextTab:
         
         # 创建输出回调
         output_callback = self.output_display.create_output_callback()
+        progress_callback = self.output_display.create_progress_callback()
         
         # 异步执行提取
         import threading
@@ -304,7 +306,8 @@ class VNTextTab:
                 result = self.processor.extract_text(
                     script_folder, json_folder, 
                     engine if engine != "自动判断" else None,
-                    output_callback
+                    output_callback,
+                    progress_callback=progress_callback
                 )
                 
                 # 在主线程中更新界面
@@ -348,6 +351,7 @@ class VNTextTab:
         
         # 创建输出回调
         output_callback = self.output_display.create_output_callback()
+        progress_callback = self.output_display.create_progress_callback()
         
         # 异步执行注入
         import threading
@@ -357,7 +361,10 @@ class VNTextTab:
                     script_folder, json_folder, output_folder,
                     engine if engine != "自动判断" else None,
                     use_gbk, sjis_replacement, sjis_chars,
-                    output_callback
+                    output_callback,
+                    progress_callback=progress_callback,
+                    sjis_incremental=self.config.sjis_incremental,
+                    sjis_parallel=self.config.sjis_parallel
                 )
                 
                 # 在主线程中更新界面
@@ -474,7 +481,7 @@ class VNTextTab:
         if self._is_processing:
             self._cancel_operation()
         
-        self.output_display.stop_output_monitoring()
+        self.output_display.close()
         self._save_config()
     
     def _on_script_jp_path_changed(self, path: str):
@@ -3,12 +3,18 @@
 可复用的输出结果显示组件
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Tuple
 import threading
 import queue
 import time
+import re
+import tempfile
+
+from ...utils.log_writer import RotatingLogWriter
+from ...utils.progress import ProgressEvent
 
 
 class OutputDisplay:
@@ -20,7 +26,12 @@ class OutputDisplay:
         height: int = 14,
         width: int = 50,
         wrap: str = tk.WORD,
-        show_toolbar: bool = True
+        show_toolbar: bool = True,
+        batch_mode: bool = True,
+        max_items_per_tick: int = 2000,
+        poll_interval: int = 100,
+        max_lines: Optional[int] = None,
+        log_path: Optional[str] = None
     ):
         """
         Args:
@@ -29,12 +40,31 @@ class OutputDisplay:
             width: 文本框宽度
             wrap: 文本换行模式
             show_toolbar: 是否显示工具栏
+            batch_mode: 是否批量合并每次轮询取出的输出（一次插入、一次滚动）
+            max_items_per_tick: 每次轮询最多处理的输出条数，超出部分留到下一轮
+            poll_interval: 队列轮询间隔（毫秒）
+            max_lines: 文本框最多保留的行数（None表示不限制）；限制时完整输出写入日志文件
+            log_path: 完整输出的日志文件路径，max_lines生效且未指定时使用临时文件
         """
         self.parent = parent
         self.height = height
         self.width = width
         self.wrap = wrap
         self.show_toolbar = show_toolbar
+        self.batch_mode = batch_mode
+        self.max_items_per_tick = max(1, max_items_per_tick)
+        self.poll_interval = poll_interval
+        self.max_lines = max_lines
+        
+        # 完整输出的滚动日志
+        self._log_writer: Optional[RotatingLogWriter] = None
+        self._owns_log_file = False
+        if max_lines is not None or log_path:
+            if not log_path:
+                fd, log_path = tempfile.mkstemp(prefix="output_", suffix=".log")
+                os.close(fd)
+                self._owns_log_file = True
+            self._log_writer = RotatingLogWriter(log_path)
         
         # 输出队列（用于线程安全的输出）
         self._output_queue = queue.Queue()
@@ -171,27 +201,100 @@ class OutputDisplay:
     
     def _process_output_queue(self):
         """处理输出队列"""
-        try:
-            while True:
-                item = self._output_queue.get_nowait()
-                if item[0] == 'text':
-                    _, text, tag = item
-                    self._append_text_internal(text, tag)
-                elif item[0] == 'clear':
-                    self._clear_internal()
-                elif item[0] == 'progress':
-                    _, value, text = item
-                    self._update_progress_internal(value, text)
-        except queue.Empty:
-            pass
-        
-        # 继续监控
+        if self.batch_mode:
+            has_more = self._process_output_batch()
+        else:
+            has_more = False
+            try:
+                while True:
+                    item = self._output_queue.get_nowait()
+                    if item[0] == 'text':
+                        _, text, tag = item
+                        self._append_text_internal(text, tag)
+                    elif item[0] == 'clear':
+                        self._clear_internal()
+                    elif item[0] == 'progress':
+                        _, value, text = item
+                        self._update_progress_internal(value, text)
+            except queue.Empty:
+                pass
+        
+        # 继续监控（队列未处理完时尽快进行下一轮，中间让出主循环处理界面事件）
         if self._is_monitoring:
-            self.parent.after(100, self._process_output_queue)
+            self.parent.after(1 if has_more else self.poll_interval, self._process_output_queue)
+    
+    def _process_output_batch(self) -> bool:
+        """按预算批量处理输出队列
+        
+        连续的文本按标签合并为若干段，一次insert写入，整批只滚动一次；
+        同一批中的多个进度更新只应用最后一个。
+        
+        Returns:
+            bool: 队列中是否还有未处理的输出
+        """
+        runs: List[Tuple[List[str], Optional[str]]] = []
+        progress: Optional[Tuple[float, str]] = None
+        
+        for _ in range(self.max_items_per_tick):
+            try:
+                item = self._output_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if item[0] == 'text':
+                _, text, tag = item
+                self._coalesce_text(runs, text, tag)
+            elif item[0] == 'clear':
+                # 清空前的文本无需写入
+                runs = []
+                self._clear_internal()
+            elif item[0] == 'progress':
+                progress = item[1:]
+        else:
+            self._flush_text_runs(runs)
+            self._apply_progress(progress)
+            return not self._output_queue.empty()
+        
+        self._flush_text_runs(runs)
+        self._apply_progress(progress)
+        return False
+    
+    def _apply_progress(self, progress: Optional[Tuple[float, str]]):
+        """应用批次中最后一次进度更新"""
+        if progress is not None:
+            self._update_progress_internal(*progress)
+    
+    @staticmethod
+    def _coalesce_text(runs: List[Tuple[List[str], Optional[str]]], text: str, tag: Optional[str]):
+        """将文本合并到相同标签的末尾段"""
+        if runs and runs[-1][1] == tag:
+            runs[-1][0].append(text)
+        else:
+            runs.append(([text], tag))
+    
+    def _flush_text_runs(self, runs: List[Tuple[List[str], Optional[str]]]):
+        """一次写入所有文本段并滚动到底部"""
+        if not runs:
+            return
+        
+        # Text.insert支持 text, tags, text, tags... 形式的多段参数
+        args = []
+        for parts, tag in runs:
+            args.extend(("".join(parts), tag or ()))
+        self.text_widget.insert(tk.END, *args)
+        if self._log_writer:
+            self._log_writer.write("".join(args[0::2]))
+        self._trim_widget()
+        
+        if self.auto_scroll_var.get():
+            self.text_widget.see(tk.END)
     
     def _append_text_internal(self, text: str, tag: Optional[str] = None):
         """内部追加文本方法"""
         self.text_widget.insert(tk.END, text, tag)
+        if self._log_writer:
+            self._log_writer.write(text)
+        self._trim_widget()
         
         # 自动滚动到底部
         if self.auto_scroll_var.get():
@@ -204,11 +307,29 @@ class OutputDisplay:
     def _clear_internal(self):
         """内部清空方法"""
         self.text_widget.delete(1.0, tk.END)
+        if self._log_writer:
+            self._log_writer.reset()
+    
+    def _trim_widget(self):
+        """删除超出max_lines的最早行"""
+        if self.max_lines is None:
+            return
+        
+        # "end-1c"的行号即文本框中的行数
+        line_count = int(self.text_widget.index("end-1c").split(".")[0])
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.text_widget.delete("1.0", f"{excess + 1}.0")
     
     def get_text(self) -> str:
-        """获取所有文本"""
+        """获取文本框中的文本（限制行数时只包含最近的输出，完整输出见log_path）"""
         return self.text_widget.get(1.0, tk.END)
     
+    @property
+    def log_path(self) -> Optional[str]:
+        """完整输出的日志文件路径"""
+        return self._log_writer.path if self._log_writer else None
+    
     def set_label_text(self, text: str):
         """设置标签文本"""
         self.label.config(text=text)
@@ -224,6 +345,13 @@ class OutputDisplay:
         """更新进度"""
         self._output_queue.put(('progress', value, text))
     
+    def create_progress_callback(self) -> Callable[[ProgressEvent], None]:
+        """创建结构化进度回调，将ProgressEvent显示到进度条"""
+        def callback(event: ProgressEvent):
+            self.update_progress(event.percent, event.format())
+        
+        return callback
+    
     def _update_progress_internal(self, value: float, text: str):
         """内部更新进度方法"""
         self.progress_var.set(value)
@@ -238,6 +366,18 @@ class OutputDisplay:
         """停止输出监控"""
         self._is_monitoring = False
     
+    def close(self):
+        """停止输出监控并关闭日志文件（临时日志文件会被删除）"""
+        self.stop_output_monitoring()
+        if self._log_writer:
+            self._log_writer.close()
+            if self._owns_log_file:
+                for log_file in self._log_writer.get_log_files():
+                    try:
+                        os.remove(log_file)
+                    except OSError:
+                        pass
+    
     def _save_log(self):
         """保存日志"""
         from tkinter import filedialog
@@ -249,8 +389,12 @@ class OutputDisplay:
         
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.get_text())
+                if self._log_writer:
+                    # 直接复制完整日志，无需从文本框读取
+                    self._log_writer.copy_to(file_path)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(self.get_text())
                 self.append_line(f"日志已保存到: {file_path}")
             except Exception as e:
                 self.append_line(f"保存日志失败: {str(e)}")
@@ -291,18 +435,37 @@ class RealTimeOutputDisplay(OutputDisplay):
             "info": {"foreground": "blue"}
         })
     
-    def create_output_callback(self) -> Callable[[str], None]:
-        """创建输出回调函数，用于实时接收输出"""
+    # 日志级别关键字（按优先级排列）；先用合并的正则一次扫描，绝大多数普通行无需逐级判断
+    LEVEL_KEYWORDS = (
+        ("error", ("error", "失败")),
+        ("warning", ("warning", "警告")),
+        ("success", ("success", "完成", "成功")),
+    )
+    _LEVEL_PATTERN = re.compile(
+        "|".join(re.escape(k) for _, keywords in LEVEL_KEYWORDS for k in keywords),
+        re.IGNORECASE
+    )
+    
+    @classmethod
+    def classify_line(cls, text: str) -> Optional[str]:
+        """识别输出行的日志级别标签，普通行返回None"""
+        if not cls._LEVEL_PATTERN.search(text):
+            return None
+        
+        text_lower = text.lower()
+        for tag, keywords in cls.LEVEL_KEYWORDS:
+            if any(keyword in text_lower for keyword in keywords):
+                return tag
+        return None
+    
+    def create_output_callback(self, classify: bool = True) -> Callable[[str], None]:
+        """创建输出回调函数，用于实时接收输出
+        
+        Args:
+            classify: 是否按关键字识别日志级别并着色
+        """
         def callback(text: str):
             # 简单的日志级别识别
-            text_lower = text.lower()
-            if "error" in text_lower or "失败" in text_lower:
-                self.add_error_text(text)
-            elif "warning" in text_lower or "警告" in text_lower:
-                self.add_warning_text(text)
-            elif "success" in text_lower or "完成" in text_lower or "成功" in text_lower:
-                self.add_success_text(text)
-            else:
-                self.append_line(text)
-        
-        return callback
\ No newline at end of file
+            self.append_line(text, self.classify_line(text) if classify else None)
+        
+        return callback
@@ -151,6 +151,30 @@ class Config:
     def gbk_encoding(self, value: bool):
         self.set_bool("Advanced", "gbk_encoding", value)
     
+    @property
+    def regex_incremental(self) -> bool:
+        return self.get_bool("Advanced", "regex_incremental")
+    
+    @regex_incremental.setter
+    def regex_incremental(self, value: bool):
+        self.set_bool("Advanced", "regex_incremental", value)
+    
+    @property
+    def sjis_incremental(self) -> bool:
+        return self.get_bool("Advanced", "sjis_incremental")
+    
+    @sjis_incremental.setter
+    def sjis_incremental(self, value: bool):
+        self.set_bool("Advanced", "sjis_incremental", value)
+    
+    @property
+    def sjis_parallel(self) -> bool:
+        return self.get_bool("Advanced", "sjis_parallel")
+    
+    @sjis_parallel.setter
+    def sjis_parallel(self, value: bool):
+        self.set_bool("Advanced", "sjis_parallel", value)
+    
     # Msg-tool专用配置项
     @property
     def msgtool_script_jp_folder(self) -> str:
@@ -0,0 +1,294 @@
+"""
+增量处理清单模型类
+记录上次处理时各脚本文件的内容哈希与处理参数，用于跳过未修改的文件
+"""
+
+from dataclasses import dataclass, asdict, field
+from typing import Optional, Dict, Any, List
+import hashlib
+import json
+import os
+
+
+@dataclass
+class ManifestEntry:
+    """单个脚本文件的清单条目"""
+    content_hash: str
+    size: int
+    mtime_ns: int
+    config_key: str
+    matches: int = 0
+    output_mtime_ns: int = 0
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ManifestEntry':
+        """从字典创建实例"""
+        return cls(
+            content_hash=data["content_hash"],
+            size=data["size"],
+            mtime_ns=data["mtime_ns"],
+            config_key=data["config_key"],
+            matches=data.get("matches", 0),
+            output_mtime_ns=data.get("output_mtime_ns", 0)
+        )
+
+
+@dataclass
+class FileFingerprint:
+    """输入文件的大小、修改时间与内容哈希"""
+    size: int
+    mtime_ns: int
+    content_hash: str
+
+
+@dataclass
+class InjectionEntry:
+    """单个输出脚本的注入清单条目"""
+    config_key: str
+    inputs: Dict[str, Optional[FileFingerprint]]
+    stats: Dict[str, Any] = field(default_factory=dict)
+    mapping_digest: Optional[str] = None
+    output_mtime_ns: int = 0
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'InjectionEntry':
+        """从字典创建实例"""
+        return cls(
+            config_key=data["config_key"],
+            inputs={
+                role: FileFingerprint(**fingerprint) if fingerprint else None
+                for role, fingerprint in data["inputs"].items()
+            },
+            stats=data.get("stats", {}),
+            mapping_digest=data.get("mapping_digest"),
+            output_mtime_ns=data.get("output_mtime_ns", 0)
+        )
+
+
+class FileManifest:
+    """增量处理清单基类
+    
+    以文件名为键保存条目，整体以JSON格式写入处理输出所在的文件夹。
+    """
+    
+    FILENAME = ".manifest"
+    VERSION = 1
+    ENTRY_TYPE: Any = None
+    _HASH_CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.entries: Dict[str, Any] = {}
+    
+    @classmethod
+    def for_folder(cls, folder: str):
+        """获取输出文件夹对应的清单，文件不存在或损坏时返回空清单"""
+        manifest = cls(os.path.join(folder, cls.FILENAME))
+        try:
+            manifest.load()
+        except (OSError, ValueError, KeyError, TypeError):
+            manifest.entries.clear()
+        return manifest
+    
+    @classmethod
+    def compute_config_key(cls, *params: Any) -> str:
+        """根据处理参数（编码、正则表达式等）计算参数键"""
+        text = json.dumps([cls.VERSION, *params], ensure_ascii=False)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def compute_file_hash(file_path: str) -> str:
+        """计算文件内容哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FileManifest._HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def output_unchanged(output_path: str, output_mtime_ns: int) -> bool:
+        """检查上次生成的输出文件是否仍存在且未被改动"""
+        try:
+            return os.stat(output_path).st_mtime_ns == output_mtime_ns
+        except OSError:
+            return False
+    
+    def discard(self, filename: str):
+        """移除文件的记录"""
+        self.entries.pop(filename, None)
+    
+    def retain(self, filenames):
+        """只保留指定文件的记录（清理已删除的脚本）"""
+        keep = set(filenames)
+        for filename in [name for name in self.entries if name not in keep]:
+            del self.entries[filename]
+    
+    def load(self):
+        """从清单文件加载"""
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != self.VERSION:
+            raise ValueError(f"不支持的清单版本: {self.file_path}")
+        self.entries = {
+            filename: self.ENTRY_TYPE.from_dict(entry)
+            for filename, entry in data["entries"].items()
+        }
+    
+    def save(self):
+        """保存到清单文件（先写临时文件再替换）"""
+        data = {
+            "version": self.VERSION,
+            "entries": {filename: asdict(entry) for filename, entry in self.entries.items()}
+        }
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.file_path)
+
+
+class ExtractionManifest(FileManifest):
+    """正则提取清单
+    
+    保存在JSON输出文件夹中，按脚本文件名记录(内容哈希, 处理参数)。文件大小与修改时间
+    未变时直接信任记录的哈希，否则重新计算哈希；哈希与参数都一致且输出文件未被改动的
+    脚本无需再次提取。清单使用非.json扩展名，避免被当作翻译JSON读取。
+    """
+    
+    FILENAME = ".extract.manifest"
+    ENTRY_TYPE = ManifestEntry
+    
+    def lookup(
+        self,
+        filename: str,
+        file_path: str,
+        output_path: str,
+        config_key: str
+    ) -> Optional[ManifestEntry]:
+        """检查文件是否与上次处理时一致
+        
+        Args:
+            filename: 清单中的文件名
+            file_path: 脚本文件路径
+            output_path: 上次处理生成的输出文件路径
+            config_key: 本次处理的参数键
+        
+        Returns:
+            Optional[ManifestEntry]: 一致时返回条目（修改时间已更新），否则返回None
+        """
+        entry = self.entries.get(filename)
+        if entry is None or entry.config_key != config_key:
+            return None
+        
+        if not self.output_unchanged(output_path, entry.output_mtime_ns):
+            return None
+        
+        stat = os.stat(file_path)
+        if stat.st_size != entry.size:
+            return None
+        if stat.st_mtime_ns != entry.mtime_ns:
+            # 修改时间变化但内容可能相同（如重新复制），按哈希确认
+            if self.compute_file_hash(file_path) != entry.content_hash:
+                return None
+            entry.mtime_ns = stat.st_mtime_ns
+        return entry
+    
+    @classmethod
+    def snapshot(cls, file_path: str, config_key: str) -> ManifestEntry:
+        """在处理前记录文件的大小、修改时间与内容哈希"""
+        stat = os.stat(file_path)
+        return ManifestEntry(
+            content_hash=cls.compute_file_hash(file_path),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            config_key=config_key
+        )
+    
+    def record(self, filename: str, entry: ManifestEntry, output_path: str):
+        """记录处理完成的文件及其输出文件"""
+        entry.output_mtime_ns = os.stat(output_path).st_mtime_ns
+        self.entries[filename] = entry
+
+
+class InjectionManifest(FileManifest):
+    """正则注入清单
+    
+    保存在输出脚本文件夹中，按输出文件名记录生成它的各个输入文件（日文脚本、日文JSON、
+    译文JSON等）的指纹、处理参数与注入统计。输入与参数都未变化且输出文件未被改动时
+    无需重新生成；源脚本已不存在的输出可据此删除。
+    """
+    
+    FILENAME = ".inject.manifest"
+    ENTRY_TYPE = InjectionEntry
+    
+    @classmethod
+    def fingerprint(cls, file_path: str) -> Optional[FileFingerprint]:
+        """计算输入文件的指纹，文件不存在时返回None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return FileFingerprint(stat.st_size, stat.st_mtime_ns, cls.compute_file_hash(file_path))
+    
+    @classmethod
+    def fingerprint_unchanged(cls, file_path: str, fingerprint: Optional[FileFingerprint]) -> bool:
+        """检查输入文件是否与记录的指纹一致（修改时间变化时按哈希确认并更新记录）"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return fingerprint is None
+        if fingerprint is None or stat.st_size != fingerprint.size:
+            return False
+        if stat.st_mtime_ns != fingerprint.mtime_ns:
+            if cls.compute_file_hash(file_path) != fingerprint.content_hash:
+                return False
+            fingerprint.mtime_ns = stat.st_mtime_ns
+        return True
+    
+    def lookup(
+        self,
+        filename: str,
+        input_paths: Dict[str, str],
+        output_path: str,
+        config_key: str
+    ) -> Optional[InjectionEntry]:
+        """检查输出文件的输入与参数是否与上次注入时一致
+        
+        Args:
+            filename: 输出文件名
+            input_paths: 各输入文件的路径（按用途命名）
+            output_path: 输出文件路径
+            config_key: 本次注入的参数键
+        
+        Returns:
+            Optional[InjectionEntry]: 一致时返回条目，否则返回None
+        """
+        entry = self.entries.get(filename)
+        if entry is None or entry.config_key != config_key:
+            return None
+        if set(entry.inputs) != set(input_paths):
+            return None
+        if not self.output_unchanged(output_path, entry.output_mtime_ns):
+            return None
+        
+        for role, path in input_paths.items():
+            if not self.fingerprint_unchanged(path, entry.inputs[role]):
+                return None
+        return entry
+    
+    @classmethod
+    def snapshot(cls, input_paths: Dict[str, str], config_key: str) -> InjectionEntry:
+        """在注入前记录各输入文件的指纹"""
+        return InjectionEntry(
+            config_key=config_key,
+            inputs={role: cls.fingerprint(path) for role, path in input_paths.items()}
+        )
+    
+    def record(self, filename: str, entry: InjectionEntry, output_path: str):
+        """记录注入完成的输出文件"""
+        entry.output_mtime_ns = os.stat(output_path).st_mtime_ns
+        self.entries[filename] = entry
+    
+    def stale_outputs(self, filenames) -> List[str]:
+        """获取源脚本已不存在的输出文件名"""
+        current = set(filenames)
+        return [filename for filename in self.entries if filename not in current]
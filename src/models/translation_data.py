@@ -4,8 +4,13 @@
 """
 
 from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from array import array
 import json
+import os
+import struct
+import sys
+import zlib
 
 
 @dataclass
@@ -80,6 +85,108 @@ class TranslationData:
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return cls.from_json_list(data)
+    
+    @classmethod
+    def from_json_text(cls, text: str) -> 'TranslationData':
+        """从JSON文本创建实例"""
+        return cls.from_json_list(json.loads(text))
+
+
+class SpanIndex:
+    """翻译条目在脚本中的位置索引
+    
+    提取时与JSON一同保存为侧车文件，记录每个条目消息（及人名）在解码后脚本中的
+    字符偏移，注入时可据此直接拼接译文而无需再次执行正则匹配。
+    """
+    
+    MAGIC = b"GTSP"
+    VERSION = 1
+    SUFFIX = ".spans"
+    _HEADER = struct.Struct("<4sHIQI")
+    
+    def __init__(self, content_length: int = 0, checksum: int = 0):
+        self.content_length = content_length
+        self.checksum = checksum
+        self.message_spans: List[Tuple[int, int]] = []
+        self.name_spans: List[Optional[Tuple[int, int]]] = []
+    
+    @classmethod
+    def for_content(cls, content: str) -> 'SpanIndex':
+        """为指定脚本内容创建空索引"""
+        return cls(len(content), cls.compute_checksum(content))
+    
+    @staticmethod
+    def compute_checksum(content: str) -> int:
+        """计算脚本内容的校验值"""
+        return zlib.crc32(content.encode('utf-8', errors='surrogatepass'))
+    
+    @staticmethod
+    def sidecar_path(json_path: str) -> str:
+        """获取JSON文件对应的索引文件路径"""
+        return os.path.splitext(json_path)[0] + SpanIndex.SUFFIX
+    
+    def add_span(
+        self,
+        message_span: Tuple[int, int],
+        name_span: Optional[Tuple[int, int]] = None
+    ):
+        """添加一个条目的位置"""
+        self.message_spans.append(message_span)
+        self.name_spans.append(name_span)
+    
+    def matches_content(self, content: str) -> bool:
+        """检查索引是否由指定脚本内容生成"""
+        return (
+            len(content) == self.content_length
+            and self.compute_checksum(content) == self.checksum
+        )
+    
+    def __len__(self) -> int:
+        """返回条目数量"""
+        return len(self.message_spans)
+    
+    def save_to_file(self, file_path: str):
+        """保存到索引文件"""
+        values = array('q')
+        for message_span, name_span in zip(self.message_spans, self.name_spans):
+            values.extend(message_span)
+            values.extend(name_span if name_span else (-1, -1))
+        if sys.byteorder != "little":
+            values.byteswap()
+        
+        with open(file_path, 'wb') as f:
+            f.write(self._HEADER.pack(
+                self.MAGIC, self.VERSION, len(self),
+                self.content_length, self.checksum
+            ))
+            values.tofile(f)
+    
+    @classmethod
+    def load_from_file(cls, file_path: str) -> 'SpanIndex':
+        """从索引文件加载"""
+        with open(file_path, 'rb') as f:
+            header = f.read(cls._HEADER.size)
+            if len(header) != cls._HEADER.size:
+                raise ValueError(f"索引文件格式错误: {file_path}")
+            
+            magic, version, count, content_length, checksum = cls._HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f"不支持的索引文件: {file_path}")
+            
+            values = array('q')
+            values.fromfile(f, count * 4)
+        
+        if sys.byteorder != "little":
+            values.byteswap()
+        
+        span_index = cls(content_length, checksum)
+        for i in range(0, len(values), 4):
+            name_start, name_end = values[i + 2], values[i + 3]
+            span_index.add_span(
+                (values[i], values[i + 1]),
+                (name_start, name_end) if name_start >= 0 else None
+            )
+        return span_index
 
 
 class TranslationMapping:
@@ -0,0 +1,95 @@
+"""
+工具能力探测缓存
+缓存外部工具的可用性、版本及系统代码页等探测结果，避免重复启动子进程
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CapabilityCache:
+    """工具能力探测缓存
+    
+    按 (探测名称, 路径) 缓存探测结果，并记录路径的指纹 (mtime_ns, size)。
+    路径对应的文件或目录发生变化（包括创建、删除）时结果自动失效；
+    路径为None的探测（如系统代码页）在进程内只执行一次，直至显式失效。
+    """
+    
+    _MISSING = object()
+    
+    _cache: Dict[Tuple[str, Optional[str]], Tuple[Optional[Tuple[int, int]], Any]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint(path: str) -> Optional[Tuple[int, int]]:
+        """获取路径指纹，路径不存在时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    @staticmethod
+    def _key(name: str, path: Optional[str]) -> Tuple[str, Optional[str]]:
+        """生成缓存键"""
+        return name, os.path.abspath(path) if path is not None else None
+    
+    @staticmethod
+    def get(name: str, path: Optional[str] = None, default: Any = None) -> Any:
+        """获取仍然有效的缓存结果
+        
+        Args:
+            name: 探测名称
+            path: 探测结果所依赖的文件或目录
+            default: 无有效缓存时的返回值
+        """
+        key = CapabilityCache._key(name, path)
+        current = CapabilityCache.fingerprint(key[1]) if path is not None else None
+        
+        with CapabilityCache._lock:
+            entry = CapabilityCache._cache.get(key)
+            if entry is None or entry[0] != current:
+                return default
+            return entry[1]
+    
+    @staticmethod
+    def put(name: str, path: Optional[str], value: Any):
+        """保存探测结果（记录当前路径指纹）"""
+        key = CapabilityCache._key(name, path)
+        current = CapabilityCache.fingerprint(key[1]) if path is not None else None
+        
+        with CapabilityCache._lock:
+            CapabilityCache._cache[key] = (current, value)
+    
+    @staticmethod
+    def get_or_probe(name: str, path: Optional[str], probe: Callable[[], Any]) -> Any:
+        """获取缓存结果，无有效缓存时执行探测并缓存
+        
+        Args:
+            name: 探测名称
+            path: 探测结果所依赖的文件或目录，None表示进程级结果
+            probe: 探测函数
+        """
+        value = CapabilityCache.get(name, path, CapabilityCache._MISSING)
+        if value is CapabilityCache._MISSING:
+            value = probe()
+            CapabilityCache.put(name, path, value)
+        return value
+    
+    @staticmethod
+    def invalidate(path: Optional[str] = None, name: Optional[str] = None):
+        """使缓存失效
+        
+        Args:
+            path: 只清除该路径的结果（None表示所有路径）
+            name: 只清除该探测名称的结果（None表示所有探测）
+        """
+        abs_path = os.path.abspath(path) if path is not None else None
+        with CapabilityCache._lock:
+            for key in list(CapabilityCache._cache):
+                if name is not None and key[0] != name:
+                    continue
+                if path is not None and key[1] != abs_path:
+                    continue
+                del CapabilityCache._cache[key]
@@ -3,16 +3,26 @@
 安全执行外部命令并处理输出
 """
 
+import asyncio
+import codecs
+import heapq
+import itertools
+import signal
 import subprocess
 import threading
 import time
-from typing import Optional, Callable, Dict, Any, List
-from dataclasses import dataclass
+from typing import Optional, Callable, Dict, Any, List, Tuple, Sequence, Union, Deque
+from dataclasses import dataclass, field, replace
+from collections import deque, OrderedDict
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import locale
 import os
 
+from ..core.file_operations import FileOperations, TempFileManager
+from .capability_cache import CapabilityCache
+
 
 class ExecutionStatus(Enum):
     """执行状态枚举"""
@@ -23,6 +33,16 @@ class ExecutionStatus(Enum):
     CANCELLED = "cancelled"
 
 
+@dataclass
+class ShardTiming:
+    """分片执行耗时统计"""
+    index: int
+    file_count: int
+    total_bytes: int
+    execution_time: float
+    status: ExecutionStatus
+
+
 @dataclass
 class ExecutionResult:
     """执行结果数据类"""
@@ -33,15 +53,121 @@ class ExecutionResult:
     execution_time: float
     command: str
     error_message: Optional[str] = None
+    shard_timings: List[ShardTiming] = field(default_factory=list)
+    dropped_lines: int = 0
+    log_file: Optional[str] = None
+
+
+@dataclass
+class OutputCaptureConfig:
+    """输出捕获配置
+    
+    启用后stdout/stderr各自只在内存中保留开头head_lines行与末尾tail_lines行，
+    中间的行只计数；设置spill_path时完整输出同时写入该日志文件。
+    """
+    head_lines: int = 200
+    tail_lines: int = 2000
+    spill_path: Optional[str] = None
+    
+    def for_shard(self, index: int) -> 'OutputCaptureConfig':
+        """为分片生成独立的配置（日志文件名追加分片序号）"""
+        spill_path = None
+        if self.spill_path:
+            root, ext = os.path.splitext(self.spill_path)
+            spill_path = f"{root}.shard{index + 1}{ext}"
+        return replace(self, spill_path=spill_path)
+
+
+class OutputBuffer:
+    """命令输出缓冲区
+    
+    未提供配置时完整保留输出；否则以首尾环形缓冲保留有限行数，
+    内存占用与工具输出量无关。
+    """
+    
+    def __init__(self, config: Optional[OutputCaptureConfig] = None, spill_file=None):
+        self.config = config
+        self.spill_file = spill_file
+        self.dropped_lines = 0
+        self._chunks: List[str] = []
+        self._head: List[str] = []
+        self._tail: Deque[str] = deque(maxlen=config.tail_lines if config else None)
+        self._partial = ""
+    
+    def write(self, text: str):
+        """写入一段已解码的输出文本"""
+        if self.spill_file is not None:
+            self.spill_file.write(text)
+        
+        if self.config is None:
+            self._chunks.append(text)
+            return
+        
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._add_line(line + "\n")
+    
+    def _add_line(self, line: str):
+        """按首尾缓冲规则保存一行"""
+        if len(self._head) < self.config.head_lines:
+            self._head.append(line)
+            return
+        if len(self._tail) == self._tail.maxlen:
+            self.dropped_lines += 1
+        self._tail.append(line)
+    
+    def getvalue(self) -> str:
+        """获取保留的输出文本"""
+        if self.config is None:
+            return "".join(self._chunks)
+        
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+        
+        parts = list(self._head)
+        if self.dropped_lines:
+            parts.append(f"... 省略 {self.dropped_lines} 行输出 ...\n")
+        parts.extend(self._tail)
+        return "".join(parts)
 
 
 class CommandExecutor:
     """命令执行器"""
     
-    def __init__(self, working_dir: Optional[str] = None):
+    # 每次从管道读取的字节数
+    READ_CHUNK_SIZE = 64 * 1024
+    # 终止进程后等待其退出/管道关闭的秒数
+    TERMINATE_GRACE = 5
+    # 检查进程是否退出的轮询间隔（秒），从最小值逐步加倍到最大值
+    EXIT_POLL_MIN = 0.001
+    EXIT_POLL_MAX = 0.05
+    
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        capture: Optional[OutputCaptureConfig] = None
+    ):
+        """
+        初始化命令执行器
+        
+        Args:
+            working_dir: 命令工作目录
+            capture: 输出捕获配置，None表示在内存中完整保留输出
+        """
         self.working_dir = working_dir
-        self._process: Optional[subprocess.Popen] = None
+        self.capture = capture
+        self._process: Optional[asyncio.subprocess.Process] = None
         self._cancelled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancel_event: Optional[asyncio.Event] = None
+        self._shard_executors: List['CommandExecutor'] = []
+    
+    @staticmethod
+    def format_command(command: Union[str, Sequence[str]]) -> str:
+        """将命令转换为便于显示的字符串"""
+        return command if isinstance(command, str) else subprocess.list2cmdline(command)
     
     def _get_system_encoding(self):
         """获取系统编码"""
@@ -60,15 +186,9 @@ class CommandExecutor:
                 # 在现代终端中，默认使用UTF-8
                 return 'utf-8'
             
-            # 检查chcp命令的输出（代码页）
-            try:
-                import subprocess
-                result = subprocess.run(['chcp'], capture_output=True, text=True, shell=True)
-                if '65001' in result.stdout:
-                    # 65001是UTF-8代码页
-                    return 'utf-8'
-            except:
-                pass
+            # 检查chcp命令的输出（代码页），每个进程只探测一次
+            if CapabilityCache.get_or_probe("console_utf8", None, CommandExecutor._probe_console_utf8):
+                return 'utf-8'
             
             if system_encoding:
                 return system_encoding
@@ -78,102 +198,168 @@ class CommandExecutor:
         # 非Windows系统使用系统默认编码
         return system_encoding if system_encoding else 'utf-8'
     
+    @staticmethod
+    def _probe_console_utf8() -> bool:
+        """通过chcp检查控制台代码页是否为UTF-8"""
+        try:
+            result = subprocess.run(['chcp'], capture_output=True, text=True, shell=True)
+            # 65001是UTF-8代码页
+            return '65001' in result.stdout
+        except Exception:
+            return False
+    
     def execute(
         self, 
-        command: str, 
+        command: Union[str, Sequence[str]], 
         timeout: Optional[float] = None,
-        output_callback: Optional[Callable[[str], None]] = None
+        output_callback: Optional[Callable[[str], None]] = None,
+        shell: bool = False
     ) -> ExecutionResult:
-        """执行命令
+        """执行命令（同步接口，内部由asyncio事件循环驱动）
         
         Args:
-            command: 要执行的命令
+            command: 要执行的命令，参数同execute_async
             timeout: 超时时间（秒）
             output_callback: 实时输出回调函数
+            shell: 是否经shell执行字符串命令
         
         Returns:
             ExecutionResult: 执行结果
         """
-        start_time = time.time()
+        return self._run_coroutine(self.execute_async(command, timeout, output_callback, shell))
+    
+    async def execute_async(
+        self,
+        command: Union[str, Sequence[str]],
+        timeout: Optional[float] = None,
+        output_callback: Optional[Callable[[str], None]] = None,
+        shell: bool = False
+    ) -> ExecutionResult:
+        """在当前事件循环中执行命令
+        
+        stdout/stderr由同一事件循环读取，不为每个流创建线程；
+        进程结束后会等待两个管道读到EOF，保证输出完整。
+        
+        Args:
+            command: 要执行的命令；默认为参数列表，直接执行程序而不经过shell
+            timeout: 超时时间（秒）
+            output_callback: 实时输出回调函数
+            shell: 为True时command为字符串并经shell执行，仅用于确实需要shell语法的调用
+        
+        Returns:
+            ExecutionResult: 执行结果
+        """
+        self._begin_run()
+        return await self._execute_prepared(command, timeout, output_callback, shell)
+    
+    def _begin_run(self):
+        """重置取消状态并绑定当前事件循环（需在执行所用的事件循环中调用）
+        
+        调度器在将任务标记为运行中之前调用，此后的cancel()一定作用于本次执行。
+        """
         self._cancelled = False
+        self._loop = asyncio.get_running_loop()
+        self._cancel_event = asyncio.Event()
+    
+    async def _execute_prepared(
+        self,
+        command: Union[str, Sequence[str]],
+        timeout: Optional[float] = None,
+        output_callback: Optional[Callable[[str], None]] = None,
+        shell: bool = False
+    ) -> ExecutionResult:
+        """执行命令（取消状态已由_begin_run准备好），参数同execute_async"""
+        start_time = time.time()
+        command_text = self.format_command(command)
+        spill_file = None
         
         try:
+            if isinstance(command, str) != shell:
+                raise ValueError("字符串命令需指定shell=True，参数列表不能经shell执行")
+            
             # 获取系统编码
             system_encoding = self._get_system_encoding()
             
+            # 启动前已取消则不再创建进程
+            if self._cancelled:
+                return ExecutionResult(
+                    status=ExecutionStatus.CANCELLED,
+                    return_code=-1,
+                    stdout="",
+                    stderr="",
+                    execution_time=time.time() - start_time,
+                    command=command_text
+                )
+            
             # 创建进程
-            self._process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-                cwd=self.working_dir,
-                text=True,
-                bufsize=0,  # 禁用缓冲，防止输出卡死
-                universal_newlines=True,
-                encoding=system_encoding,  # 使用系统编码
-                errors='replace'   # 遇到编码错误时替换为占位符
+            if shell:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self.working_dir,
+                    start_new_session=True  # POSIX下单独成组，便于结束整个进程树
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self.working_dir,
+                    start_new_session=True  # POSIX下单独成组，便于结束整个进程树
+                )
+            self._process = process
+            
+            # 创建进程期间收到的取消请求
+            if self._cancelled:
+                self._cancel_event.set()
+            
+            # stdout与stderr共用一个日志文件
+            if self.capture and self.capture.spill_path:
+                log_dir = os.path.dirname(os.path.abspath(self.capture.spill_path))
+                os.makedirs(log_dir, exist_ok=True)
+                spill_file = open(self.capture.spill_path, "w", encoding="utf-8")
+            stdout_buffer = OutputBuffer(self.capture, spill_file)
+            stderr_buffer = OutputBuffer(self.capture, spill_file)
+            readers = [
+                asyncio.ensure_future(self._pump_stream(
+                    process.stdout, stdout_buffer, output_callback, system_encoding
+                )),
+                asyncio.ensure_future(self._pump_stream(
+                    process.stderr, stderr_buffer, output_callback, system_encoding
+                ))
+            ]
+            
+            # 等待进程结束、取消或超时
+            error_message = None
+            waiter = asyncio.ensure_future(self._wait_exit(process))
+            canceller = asyncio.ensure_future(self._cancel_event.wait())
+            done, _ = await asyncio.wait(
+                {waiter, canceller}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
             )
+            canceller.cancel()
             
-            stdout_lines = []
-            stderr_lines = []
+            if waiter not in done:
+                waiter.cancel()
+                if canceller not in done:
+                    error_message = "命令执行超时"
+                await self._terminate_process(process)
             
-            # 实时读取输出
-            if output_callback:
-                stdout_thread = threading.Thread(
-                    target=self._read_output_stream,
-                    args=(self._process.stdout, stdout_lines, output_callback),
-                    daemon=True  # 设为守护线程
-                )
-                stderr_thread = threading.Thread(
-                    target=self._read_output_stream,
-                    args=(self._process.stderr, stderr_lines, output_callback),  # stderr也使用callback
-                    daemon=True  # 设为守护线程
-                )
-                
-                stdout_thread.start()
-                stderr_thread.start()
-                
-                # 等待进程完成
-                try:
-                    return_code = self._process.wait(timeout=timeout)
-                except subprocess.TimeoutExpired:
-                    self.cancel()
-                    return ExecutionResult(
-                        status=ExecutionStatus.FAILED,
-                        return_code=-1,
-                        stdout="",
-                        stderr="",
-                        execution_time=time.time() - start_time,
-                        command=command,
-                        error_message="命令执行超时"
-                    )
-                
-                # 等待输出线程完成，给更多时间读取缓冲区
-                stdout_thread.join(timeout=3)
-                stderr_thread.join(timeout=3)
-            else:
-                # 简单执行，不需要实时输出
-                try:
-                    stdout, stderr = self._process.communicate(timeout=timeout)
-                    return_code = self._process.returncode
-                    stdout_lines = [stdout] if stdout else []
-                    stderr_lines = [stderr] if stderr else []
-                except subprocess.TimeoutExpired:
-                    self.cancel()
-                    return ExecutionResult(
-                        status=ExecutionStatus.FAILED,
-                        return_code=-1,
-                        stdout="",
-                        stderr="",
-                        execution_time=time.time() - start_time,
-                        command=command,
-                        error_message="命令执行超时"
-                    )
+            # 进程已结束，但其后台子进程可能仍占用管道，读取剩余输出不再无限等待
+            _, pending = await asyncio.wait(readers, timeout=self.TERMINATE_GRACE)
+            if pending:
+                for reader in pending:
+                    reader.cancel()
+                await asyncio.wait(pending)
+                # 关闭仍被子进程占用的管道（Process没有公开的关闭接口）
+                process._transport.close()
             
-            execution_time = time.time() - start_time
+            return_code = process.returncode if process.returncode is not None else -1
             
-            if self._cancelled:
+            if error_message:
+                status = ExecutionStatus.FAILED
+                return_code = -1
+            elif self._cancelled:
                 status = ExecutionStatus.CANCELLED
             elif return_code == 0:
                 status = ExecutionStatus.COMPLETED
@@ -183,10 +369,13 @@ class CommandExecutor:
             return ExecutionResult(
                 status=status,
                 return_code=return_code,
-                stdout="".join(stdout_lines),
-                stderr="".join(stderr_lines),
-                execution_time=execution_time,
-                command=command
+                stdout=stdout_buffer.getvalue(),
+                stderr=stderr_buffer.getvalue(),
+                execution_time=time.time() - start_time,
+                command=command_text,
+                error_message=error_message,
+                dropped_lines=stdout_buffer.dropped_lines + stderr_buffer.dropped_lines,
+                log_file=self.capture.spill_path if spill_file else None
             )
         
         except Exception as e:
@@ -196,64 +385,450 @@ class CommandExecutor:
                 stdout="",
                 stderr="",
                 execution_time=time.time() - start_time,
-                command=command,
+                command=command_text,
                 error_message=f"执行异常: {str(e)}"
             )
+        finally:
+            if spill_file is not None:
+                spill_file.close()
+            self._cancel_event = None
+            self._loop = None
     
-    def _read_output_stream(
-        self, 
-        stream, 
-        lines_list: List[str], 
-        callback: Optional[Callable[[str], None]]
+    @staticmethod
+    async def _pump_stream(
+        stream: asyncio.StreamReader,
+        buffer: OutputBuffer,
+        callback: Optional[Callable[[str], None]],
+        encoding: str
     ):
-        """读取输出流"""
-        try:
-            while True:
-                if self._cancelled:
-                    break
-                    
-                line = stream.readline()
-                if not line:  # EOF
-                    break
-                    
-                lines_list.append(line)
+        """读取输出流直到EOF
+        
+        按块读取并增量解码，换行符统一转换为LF；完整的行实时回调，
+        末尾不带换行的内容在EOF时一并回调。
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        pending = ""
+        partial_line = ""
+        
+        while True:
+            data = await stream.read(CommandExecutor.READ_CHUNK_SIZE)
+            final = not data
+            text = pending + decoder.decode(data, final=final)
+            
+            # 块末尾的CR可能属于CRLF，留到下一块处理
+            if not final and text.endswith("\r"):
+                text, pending = text[:-1], "\r"
+            else:
+                pending = ""
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            
+            if text:
+                buffer.write(text)
                 if callback:
-                    # 实时回调，去除换行符
-                    callback(line.rstrip())
-                    
-        except Exception as e:
-            # 记录异常但不影响主流程
-            if callback:
-                callback(f"读取输出异常: {str(e)}")
+                    lines = (partial_line + text).split("\n")
+                    partial_line = lines.pop()
+                    for line in lines:
+                        CommandExecutor._emit_line(callback, line)
+            
+            if final:
+                if callback and partial_line:
+                    CommandExecutor._emit_line(callback, partial_line)
+                break
+    
+    @staticmethod
+    def _emit_line(callback: Callable[[str], None], line: str):
+        """调用输出回调，回调异常不影响输出读取"""
+        try:
+            callback(line.rstrip())
+        except Exception:
+            pass
+    
+    async def _terminate_process(self, process: asyncio.subprocess.Process):
+        """终止进程及其子进程，超时后强制杀死"""
+        if process.returncode is not None:
+            return
+        try:
+            await self._signal_process_tree(process, force=False)
+            try:
+                await asyncio.wait_for(self._wait_exit(process), timeout=self.TERMINATE_GRACE)
+            except asyncio.TimeoutError:
+                # 强制杀死进程
+                await self._signal_process_tree(process, force=True)
+                await self._wait_exit(process)
+        except ProcessLookupError:
+            pass
+    
+    @classmethod
+    async def _wait_exit(cls, process: asyncio.subprocess.Process) -> int:
+        """等待进程退出
+        
+        Process.wait()要等到管道全部关闭才返回，后台子进程继承管道时会一直阻塞，
+        因此轮询由子进程监视器设置的returncode，只判断进程本身是否退出。
+        """
+        interval = cls.EXIT_POLL_MIN
+        while process.returncode is None:
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, cls.EXIT_POLL_MAX)
+        return process.returncode
+    
+    @staticmethod
+    async def _signal_process_tree(process: asyncio.subprocess.Process, force: bool):
+        """向进程树发送终止信号
+        
+        工具自身或经shell启动的命令都可能再创建子进程，只结束直接子进程会遗留其余进程，
+        因此Windows下使用taskkill /T，POSIX下向整个进程组发送信号。
+        """
+        if sys.platform == "win32":
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/T", "/F", "/PID", str(process.pid),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            await killer.wait()
+            if force and process.returncode is None:
+                process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    
+    @staticmethod
+    def _run_coroutine(coro):
+        """同步运行协程
+        
+        当前线程已有运行中的事件循环时（例如在协程中调用同步接口），
+        改为在独立线程中运行，避免嵌套事件循环。
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return CommandExecutor._run_in_new_loop(coro)
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(CommandExecutor._run_in_new_loop, coro).result()
+    
+    @staticmethod
+    def _run_in_new_loop(coro):
+        """在新建的事件循环中运行协程（Windows下使用支持子进程的Proactor循环）"""
+        if sys.platform == "win32":
+            loop = asyncio.ProactorEventLoop()
+        else:
+            loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
         finally:
-            # 确保流被关闭
             try:
-                stream.close()
-            except Exception:
-                pass
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+    
+    @staticmethod
+    async def execute_many_async(
+        jobs: Sequence[Tuple['CommandExecutor', Sequence[str]]],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        output_callbacks: Optional[Sequence[Optional[Callable[[str], None]]]] = None
+    ) -> List[ExecutionResult]:
+        """在同一事件循环中并发执行多条命令
+        
+        Args:
+            jobs: (执行器, 命令) 列表，每个执行器同一时间只运行一条命令
+            timeout: 每条命令的超时时间（秒）
+            max_concurrency: 同时运行的最大进程数，None表示不限制
+            output_callbacks: 与jobs一一对应的输出回调
+        
+        Returns:
+            List[ExecutionResult]: 与jobs顺序一致的执行结果
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or len(jobs) or 1)
+        
+        async def run_job(index: int) -> ExecutionResult:
+            executor, command = jobs[index]
+            callback = output_callbacks[index] if output_callbacks else None
+            async with semaphore:
+                return await executor.execute_async(command, timeout, callback)
+        
+        return list(await asyncio.gather(*(run_job(i) for i in range(len(jobs)))))
+    
+    @staticmethod
+    def execute_many(
+        jobs: Sequence[Tuple['CommandExecutor', Sequence[str]]],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        output_callbacks: Optional[Sequence[Optional[Callable[[str], None]]]] = None
+    ) -> List[ExecutionResult]:
+        """并发执行多条命令（同步接口），参数同execute_many_async"""
+        return CommandExecutor._run_coroutine(CommandExecutor.execute_many_async(
+            jobs, timeout, max_concurrency, output_callbacks
+        ))
     
     def cancel(self):
-        """取消执行"""
+        """取消执行（可从任意线程调用）"""
         self._cancelled = True
-        if self._process and self._process.poll() is None:
+        loop, cancel_event = self._loop, self._cancel_event
+        if loop is not None and cancel_event is not None:
             try:
-                self._process.terminate()
-                # 等待进程结束
-                try:
-                    self._process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # 强制杀死进程
-                    self._process.kill()
-            except Exception:
-                pass  # 忽略取消异常
+                loop.call_soon_threadsafe(cancel_event.set)
+            except RuntimeError:
+                pass  # 事件循环已关闭，进程已结束
+        
+        # 同时取消所有分片进程
+        for executor in list(self._shard_executors):
+            executor.cancel()
+    
+    @staticmethod
+    def _staging_root(script_folder: str) -> str:
+        """暂存目录所在位置（与脚本目录同卷以便创建硬链接）"""
+        return os.path.dirname(os.path.abspath(script_folder))
+    
+    @staticmethod
+    def _stage_scripts(
+        script_folder: str,
+        staging_dir: str,
+        shards: Optional[int]
+    ) -> List[Tuple[str, List[str]]]:
+        """将脚本按总字节数分片并链接到暂存目录
+        
+        Returns:
+            List[Tuple[str, List[str]]]: 各分片的脚本目录及其包含的原始文件
+        """
+        files = FileOperations.list_files(script_folder, recursive=True)
+        groups = FileOperations.partition_files_by_size(files, shards or os.cpu_count() or 1)
+        
+        staged = []
+        for i, group in enumerate(groups):
+            shard_scripts = os.path.join(staging_dir, f"scripts_{i}")
+            FileOperations.ensure_dir_exists(shard_scripts)
+            for file_path in group:
+                FileOperations.link_file(
+                    file_path,
+                    os.path.join(shard_scripts, os.path.relpath(file_path, script_folder))
+                )
+            staged.append((shard_scripts, group))
+        
+        return staged
+    
+    @staticmethod
+    def _link_shard_json(shard_scripts: str, json_folder: str, shard_json: str):
+        """将与分片脚本对应的JSON文件链接到分片JSON目录
+        
+        同时兼容"name.json"与"name.ext.json"两种命名方式。
+        """
+        FileOperations.ensure_dir_exists(shard_json)
+        for script_path in FileOperations.list_files(shard_scripts, recursive=True):
+            rel_path = os.path.relpath(script_path, shard_scripts)
+            for json_rel in (os.path.splitext(rel_path)[0] + ".json", rel_path + ".json"):
+                json_path = os.path.join(json_folder, json_rel)
+                if os.path.exists(json_path):
+                    FileOperations.link_file(json_path, os.path.join(shard_json, json_rel))
+    
+    def _run_shards(
+        self,
+        jobs: List[Tuple[List[str], str]],
+        timeout: float,
+        max_concurrency: Optional[int],
+        output_callback: Optional[Callable[[str], None]]
+    ) -> List[ExecutionResult]:
+        """在同一事件循环中以有限并发运行各分片命令"""
+        self._cancelled = False
+        self._shard_executors = [
+            CommandExecutor(self.working_dir, self.capture.for_shard(i) if self.capture else None)
+            for i in range(len(jobs))
+        ]
+        workers = max(1, min(max_concurrency or os.cpu_count() or 1, len(jobs)))
+        
+        async def run_all() -> List[ExecutionResult]:
+            semaphore = asyncio.Semaphore(workers)
+            
+            async def run_job(index: int) -> ExecutionResult:
+                command = jobs[index][0]
+                command_text = self.format_command(command)
+                async with semaphore:
+                    if self._cancelled:
+                        return ExecutionResult(
+                            status=ExecutionStatus.CANCELLED,
+                            return_code=-1,
+                            stdout="",
+                            stderr="",
+                            execution_time=0.0,
+                            command=command_text
+                        )
+                    
+                    shard_callback = None
+                    if output_callback:
+                        shard_callback = lambda line: output_callback(f"[分片{index + 1}] {line}")
+                        shard_callback(f"正在执行: {command_text}")
+                    return await self._shard_executors[index].execute_async(
+                        command, timeout, shard_callback
+                    )
+            
+            return list(await asyncio.gather(*(run_job(i) for i in range(len(jobs)))))
+        
+        try:
+            return self._run_coroutine(run_all())
+        finally:
+            self._shard_executors = []
+    
+    @staticmethod
+    def _merge_shard_outputs(shard_outputs: List[str], target_folder: str):
+        """将各分片输出目录中的文件移动到目标目录（保持相对路径）"""
+        FileOperations.ensure_dir_exists(target_folder)
+        for shard_output in shard_outputs:
+            for file_path in FileOperations.list_files(shard_output, recursive=True):
+                rel_path = os.path.relpath(file_path, shard_output)
+                FileOperations.move_file(file_path, os.path.join(target_folder, rel_path))
+    
+    @staticmethod
+    def _check_sjis_ext(shard_outputs: List[str]) -> Optional[str]:
+        """检查各分片生成的sjis_ext.bin是否一致，不一致时返回错误信息"""
+        contents = set()
+        for shard_output in shard_outputs:
+            sjis_ext_path = os.path.join(shard_output, "sjis_ext.bin")
+            if os.path.exists(sjis_ext_path):
+                with open(sjis_ext_path, "rb") as f:
+                    contents.add(f.read())
+        
+        if len(contents) > 1:
+            return "各分片生成的sjis_ext.bin不一致，请关闭分片模式后重新注入"
+        return None
+    
+    @staticmethod
+    def _complete_shards(
+        result: ExecutionResult,
+        shard_outputs: List[str],
+        target_folder: str,
+        temp_manager: TempFileManager,
+        staging_dir: str,
+        check_sjis_ext: bool = False
+    ) -> ExecutionResult:
+        """所有分片均成功时合并输出，否则保留暂存目录并在结果中说明
+        
+        Args:
+            result: 汇总后的执行结果
+            shard_outputs: 各分片的输出目录
+            target_folder: 合并的目标目录
+            temp_manager: 管理暂存目录的临时文件管理器
+            staging_dir: 暂存目录
+            check_sjis_ext: 是否要求各分片的sjis_ext.bin一致（注入时）
+        """
+        if result.status == ExecutionStatus.COMPLETED and check_sjis_ext:
+            sjis_ext_error = CommandExecutor._check_sjis_ext(shard_outputs)
+            if sjis_ext_error:
+                result.status = ExecutionStatus.FAILED
+                result.error_message = sjis_ext_error
+        
+        if result.status == ExecutionStatus.COMPLETED:
+            CommandExecutor._merge_shard_outputs(shard_outputs, target_folder)
+        else:
+            temp_manager.keep(staging_dir)
+            note = f"存在未成功的分片，未合并输出，各分片结果保留在: {staging_dir}"
+            result.error_message = f"{result.error_message}\n{note}" if result.error_message else note
+        return result
+    
+    @staticmethod
+    def _aggregate_results(
+        results: List[ExecutionResult],
+        start_time: float,
+        shard_files: Optional[List[List[str]]] = None
+    ) -> ExecutionResult:
+        """汇总各分片的执行结果
+        
+        Args:
+            results: 各分片执行结果
+            start_time: 整体开始时间
+            shard_files: 各分片包含的原始文件，用于统计分片耗时
+        """
+        if any(r.status == ExecutionStatus.CANCELLED for r in results):
+            status = ExecutionStatus.CANCELLED
+        elif results and all(r.status == ExecutionStatus.COMPLETED for r in results):
+            status = ExecutionStatus.COMPLETED
+        else:
+            status = ExecutionStatus.FAILED
+        
+        return_code = next((r.return_code for r in results if r.return_code != 0), 0)
+        error_messages = [
+            f"[分片{i + 1}] {r.error_message}"
+            for i, r in enumerate(results) if r.error_message
+        ]
+        
+        shard_timings = []
+        for i, r in enumerate(results):
+            files = shard_files[i] if shard_files and i < len(shard_files) else []
+            shard_timings.append(ShardTiming(
+                index=i + 1,
+                file_count=len(files),
+                total_bytes=sum(FileOperations.get_file_size(f) for f in files),
+                execution_time=r.execution_time,
+                status=r.status
+            ))
+        
+        return ExecutionResult(
+            status=status,
+            return_code=return_code,
+            stdout="".join(r.stdout for r in results),
+            stderr="".join(r.stderr for r in results),
+            execution_time=time.time() - start_time,
+            command="\n".join(r.command for r in results),
+            error_message="\n".join(error_messages) or None,
+            shard_timings=shard_timings,
+            dropped_lines=sum(r.dropped_lines for r in results)
+        )
+    
+    @staticmethod
+    def format_shard_timings(result: ExecutionResult) -> List[str]:
+        """将分片耗时格式化为可读文本行"""
+        return [
+            f"[分片{t.index}] {t.file_count} 个文件, {t.total_bytes} 字节, "
+            f"耗时 {t.execution_time:.2f} 秒 ({t.status.value})"
+            for t in result.shard_timings
+        ]
 
 
 class VNTextPatchExecutor(CommandExecutor):
     """VNTextPatch专用执行器"""
     
-    def __init__(self, vntextpatch_dir: str = ".\\VNTextPatch"):
-        super().__init__(working_dir=vntextpatch_dir)
+    def __init__(
+        self,
+        vntextpatch_dir: str = ".\\VNTextPatch",
+        capture: Optional[OutputCaptureConfig] = None
+    ):
+        super().__init__(working_dir=vntextpatch_dir, capture=capture)
         self.vntextpatch_dir = vntextpatch_dir
+        self.executable = "VNTextPatch.exe"
+        self.gbk_executable = "VNTextPatchGBK.exe"
+    
+    def _tool_argv(self, exe_name: str) -> List[str]:
+        """工具调用前缀（绝对路径，直接启动程序时不依赖当前目录的查找规则）"""
+        return [os.path.join(os.path.abspath(self.vntextpatch_dir), exe_name)]
+    
+    def _build_extract_command(
+        self,
+        script_folder: str,
+        json_folder: str,
+        engine: Optional[str] = None
+    ) -> List[str]:
+        """构建提取命令（参数列表，路径原样传递）"""
+        command = self._tool_argv(self.executable) + ["extractlocal", script_folder, json_folder]
+        if engine and engine != "自动判断":
+            command.append(f"--format={engine}")
+        return command
+    
+    def _build_inject_command(
+        self,
+        script_folder: str,
+        json_folder: str,
+        output_folder: str,
+        engine: Optional[str] = None,
+        use_gbk: bool = False
+    ) -> List[str]:
+        """构建注入命令（参数列表，路径原样传递）"""
+        # 选择执行文件
+        exe_name = self.gbk_executable if use_gbk else self.executable
+        
+        command = self._tool_argv(exe_name) + [
+            "insertlocal", script_folder, json_folder, output_folder
+        ]
+        if engine and engine != "自动判断":
+            command.append(f"--format={engine}")
+        return command
     
     def extract(
         self,
@@ -263,19 +838,7 @@ class VNTextPatchExecutor(CommandExecutor):
         output_callback: Optional[Callable[[str], None]] = None
     ) -> ExecutionResult:
         """提取脚本到JSON"""
-        # 处理路径中的空格
-        if " " in script_folder:
-            script_folder = f'"{script_folder}"'
-        if " " in json_folder:
-            json_folder = f'"{json_folder}"'
-        
-        # 构建命令
-        base_cmd = ".\\VNTextPatch.exe extractlocal"
-        if engine and engine != "自动判断":
-            cmd = f"{base_cmd} {script_folder} {json_folder} --format={engine}"
-        else:
-            cmd = f"{base_cmd} {script_folder} {json_folder}"
-        
+        cmd = self._build_extract_command(script_folder, json_folder, engine)
         return self.execute(cmd, timeout=300, output_callback=output_callback)
     
     def inject(
@@ -288,80 +851,408 @@ class VNTextPatchExecutor(CommandExecutor):
         output_callback: Optional[Callable[[str], None]] = None
     ) -> ExecutionResult:
         """注入JSON回脚本"""
-        # 处理路径中的空格
-        if " " in script_folder:
-            script_folder = f'"{script_folder}"'
-        if " " in json_folder:
-            json_folder = f'"{json_folder}"'
-        if " " in output_folder:
-            output_folder = f'"{output_folder}"'
+        cmd = self._build_inject_command(
+            script_folder, json_folder, output_folder, engine, use_gbk
+        )
+        return self.execute(cmd, timeout=600, output_callback=output_callback)
+    
+    def extract_sharded(
+        self,
+        script_folder: str,
+        json_folder: str,
+        engine: Optional[str] = None,
+        shards: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        output_callback: Optional[Callable[[str], None]] = None
+    ) -> ExecutionResult:
+        """分片并行提取脚本到JSON
         
-        # 选择执行文件
-        exe_name = ".\\VNTextPatchGBK.exe" if use_gbk else ".\\VNTextPatch.exe"
+        将脚本按大小划分到多个链接出的暂存目录，并发运行多个VNTextPatch进程，
+        所有分片成功后将各分片的JSON合并到json_folder；否则保留暂存目录。
+        """
+        start_time = time.time()
         
-        # 构建命令
-        base_cmd = f"{exe_name} insertlocal"
-        if engine and engine != "自动判断":
-            cmd = f"{base_cmd} {script_folder} {json_folder} {output_folder} --format={engine}"
-        else:
-            cmd = f"{base_cmd} {script_folder} {json_folder} {output_folder}"
+        with TempFileManager(self._staging_root(script_folder)) as temp_manager:
+            staging_dir = temp_manager.create_temp_dir(prefix="vntext_shards_")
+            staged = self._stage_scripts(script_folder, staging_dir, shards)
+            
+            jobs = []
+            for i, (shard_scripts, _) in enumerate(staged):
+                shard_json = os.path.join(staging_dir, f"json_{i}")
+                FileOperations.ensure_dir_exists(shard_json)
+                jobs.append((
+                    self._build_extract_command(shard_scripts, shard_json, engine),
+                    shard_json
+                ))
+            
+            results = self._run_shards(jobs, 300, max_concurrency, output_callback)
+            result = self._aggregate_results(results, start_time, [files for _, files in staged])
+            return self._complete_shards(
+                result, [output for _, output in jobs], json_folder, temp_manager, staging_dir
+            )
+    
+    def inject_sharded(
+        self,
+        script_folder: str,
+        json_folder: str,
+        output_folder: str,
+        engine: Optional[str] = None,
+        use_gbk: bool = False,
+        shards: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        output_callback: Optional[Callable[[str], None]] = None
+    ) -> ExecutionResult:
+        """分片并行注入JSON回脚本
         
-        return self.execute(cmd, timeout=600, output_callback=output_callback)
+        每个分片只链接自身脚本对应的JSON，所有分片成功且生成的sjis_ext.bin一致时
+        才将各分片输出合并到output_folder，否则结果标记为失败并保留暂存目录。
+        """
+        start_time = time.time()
+        
+        with TempFileManager(self._staging_root(script_folder)) as temp_manager:
+            staging_dir = temp_manager.create_temp_dir(prefix="vntext_shards_")
+            staged = self._stage_scripts(script_folder, staging_dir, shards)
+            
+            jobs = []
+            for i, (shard_scripts, _) in enumerate(staged):
+                shard_json = os.path.join(staging_dir, f"json_{i}")
+                shard_output = os.path.join(staging_dir, f"output_{i}")
+                self._link_shard_json(shard_scripts, json_folder, shard_json)
+                FileOperations.ensure_dir_exists(shard_output)
+                
+                jobs.append((
+                    self._build_inject_command(
+                        shard_scripts, shard_json, shard_output, engine, use_gbk
+                    ),
+                    shard_output
+                ))
+            
+            results = self._run_shards(jobs, 600, max_concurrency, output_callback)
+            result = self._aggregate_results(results, start_time, [files for _, files in staged])
+            return self._complete_shards(
+                result, [output for _, output in jobs], output_folder, temp_manager, staging_dir,
+                check_sjis_ext=True
+            )
+
+
+@dataclass
+class JobMetrics:
+    """任务耗时统计"""
+    task_id: str
+    priority: int
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    status: ExecutionStatus = ExecutionStatus.PENDING
+    
+    @property
+    def queue_time(self) -> float:
+        """排队等待时间（秒）"""
+        end = self.started_at or self.finished_at or time.time()
+        return end - self.submitted_at
+    
+    @property
+    def run_time(self) -> float:
+        """实际运行时间（秒）"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+@dataclass
+class _Job:
+    """调度器内部的任务记录"""
+    task_id: str
+    command: Union[str, Sequence[str]]
+    executor: CommandExecutor
+    shell: bool
+    timeout: Optional[float]
+    output_callback: Optional[Callable[[str], None]]
+    completion_callback: Optional[Callable[[str, ExecutionResult], None]]
+    metrics: JobMetrics
+    sequence: int
+    done: threading.Event = field(default_factory=threading.Event)
 
 
 class AsyncCommandExecutor:
-    """异步命令执行器"""
+    """异步命令执行器
     
-    def __init__(self):
-        self._running_tasks: Dict[str, threading.Thread] = {}
-        self._results: Dict[str, ExecutionResult] = {}
+    任务进入优先级队列（priority越大越先执行，同优先级先进先出），
+    由固定数量的工作协程在同一个后台事件循环中执行，最多同时运行max_workers个进程。
+    结果按TTL与LRU淘汰。
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        result_ttl: Optional[float] = 3600.0,
+        max_results: int = 100,
+        capture: Optional[OutputCaptureConfig] = None
+    ):
+        """
+        初始化异步命令执行器
+        
+        Args:
+            max_workers: 同时运行的最大进程数（默认为CPU核心数）
+            result_ttl: 结果保留时间（秒），None表示不按时间淘汰
+            max_results: 最多保留的结果数，超出时淘汰最久未访问的结果
+            capture: 各任务使用的输出捕获配置
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.result_ttl = result_ttl
+        self.max_results = max(1, max_results)
+        self.capture = capture
+        
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _Job] = {}
+        self._queue: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._results: 'OrderedDict[str, Tuple[ExecutionResult, JobMetrics]]' = OrderedDict()
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
     
     def execute_async(
         self,
         task_id: str,
-        command: str,
+        command: Union[str, Sequence[str]],
         working_dir: Optional[str] = None,
         timeout: Optional[float] = None,
         output_callback: Optional[Callable[[str], None]] = None,
-        completion_callback: Optional[Callable[[str, ExecutionResult], None]] = None
-    ):
-        """异步执行命令"""
-        if task_id in self._running_tasks:
-            raise ValueError(f"任务 {task_id} 已在运行中")
-        
-        def run_command():
-            executor = CommandExecutor(working_dir)
-            result = executor.execute(command, timeout, output_callback)
-            self._results[task_id] = result
+        completion_callback: Optional[Callable[[str, ExecutionResult], None]] = None,
+        priority: int = 0,
+        shell: bool = False
+    ) -> str:
+        """提交命令到任务队列
+        
+        Args:
+            task_id: 任务ID
+            command: 要执行的命令
+            working_dir: 命令工作目录
+            timeout: 超时时间（秒），从开始运行时计时
+            output_callback: 实时输出回调函数
+            completion_callback: 完成回调函数（取消的任务同样会回调）
+            priority: 优先级，越大越先执行
+            shell: 是否经shell执行字符串命令（参见CommandExecutor.execute_async）
+        
+        Returns:
+            str: 任务ID
+        """
+        with self._lock:
+            if task_id in self._jobs:
+                raise ValueError(f"任务 {task_id} 已在运行中")
+            
+            self._results.pop(task_id, None)
+            sequence = next(self._sequence)
+            self._jobs[task_id] = _Job(
+                task_id=task_id,
+                command=command,
+                executor=CommandExecutor(working_dir, self.capture),
+                shell=shell,
+                timeout=timeout,
+                output_callback=output_callback,
+                completion_callback=completion_callback,
+                metrics=JobMetrics(task_id, priority, submitted_at=time.time()),
+                sequence=sequence
+            )
+            heapq.heappush(self._queue, (-priority, sequence, task_id))
+            loop = self._ensure_loop()
+        
+        loop.call_soon_threadsafe(self._wakeup.release)
+        return task_id
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """按需启动后台事件循环及工作协程（需持有锁）"""
+        if self._loop is not None:
+            return self._loop
+        
+        if sys.platform == "win32":
+            loop = asyncio.ProactorEventLoop()
+        else:
+            loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        
+        def run_loop():
+            asyncio.set_event_loop(loop)
+            self._wakeup = asyncio.Semaphore(0)
+            self._workers = [loop.create_task(self._worker()) for _ in range(self.max_workers)]
+            loop.call_soon(ready.set)
+            loop.run_forever()
+        
+        self._loop = loop
+        self._loop_thread = threading.Thread(target=run_loop, daemon=True)
+        self._loop_thread.start()
+        ready.wait()
+        return loop
+    
+    async def _worker(self):
+        """工作协程：从队列中取出任务并执行"""
+        while True:
+            await self._wakeup.acquire()
             
-            # 清理运行任务
-            if task_id in self._running_tasks:
-                del self._running_tasks[task_id]
+            with self._lock:
+                if not self._queue:
+                    continue
+                _, sequence, task_id = heapq.heappop(self._queue)
+                job = self._jobs.get(task_id)
+                # 已取消（或同ID重新提交）的任务只留下过期的队列项
+                if (job is None or job.sequence != sequence
+                        or job.metrics.status != ExecutionStatus.PENDING):
+                    continue
+                # 先准备取消状态再标记为运行中，之后的cancel_task不会丢失
+                job.executor._begin_run()
+                job.metrics.status = ExecutionStatus.RUNNING
+                job.metrics.started_at = time.time()
             
-            # 调用完成回调
-            if completion_callback:
-                completion_callback(task_id, result)
+            result = await job.executor._execute_prepared(
+                job.command, job.timeout, job.output_callback, job.shell
+            )
+            self._finish_job(job, result)
+    
+    def _finish_job(self, job: _Job, result: ExecutionResult):
+        """记录任务结果并调用完成回调"""
+        now = time.time()
+        with self._lock:
+            job.metrics.finished_at = now
+            job.metrics.status = result.status
+            self._jobs.pop(job.task_id, None)
+            self._results[job.task_id] = (result, job.metrics)
+            self._evict_results(now)
+        job.done.set()
+        
+        if job.completion_callback:
+            try:
+                job.completion_callback(job.task_id, result)
+            except Exception:
+                pass  # 回调异常不影响调度
+    
+    def _evict_results(self, now: float):
+        """按TTL与LRU淘汰结果（需持有锁）"""
+        if self.result_ttl is not None:
+            expired = [
+                task_id for task_id, (_, metrics) in self._results.items()
+                if now - metrics.finished_at > self.result_ttl
+            ]
+            for task_id in expired:
+                del self._results[task_id]
         
-        thread = threading.Thread(target=run_command, daemon=True)
-        self._running_tasks[task_id] = thread
-        thread.start()
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
     
     def is_running(self, task_id: str) -> bool:
-        """检查任务是否在运行"""
-        return task_id in self._running_tasks
+        """检查任务是否在排队或运行中"""
+        with self._lock:
+            return task_id in self._jobs
+    
+    def get_status(self, task_id: str) -> Optional[ExecutionStatus]:
+        """获取任务状态"""
+        with self._lock:
+            job = self._jobs.get(task_id)
+            if job is not None:
+                return job.metrics.status
+            entry = self._results.get(task_id)
+            return entry[1].status if entry else None
     
     def get_result(self, task_id: str) -> Optional[ExecutionResult]:
         """获取任务结果"""
-        return self._results.get(task_id)
+        with self._lock:
+            self._evict_results(time.time())
+            entry = self._results.get(task_id)
+            if entry is None:
+                return None
+            self._results.move_to_end(task_id)
+            return entry[0]
+    
+    def get_metrics(self, task_id: str) -> Optional[JobMetrics]:
+        """获取任务耗时统计（包括排队和运行中的任务）"""
+        with self._lock:
+            job = self._jobs.get(task_id)
+            if job is not None:
+                return replace(job.metrics)
+            entry = self._results.get(task_id)
+            return replace(entry[1]) if entry else None
+    
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[ExecutionResult]:
+        """等待任务完成并返回结果"""
+        with self._lock:
+            job = self._jobs.get(task_id)
+        if job is not None and not job.done.wait(timeout):
+            return None
+        return self.get_result(task_id)
     
     def cancel_task(self, task_id: str) -> bool:
-        """取消任务"""
-        if task_id in self._running_tasks:
-            # 注意：线程无法直接取消，这里只是从列表中移除
-            del self._running_tasks[task_id]
-            return True
-        return False
+        """取消任务
+        
+        排队中的任务直接移出队列；运行中的任务会结束其整个进程树。
+        """
+        with self._lock:
+            job = self._jobs.get(task_id)
+            if job is None:
+                return False
+            pending = job.metrics.status == ExecutionStatus.PENDING
+            if pending:
+                job.metrics.status = ExecutionStatus.CANCELLED
+        
+        if pending:
+            self._finish_job(job, ExecutionResult(
+                status=ExecutionStatus.CANCELLED,
+                return_code=-1,
+                stdout="",
+                stderr="",
+                execution_time=0.0,
+                command=CommandExecutor.format_command(job.command)
+            ))
+        else:
+            job.executor.cancel()
+        return True
+    
+    def cancel_all(self):
+        """取消所有排队和运行中的任务"""
+        for task_id in self.get_pending_tasks() + self.get_running_tasks():
+            self.cancel_task(task_id)
     
     def get_running_tasks(self) -> List[str]:
         """获取正在运行的任务列表"""
-        return list(self._running_tasks.keys())
\ No newline at end of file
+        with self._lock:
+            return [
+                task_id for task_id, job in self._jobs.items()
+                if job.metrics.status == ExecutionStatus.RUNNING
+            ]
+    
+    def get_pending_tasks(self) -> List[str]:
+        """获取排队中的任务列表（按执行顺序）"""
+        with self._lock:
+            return [
+                task_id for _, _, task_id in sorted(self._queue)
+                if task_id in self._jobs
+                and self._jobs[task_id].metrics.status == ExecutionStatus.PENDING
+            ]
+    
+    def shutdown(self, wait: bool = True):
+        """取消所有任务并停止后台事件循环"""
+        self.cancel_all()
+        with self._lock:
+            jobs = list(self._jobs.values())
+            loop, thread, workers = self._loop, self._loop_thread, self._workers
+            self._loop = None
+            self._loop_thread = None
+            self._workers = []
+        
+        if wait:
+            for job in jobs:
+                job.done.wait()
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_workers(loop, workers), loop)
+            if wait and thread is not None:
+                thread.join()
+                loop.close()
+    
+    @staticmethod
+    async def _stop_workers(loop: asyncio.AbstractEventLoop, workers: List[asyncio.Task]):
+        """结束工作协程并停止事件循环"""
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        loop.stop()
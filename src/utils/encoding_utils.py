@@ -3,63 +3,214 @@
 处理各种字符编码转换、检测和二进制文件解析
 """
 
+import os
+import re
+import codecs
 import struct
+import threading
 import chardet
-from typing import Optional, Tuple, List, Union
+from typing import Optional, Tuple, List, Union, Dict
+
+from .mapped_file import MappedFile
+
+
+BytesLike = Union[bytes, memoryview]
+
+_NON_ASCII_BYTE = re.compile(rb'[\x80-\xff]')
+
+# 带BOM的编码（标准化后的编解码器名称）及其BOM
+_ENCODING_BOMS = {
+    'utf-8-sig': (codecs.BOM_UTF8,),
+    'utf-16': (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE),
+    'utf-32': (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE),
+}
 
 
 class EncodingUtils:
     """编码工具类"""
     
+    # 编码检测的初始采样大小，置信度不足时按倍数扩大直至整个文件
+    DETECTION_SAMPLE_SIZE = 64 * 1024
+    DETECTION_CONFIDENCE = 0.7
+    COMMON_ENCODINGS = ['utf-8', 'gbk', 'sjis', 'cp932']
+    
+    # 检测结果缓存：文件指纹 -> 编码，目录 -> 该目录下已确定的编码
+    _file_encoding_cache: Dict[Tuple[str, int, int], Optional[str]] = {}
+    _dir_encoding_cache: Dict[str, str] = {}
+    _cache_lock = threading.Lock()
+    
     @staticmethod
-    def detect_encoding(file_path: str) -> Optional[str]:
-        """自动检测文件编码"""
+    def detect_encoding(
+        file_path: str,
+        sample_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Optional[str]:
+        """自动检测文件编码
+        
+        Args:
+            file_path: 文件路径
+            sample_size: 初始采样字节数，置信度不足时逐步扩大
+            use_cache: 是否使用按文件指纹和目录缓存的检测结果
+        """
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            
-            # 使用chardet检测编码
-            result = chardet.detect(raw_data)
-            if result and result['confidence'] > 0.7:
-                return result['encoding']
-            
-            # 如果检测失败，尝试常见编码
-            common_encodings = ['utf-8', 'gbk', 'sjis', 'cp932']
-            for encoding in common_encodings:
-                try:
-                    raw_data.decode(encoding)
-                    return encoding
-                except UnicodeDecodeError:
-                    continue
-            
-            return None
+            with MappedFile(file_path) as mapped:
+                return EncodingUtils._detect_file_encoding(mapped, sample_size, use_cache)
         except Exception:
             return None
     
+    @staticmethod
+    def clear_detection_cache():
+        """清除编码检测缓存"""
+        with EncodingUtils._cache_lock:
+            EncodingUtils._file_encoding_cache.clear()
+            EncodingUtils._dir_encoding_cache.clear()
+    
+    @staticmethod
+    def _detect_file_encoding(
+        mapped: MappedFile,
+        sample_size: Optional[int],
+        use_cache: bool
+    ) -> Optional[str]:
+        """检测已映射文件的编码
+        
+        采样是映射上的零拷贝切片，只有交给chardet的采样会被复制。
+        同目录已确定的编码只作为提示：采样只含ASCII字节或带有该编码的BOM时直接沿用，
+        否则仍以chardet的可信结果为准，仅在置信度不足时沿用（GBK与SJIS的字节范围重叠，
+        能严格解码不代表编码相同）。
+        """
+        sample_size = sample_size or EncodingUtils.DETECTION_SAMPLE_SIZE
+        file_size = mapped.size
+        fingerprint = (
+            os.path.abspath(mapped.file_path), os.stat(mapped.file_path).st_mtime_ns, file_size
+        )
+        dir_key = os.path.dirname(fingerprint[0])
+        
+        if use_cache:
+            with EncodingUtils._cache_lock:
+                if fingerprint in EncodingUtils._file_encoding_cache:
+                    return EncodingUtils._file_encoding_cache[fingerprint]
+                dir_encoding = EncodingUtils._dir_encoding_cache.get(dir_key)
+        else:
+            dir_encoding = None
+        
+        encoding = None
+        confident = False
+        while True:
+            complete = sample_size >= file_size
+            with mapped.view(0, sample_size) as sample:
+                # 无需检测即可确定时沿用同目录的编码
+                if dir_encoding and EncodingUtils._sample_is_unambiguous(sample, dir_encoding):
+                    encoding = dir_encoding
+                    break
+                
+                # 使用chardet检测编码
+                result = chardet.detect(bytes(sample))
+                if result and result['encoding'] and result['confidence'] > EncodingUtils.DETECTION_CONFIDENCE:
+                    encoding = result['encoding']
+                    confident = True
+                    break
+                
+                # 置信度不足时参考同目录的编码
+                if dir_encoding and EncodingUtils._sample_matches_encoding(
+                    sample, dir_encoding, complete
+                ):
+                    encoding = dir_encoding
+                    break
+                
+                if complete:
+                    # 如果检测失败，尝试常见编码
+                    for candidate in EncodingUtils.COMMON_ENCODINGS:
+                        if EncodingUtils._can_decode(sample, candidate, complete):
+                            encoding = candidate
+                            break
+                    break
+            
+            # 置信度不足时扩大采样
+            sample_size *= 4
+        
+        if use_cache:
+            with EncodingUtils._cache_lock:
+                EncodingUtils._file_encoding_cache[fingerprint] = encoding
+                if confident and encoding.lower() != 'ascii':
+                    EncodingUtils._dir_encoding_cache.setdefault(dir_key, encoding)
+        
+        return encoding
+    
+    @staticmethod
+    def _can_decode(data: BytesLike, encoding: str, final: bool = True) -> bool:
+        """检查字节能否用指定编码严格解码（采样不完整时允许末尾截断）"""
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(data, final=final)
+            return True
+        except (UnicodeDecodeError, LookupError):
+            return False
+    
+    @staticmethod
+    def _sample_is_unambiguous(data: BytesLike, encoding: str) -> bool:
+        """采样是否无需检测即可确定符合该编码（带有该编码的BOM，或只含ASCII字节）"""
+        try:
+            name = codecs.lookup(encoding).name
+        except LookupError:
+            return False
+        
+        boms = _ENCODING_BOMS.get(name)
+        if boms:
+            return bytes(data[:4]).startswith(boms)
+        
+        # 只含ASCII字节时，ASCII兼容的编码解码结果相同
+        return not _NON_ASCII_BYTE.search(data) and EncodingUtils._is_ascii_compatible(name)
+    
+    @staticmethod
+    def _is_ascii_compatible(encoding: str) -> bool:
+        """编码是否与ASCII兼容"""
+        try:
+            return "ascii".encode(encoding) == b"ascii"
+        except (UnicodeEncodeError, LookupError):
+            return False
+    
+    @staticmethod
+    def _sample_matches_encoding(data: BytesLike, encoding: str, final: bool) -> bool:
+        """检查采样是否符合已知编码"""
+        if not EncodingUtils._can_decode(data, encoding, final):
+            return False
+        
+        # 含非ASCII字节且是合法UTF-8的内容不应沿用其他编码
+        if codecs.lookup(encoding).name != 'utf-8' and _NON_ASCII_BYTE.search(data):
+            return not EncodingUtils._can_decode(data, 'utf-8', final)
+        
+        return True
+    
     @staticmethod
     def read_file_with_encoding(file_path: str, encoding: Optional[str] = None) -> Tuple[str, str]:
         """读取文件内容，自动处理编码
         
+        文件以内存映射方式读取，未指定编码时检测编码与解码共用同一映射。
+        
         Returns:
             Tuple[str, str]: (文件内容, 使用的编码)
         """
-        if encoding is None:
-            encoding = EncodingUtils.detect_encoding(file_path)
-            if encoding is None:
-                encoding = 'utf-8'  # 默认使用UTF-8
-        
         try:
-            with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                content = f.read()
-            return content, encoding
-        except Exception as e:
-            # 如果指定编码失败，尝试用UTF-8
+            mapped = MappedFile(file_path)
+        except OSError as e:
+            raise RuntimeError(f"无法读取文件 {file_path}: {e}")
+        
+        with mapped:
+            if encoding is None:
+                try:
+                    encoding = EncodingUtils._detect_file_encoding(mapped, None, True)
+                except Exception:
+                    encoding = None
+                if encoding is None:
+                    encoding = 'utf-8'  # 默认使用UTF-8
+            
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                return content, 'utf-8'
-            except Exception:
-                raise RuntimeError(f"无法读取文件 {file_path}: {e}")
+                return mapped.decode(encoding), encoding
+            except Exception as e:
+                # 如果指定编码失败，尝试用UTF-8
+                try:
+                    return mapped.decode('utf-8'), 'utf-8'
+                except Exception:
+                    raise RuntimeError(f"无法读取文件 {file_path}: {e}")
     
     @staticmethod
     def write_file_with_encoding(file_path: str, content: str, encoding: str = 'utf-8'):
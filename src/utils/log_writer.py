@@ -0,0 +1,154 @@
+"""
+滚动日志写入器
+在后台线程中将文本写入按大小滚动的日志文件
+"""
+
+import os
+import queue
+import shutil
+import threading
+from typing import List
+
+
+class RotatingLogWriter:
+    """滚动日志写入器
+    
+    write()只将文本放入队列，由后台线程批量写入文件；
+    文件超过max_bytes时滚动为 path.1 ... path.N，最多保留backup_count个旧文件。
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3):
+        """
+        初始化滚动日志写入器
+        
+        Args:
+            path: 日志文件路径
+            max_bytes: 单个日志文件的最大字节数
+            backup_count: 保留的旧日志文件数
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        
+        self._queue: queue.Queue = queue.Queue()
+        self._file = None
+        self._size = 0
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._open(truncate=True)
+        
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def write(self, text: str):
+        """写入文本（非阻塞）"""
+        if text:
+            self._queue.put(('text', text))
+    
+    def reset(self):
+        """清空日志（删除旧日志文件并截断当前文件）"""
+        self._queue.put(('reset', None))
+    
+    def flush(self):
+        """等待已写入的文本全部落盘"""
+        if self._thread.is_alive():
+            self._queue.join()
+    
+    def close(self):
+        """写完剩余文本并关闭文件"""
+        if self._thread.is_alive():
+            self._queue.put(('close', None))
+            self._thread.join()
+    
+    def get_log_files(self) -> List[str]:
+        """获取现有日志文件（从旧到新）"""
+        files = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)]
+        files.append(self.path)
+        return [f for f in files if os.path.exists(f)]
+    
+    def copy_to(self, dest_path: str):
+        """将完整日志按时间顺序复制到目标文件"""
+        self.flush()
+        with open(dest_path, 'wb') as dest:
+            for log_file in self.get_log_files():
+                with open(log_file, 'rb') as src:
+                    shutil.copyfileobj(src, dest)
+    
+    def _open(self, truncate: bool = False):
+        """打开当前日志文件"""
+        self._file = open(self.path, 'w' if truncate else 'a', encoding='utf-8', newline='')
+        self._size = self._file.tell()
+    
+    def _rotate(self):
+        """滚动日志文件
+        
+        重命名失败（如文件被其他程序占用）时继续追加到当前文件，下次写入时再尝试滚动。
+        """
+        self._file.close()
+        rotated = False
+        try:
+            if self.backup_count > 0:
+                for i in range(self.backup_count - 1, 0, -1):
+                    src = f"{self.path}.{i}"
+                    if os.path.exists(src):
+                        os.replace(src, f"{self.path}.{i + 1}")
+                os.replace(self.path, f"{self.path}.1")
+            rotated = True
+        finally:
+            self._open(truncate=rotated)
+    
+    def _reset(self):
+        """删除旧日志文件并截断当前文件（删除失败时仍重新打开文件）"""
+        self._file.close()
+        try:
+            for old_file in self.get_log_files():
+                os.remove(old_file)
+        finally:
+            self._open(truncate=True)
+    
+    def _run(self):
+        """后台写入循环"""
+        while True:
+            items = [self._queue.get()]
+            # 一次取出队列中已有的全部文本，合并写入
+            try:
+                while True:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            closing = False
+            try:
+                chunks = []
+                for kind, text in items:
+                    if kind == 'text':
+                        chunks.append(text)
+                    else:
+                        self._write_chunks(chunks)
+                        chunks = []
+                        if kind == 'reset':
+                            self._reset()
+                        elif kind == 'close':
+                            closing = True
+                self._write_chunks(chunks)
+                self._file.flush()
+            except OSError:
+                pass  # 日志写入失败不影响界面输出
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            
+            if closing:
+                self._file.close()
+                return
+    
+    def _write_chunks(self, chunks: List[str]):
+        """写入文本块，必要时滚动"""
+        if not chunks:
+            return
+        data = "".join(chunks)
+        self._file.write(data)
+        self._size += len(data.encode('utf-8'))
+        if self._size >= self.max_bytes:
+            self._rotate()
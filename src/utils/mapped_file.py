@@ -0,0 +1,58 @@
+"""
+内存映射文件读取
+以只读内存映射方式访问脚本文件，编码检测与字节匹配共用同一映射，按需切片而不复制整个文件
+"""
+
+import mmap
+import os
+from typing import Optional, Union
+
+
+class MappedFile:
+    """只读内存映射文件
+    
+    文件内容由操作系统按页载入，不占用Python堆内存；view()返回零拷贝的memoryview切片。
+    空文件无法映射，此时buffer为空字节串。用作上下文管理器时自动关闭；
+    关闭前需释放所有view()返回的切片（可用with语句）。
+    """
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            if self.size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+    
+    @property
+    def buffer(self) -> Union[mmap.mmap, bytes]:
+        """整个文件内容（可直接用于bytes正则匹配与find等操作）"""
+        return self._mmap if self._mmap is not None else b""
+    
+    def view(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """获取[start, end)范围的零拷贝切片，超出文件末尾的部分自动截断"""
+        return memoryview(self.buffer)[start:end]
+    
+    def decode(self, encoding: str, errors: str = 'ignore') -> str:
+        """解码整个文件，换行符统一为\\n（与文本模式读取一致）"""
+        text = str(self.buffer, encoding, errors)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def close(self):
+        """关闭映射与文件"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+    
+    def __enter__(self) -> 'MappedFile':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -4,8 +4,13 @@ Msg-tool命令执行器
 """
 
 import os
+import time
 from typing import Optional, Callable, List
-from .command_executor import CommandExecutor, ExecutionResult
+from .command_executor import (
+    CommandExecutor, ExecutionResult, ExecutionStatus, OutputCaptureConfig
+)
+from .capability_cache import CapabilityCache
+from ..core.file_operations import FileOperations, TempFileManager
 from platform import system
 import sys
 import locale
@@ -25,20 +30,39 @@ ENCODING_CP_MAP = {
 class MsgToolExecutor(CommandExecutor):
     """Msg-tool专用执行器"""
     
-    def __init__(self, msgtool_dir: str = "msg_tool"):
+    def __init__(
+        self,
+        msgtool_dir: str = "msg_tool",
+        capture: Optional[OutputCaptureConfig] = None
+    ):
         """
         初始化MsgTool执行器
         
         Args:
             msgtool_dir: msg-tool工具所在目录
+            capture: 输出捕获配置（详细输出较多时可限制内存占用）
         """
-        super().__init__(working_dir=msgtool_dir)
+        super().__init__(working_dir=msgtool_dir, capture=capture)
         self.msgtool_dir = msgtool_dir
         self.executable = "msg_tool.exe"
     
+    @property
+    def tool_path(self) -> str:
+        """msg-tool可执行文件路径"""
+        return os.path.join(self.msgtool_dir, self.executable)
+    
     def check_tool_available(self) -> bool:
-        """检查msg-tool工具是否可用"""
-        tool_path = os.path.join(self.msgtool_dir, self.executable)
+        """检查msg-tool工具是否可用
+        
+        结果按工具目录缓存，目录内容变化（如放入或删除工具）后自动重新检查。
+        """
+        return CapabilityCache.get_or_probe(
+            f"available:{self.executable}", self.msgtool_dir, self._probe_tool_available
+        )
+    
+    def _probe_tool_available(self) -> bool:
+        """检查工具文件是否存在且可执行"""
+        tool_path = self.tool_path
         available = os.path.exists(tool_path) and os.access(tool_path, os.X_OK)
         
         # 输出检查结果用于调试
@@ -118,12 +142,6 @@ class MsgToolExecutor(CommandExecutor):
         ]
         return engines
     
-    def _escape_path(self, path: str) -> str:
-        """转义路径中的空格和特殊字符"""
-        if " " in path or any(char in path for char in ['"', "'", "&", "|"]):
-            return f'"{path}"'
-        return path
-    
     def _get_script_type_param(self, engine: str) -> Optional[str]:
         """根据引擎名称获取script-type参数"""
         if engine == "自动检测":
@@ -133,6 +151,82 @@ class MsgToolExecutor(CommandExecutor):
         engine_type = engine.split(" - ")[0].strip()
         return engine_type
     
+    def _tool_command(self) -> List[str]:
+        """msg-tool调用前缀（绝对路径，直接启动程序时不依赖当前目录的查找规则）"""
+        return [os.path.abspath(self.tool_path)]
+    
+    def _append_encoding_params(self, cmd_parts: List[str], encoding: Optional[str]):
+        """添加脚本编码参数"""
+        if encoding and encoding != "默认编码":
+            if encoding == "自动检测（不推荐）":
+                encoding = "auto"
+            if system() == "Windows" and self.get_code_page(encoding):
+                cmd_parts.extend(["--code-page", str(self.get_code_page(encoding))])
+            else:
+                cmd_parts.extend(["--encoding", encoding])
+    
+    def _build_export_command(
+        self,
+        script_folder: str,
+        json_folder: str,
+        engine: Optional[str] = None,
+        encoding: Optional[str] = None
+    ) -> List[str]:
+        """构建提取命令（参数列表，路径原样传递）"""
+        # 构建基础命令
+        cmd_parts = self._tool_command() + [
+            "export", 
+            "--recursive"
+        ]
+        
+        # 添加引擎类型参数
+        script_type = self._get_script_type_param(engine) if engine else None
+        if script_type:
+            cmd_parts.extend(["--script-type", script_type])
+
+        # 添加编码参数
+        self._append_encoding_params(cmd_parts, encoding)
+        
+        # 添加路径参数
+        cmd_parts.extend([script_folder, json_folder])
+        
+        return cmd_parts
+    
+    def _build_import_command(
+        self,
+        script_folder: str,
+        json_folder: str,
+        output_folder: str,
+        engine: Optional[str] = None,
+        encoding: Optional[str] = None,
+        patched_encoding: Optional[str] = None
+    ) -> List[str]:
+        """构建注入命令（参数列表，路径原样传递）"""
+        # 构建基础命令
+        cmd_parts = self._tool_command() + [
+            "import",
+            "--recursive"
+        ]
+        
+        # 添加引擎类型参数
+        script_type = self._get_script_type_param(engine) if engine else None
+        if script_type:
+            cmd_parts.extend(["--script-type", script_type])
+        
+        # 添加编码参数
+        self._append_encoding_params(cmd_parts, encoding)
+        if patched_encoding and patched_encoding != "默认编码":
+            # Windows 下优先使用Windows API进行字符转换，以避免潜在的Private Use Area字符问题
+            if system() == "Windows" and self.get_code_page(patched_encoding):
+                cmd_parts.extend(["--patched-code-page", str(self.get_code_page(patched_encoding))])
+            else:
+                cmd_parts.extend(["--patched-encoding", patched_encoding])
+        
+        # 添加路径参数
+        cmd_parts.extend([script_folder, json_folder, output_folder])
+        
+        return cmd_parts
+    
     def extract(
         self,
         script_folder: str,
@@ -153,40 +247,11 @@ class MsgToolExecutor(CommandExecutor):
         Returns:
             ExecutionResult: 执行结果
         """
-        # 转义路径
-        script_path = self._escape_path(script_folder)
-        json_path = self._escape_path(json_folder)
-        
-        # 构建基础命令
-        cmd_parts = [
-            f".\\{self.executable}",
-            "export", 
-            "--recursive"
-        ]
-        
-        # 添加引擎类型参数
-        script_type = self._get_script_type_param(engine) if engine else None
-        if script_type:
-            cmd_parts.extend(["--script-type", script_type])
-
-        # 添加编码参数
-        if encoding and encoding != "默认编码":
-            if encoding == "自动检测（不推荐）":
-                encoding = "auto"
-            if system() == "Windows" and self.get_code_page(encoding):
-                cmd_parts.extend(["--code-page", str(self.get_code_page(encoding))])
-            else:
-                cmd_parts.extend(["--encoding", encoding])
-        
-        # 添加路径参数
-        cmd_parts.extend([script_path, json_path])
-        
-        # 构建完整命令
-        command = " ".join(cmd_parts)
+        command = self._build_export_command(script_folder, json_folder, engine, encoding)
         
         # 输出命令用于调试
         if output_callback:
-            output_callback(f"正在执行: {command}")
+            output_callback(f"正在执行: {self.format_command(command)}")
         
         return self.execute(command, timeout=300, output_callback=output_callback)
     
@@ -214,56 +279,163 @@ class MsgToolExecutor(CommandExecutor):
         Returns:
             ExecutionResult: 执行结果
         """
-        # 转义路径
-        script_path = self._escape_path(script_folder)
-        json_path = self._escape_path(json_folder)
-        output_path = self._escape_path(output_folder)
+        command = self._build_import_command(
+            script_folder, json_folder, output_folder, engine, encoding, patched_encoding
+        )
         
-        # 构建基础命令
-        cmd_parts = [
-            f".\\{self.executable}",
-            "import",
-            "--recursive"
-        ]
+        # 输出命令用于调试
+        if output_callback:
+            output_callback(f"正在执行: {self.format_command(command)}")
         
-        # 添加引擎类型参数
-        script_type = self._get_script_type_param(engine) if engine else None
-        if script_type:
-            cmd_parts.extend(["--script-type", script_type])
+        return self.execute(command, timeout=600, output_callback=output_callback)
+    
+    def extract_sharded(
+        self,
+        script_folder: str,
+        json_folder: str,
+        engine: Optional[str] = None,
+        encoding: Optional[str] = None,
+        shards: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        output_callback: Optional[Callable[[str], None]] = None
+    ) -> ExecutionResult:
+        """分片并行提取脚本到JSON
         
-        # 添加编码参数
-        if encoding and encoding != "默认编码":
-            if encoding == "自动检测（不推荐）":
-                encoding = "auto"
-            if system() == "Windows" and self.get_code_page(encoding):
-                cmd_parts.extend(["--code-page", str(self.get_code_page(encoding))])
-            else:
-                cmd_parts.extend(["--encoding", encoding])
-        if patched_encoding and patched_encoding != "默认编码":
-            # Windows 下优先使用Windows API进行字符转换，以避免潜在的Private Use Area字符问题
-            if system() == "Windows" and self.get_code_page(patched_encoding):
-                cmd_parts.extend(["--patched-code-page", str(self.get_code_page(patched_encoding))])
-            else:
-                cmd_parts.extend(["--patched-encoding", patched_encoding])
+        按总字节数将脚本树均衡划分为多个分片，并发运行多个msg-tool进程，
+        所有分片成功后按原相对路径将各分片的JSON合并到json_folder，否则保留暂存目录。
+        仅适用于各脚本文件相互独立的引擎。
         
-        # 添加路径参数
-        cmd_parts.extend([script_path, json_path, output_path])
+        Args:
+            script_folder: 日文脚本文件夹路径
+            json_folder: JSON保存文件夹路径
+            engine: 指定的引擎类型
+            encoding: 指定的文件编码
+            shards: 分片数（默认为CPU核心数）
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            output_callback: 实时输出回调函数
+            
+        Returns:
+            ExecutionResult: 汇总后的执行结果，shard_timings包含各分片耗时
+        """
+        start_time = time.time()
         
-        # 构建完整命令
-        command = " ".join(cmd_parts)
+        with TempFileManager(self._staging_root(script_folder)) as temp_manager:
+            staging_dir = temp_manager.create_temp_dir(prefix="msgtool_shards_")
+            staged = self._stage_scripts(script_folder, staging_dir, shards)
+            
+            jobs = []
+            for i, (shard_scripts, _) in enumerate(staged):
+                shard_json = os.path.join(staging_dir, f"json_{i}")
+                FileOperations.ensure_dir_exists(shard_json)
+                jobs.append((
+                    self._build_export_command(shard_scripts, shard_json, engine, encoding),
+                    shard_json
+                ))
+            
+            results = self._run_shards(jobs, 300, max_concurrency, output_callback)
+            result = self._aggregate_results(results, start_time, [files for _, files in staged])
+            self._complete_shards(
+                result, [output for _, output in jobs], json_folder, temp_manager, staging_dir
+            )
         
-        # 输出命令用于调试
+        self._report_shard_timings(result, output_callback)
+        return result
+    
+    def inject_sharded(
+        self,
+        script_folder: str,
+        json_folder: str,
+        output_folder: str,
+        engine: Optional[str] = None,
+        encoding: Optional[str] = None,
+        patched_encoding: Optional[str] = None,
+        shards: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        output_callback: Optional[Callable[[str], None]] = None
+    ) -> ExecutionResult:
+        """分片并行注入JSON回脚本
+        
+        每个分片只链接自身脚本对应的JSON，所有分片成功且生成的sjis_ext.bin一致时
+        才将各分片输出按原相对路径合并到output_folder，否则结果标记为失败并保留暂存目录。
+        
+        Args:
+            script_folder: 原始日文脚本文件夹路径
+            json_folder: 译文JSON文件夹路径
+            output_folder: 输出脚本文件夹路径
+            engine: 指定的引擎类型
+            encoding: 指定的文件编码
+            patched_encoding: 指定的注入编码
+            shards: 分片数（默认为CPU核心数）
+            max_concurrency: 同时运行的最大进程数（默认为CPU核心数）
+            output_callback: 实时输出回调函数
+            
+        Returns:
+            ExecutionResult: 汇总后的执行结果，shard_timings包含各分片耗时
+        """
+        start_time = time.time()
+        
+        with TempFileManager(self._staging_root(script_folder)) as temp_manager:
+            staging_dir = temp_manager.create_temp_dir(prefix="msgtool_shards_")
+            staged = self._stage_scripts(script_folder, staging_dir, shards)
+            
+            jobs = []
+            for i, (shard_scripts, _) in enumerate(staged):
+                shard_json = os.path.join(staging_dir, f"json_{i}")
+                shard_output = os.path.join(staging_dir, f"output_{i}")
+                self._link_shard_json(shard_scripts, json_folder, shard_json)
+                FileOperations.ensure_dir_exists(shard_output)
+                
+                jobs.append((
+                    self._build_import_command(
+                        shard_scripts, shard_json, shard_output,
+                        engine, encoding, patched_encoding
+                    ),
+                    shard_output
+                ))
+            
+            results = self._run_shards(jobs, 600, max_concurrency, output_callback)
+            result = self._aggregate_results(results, start_time, [files for _, files in staged])
+            self._complete_shards(
+                result, [output for _, output in jobs], output_folder, temp_manager, staging_dir,
+                check_sjis_ext=True
+            )
+        
+        self._report_shard_timings(result, output_callback)
+        return result
+    
+    def _report_shard_timings(
+        self,
+        result: ExecutionResult,
+        output_callback: Optional[Callable[[str], None]]
+    ):
+        """输出各分片耗时，便于调整分片数"""
         if output_callback:
-            output_callback(f"正在执行: {command}")
+            for line in self.format_shard_timings(result):
+                output_callback(line)
+    
+    def get_version(self, use_cache: bool = True) -> ExecutionResult:
+        """获取msg-tool版本信息
         
-        return self.execute(command, timeout=600, output_callback=output_callback)
+        Args:
+            use_cache: 是否使用缓存的结果（工具文件变化后自动失效，仅缓存成功的结果）
+        """
+        if use_cache:
+            cached = CapabilityCache.get("version", self.tool_path)
+            if cached is not None:
+                return cached
+        
+        command = self._tool_command() + ["--version"]
+        result = self.execute(command, timeout=10)
+        if result.status == ExecutionStatus.COMPLETED:
+            CapabilityCache.put("version", self.tool_path, result)
+        return result
     
-    def get_version(self) -> ExecutionResult:
-        """获取msg-tool版本信息"""
-        command = f".\\{self.executable} --version"
-        return self.execute(command, timeout=10)
+    def invalidate_capabilities(self):
+        """清除该工具的可用性与版本缓存"""
+        CapabilityCache.invalidate(self.msgtool_dir)
+        CapabilityCache.invalidate(self.tool_path)
     
     def get_help(self) -> ExecutionResult:
         """获取msg-tool帮助信息"""
-        command = f".\\{self.executable} --help"
+        command = self._tool_command() + ["--help"]
         return self.execute(command, timeout=10)
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+进度报告工具
+结构化的文件处理进度事件及其节流发送
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..core.file_operations import FileOperations
+
+
+@dataclass
+class ProgressEvent:
+    """处理进度事件"""
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    elapsed: float
+    current_file: str = ""
+    finished: bool = False
+    
+    @property
+    def fraction(self) -> float:
+        """完成比例（0~1），优先按字节数计算"""
+        if self.bytes_total > 0:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        if self.files_total > 0:
+            return min(1.0, self.files_done / self.files_total)
+        return 1.0 if self.finished else 0.0
+    
+    @property
+    def percent(self) -> float:
+        """完成百分比（0~100）"""
+        return self.fraction * 100
+    
+    @property
+    def throughput(self) -> float:
+        """处理速度（字节/秒）"""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def eta(self) -> Optional[float]:
+        """预计剩余时间（秒），无法估计时返回None"""
+        if self.finished:
+            return 0.0
+        fraction = self.fraction
+        if fraction <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+    
+    def format(self) -> str:
+        """格式化为进度条旁显示的文本"""
+        parts = [f"{self.files_done}/{self.files_total} 个文件"]
+        if self.bytes_total > 0:
+            parts.append(f"{self.throughput / (1024 * 1024):.2f} MB/s")
+        eta = self.eta
+        if eta is not None and not self.finished:
+            minutes, seconds = divmod(int(eta + 0.5), 60)
+            parts.append(f"剩余 {minutes:02d}:{seconds:02d}")
+        return " | ".join(parts)
+
+
+class ProgressReporter:
+    """进度报告器
+    
+    累计已处理的文件数与字节数，并按min_interval节流地发送ProgressEvent，
+    避免大量小文件时事件本身挤满界面队列。完成事件总会发送。
+    """
+    
+    def __init__(
+        self,
+        callback: Callable[[ProgressEvent], None],
+        files_total: int,
+        bytes_total: int = 0,
+        min_interval: float = 0.25
+    ):
+        """
+        初始化进度报告器
+        
+        Args:
+            callback: 进度事件回调
+            files_total: 文件总数
+            bytes_total: 字节总数（0表示只按文件数计算进度）
+            min_interval: 两次事件之间的最小间隔（秒）
+        """
+        self.callback = callback
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.min_interval = min_interval
+        
+        self.files_done = 0
+        self.bytes_done = 0
+        self._start_time = time.time()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def for_files(
+        cls,
+        callback: Callable[[ProgressEvent], None],
+        file_paths: Iterable[str],
+        min_interval: float = 0.25
+    ) -> 'ProgressReporter':
+        """按文件列表创建报告器（统计总字节数）"""
+        sizes = [FileOperations.get_file_size(path) for path in file_paths]
+        return cls(callback, len(sizes), sum(sizes), min_interval)
+    
+    def advance(self, current_file: str = "", nbytes: int = 0, files: int = 1):
+        """记录已完成的文件
+        
+        Args:
+            current_file: 刚完成的文件名
+            nbytes: 该文件的字节数
+            files: 完成的文件数
+        """
+        with self._lock:
+            self.files_done += files
+            self.bytes_done += nbytes
+            now = time.time()
+            if now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            event = self._create_event(current_file, now, finished=False)
+        
+        self.callback(event)
+    
+    def finish(self):
+        """发送完成事件"""
+        with self._lock:
+            event = self._create_event("", time.time(), finished=True)
+        self.callback(event)
+    
+    def _create_event(self, current_file: str, now: float, finished: bool) -> ProgressEvent:
+        """根据当前累计值生成事件"""
+        return ProgressEvent(
+            files_done=self.files_done,
+            files_total=self.files_total,
+            bytes_done=self.bytes_done,
+            bytes_total=self.bytes_total,
+            elapsed=now - self._start_time,
+            current_file=current_file,
+            finished=finished
+        )
+
+
+class ToolOutputProgressParser:
+    """从外部工具的输出行中识别已处理的脚本文件
+    
+    外部工具没有统一的进度格式，这里在输出行中查找脚本文件名（含或不含扩展名），
+    每个文件首次出现时计为处理完成。不同子目录中的同名文件按输出中的相对路径区分，
+    输出只有文件名而无法区分时，这些同名文件一并计为完成。
+    """
+    
+    # 输出行中类似文件名的片段
+    _NAME_PATTERN = re.compile(r'[^\s\\/:"\'<>|*?()\[\]]+')
+    
+    def __init__(self, script_folder: str, reporter: ProgressReporter):
+        """
+        初始化输出解析器
+        
+        Args:
+            script_folder: 脚本文件夹路径（递归统计文件）
+            reporter: 进度报告器（files_total/bytes_total按脚本文件夹设置）
+        """
+        self.reporter = reporter
+        # 相对路径（以/分隔） -> 字节数
+        self._pending: Dict[str, int] = {}
+        # 文件名 -> 同名文件的相对路径
+        self._paths_by_name: Dict[str, List[str]] = {}
+        self._stems: Dict[str, str] = {}
+        
+        files = FileOperations.list_files(script_folder, recursive=True) if os.path.isdir(script_folder) else []
+        for file_path in files:
+            rel_path = os.path.relpath(file_path, script_folder).replace(os.sep, "/")
+            name = os.path.basename(file_path)
+            self._pending[rel_path] = FileOperations.get_file_size(file_path)
+            self._paths_by_name.setdefault(name, []).append(rel_path)
+            self._stems.setdefault(os.path.splitext(name)[0], name)
+        
+        reporter.files_total = len(files)
+        reporter.bytes_total = sum(self._pending.values())
+    
+    @classmethod
+    def create(
+        cls,
+        script_folder: str,
+        callback: Callable[[ProgressEvent], None],
+        min_interval: float = 0.25
+    ) -> 'ToolOutputProgressParser':
+        """创建解析器及其报告器"""
+        return cls(script_folder, ProgressReporter(callback, 0, 0, min_interval))
+    
+    def feed(self, line: str):
+        """解析一行输出"""
+        if not self._pending:
+            return
+        path_text = line.replace("\\", "/")
+        for token in self._NAME_PATTERN.findall(line):
+            name = token if token in self._paths_by_name else self._stems.get(token)
+            if name is None:
+                # 去掉工具追加的.json等扩展名后再匹配
+                name = self._stems.get(os.path.splitext(token)[0])
+            if name is None:
+                continue
+            
+            rel_paths = self._paths_by_name[name]
+            if len(rel_paths) > 1:
+                mentioned = [
+                    path for path in rel_paths
+                    if "/" in path and self._mentions_path(path_text, path)
+                ]
+                if mentioned:
+                    rel_paths = [max(mentioned, key=len)]
+            for rel_path in rel_paths:
+                nbytes = self._pending.pop(rel_path, None)
+                if nbytes is not None:
+                    self.reporter.advance(name, nbytes)
+    
+    @staticmethod
+    def _mentions_path(path_text: str, rel_path: str) -> bool:
+        """输出行中是否出现该相对路径（扩展名可被工具替换）"""
+        stem = os.path.splitext(rel_path)[0]
+        return re.search(
+            r'(?:^|[\s/"\'(\[<:])' + re.escape(stem) + r'(?=$|[.\s"\')\]>:,])', path_text
+        ) is not None
+    
+    def wrap(self, output_callback: Optional[Callable[[str], None]]) -> Callable[[str], None]:
+        """包装输出回调，在转发输出的同时解析进度"""
+        def callback(line: str):
+            self.feed(line)
+            if output_callback:
+                output_callback(line)
+        return callback
+    
+    def finish(self):
+        """发送完成事件"""
+        self.reporter.finish()
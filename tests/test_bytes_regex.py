@@ -0,0 +1,175 @@
+"""
+测试字节级正则匹配
+"""
+
+import unittest
+import tempfile
+import os
+import re
+import shutil
+
+from src.core.bytes_regex import BytesRegex, translate_pattern
+from src.core.regex_processor import RegexProcessor
+from src.models.translation_data import TranslationData
+
+
+MESSAGE_PATTERN = r"「(.*?)」"
+NAME_PATTERN = r"【(.*?)】"
+
+
+def _entries(data: TranslationData):
+    return [(entry.message, entry.name) for entry in data]
+
+
+class TestTranslatePattern(unittest.TestCase):
+    """正则表达式转换测试"""
+    
+    def test_non_ascii_literal(self):
+        """测试非ASCII字符转换为编码后的字节"""
+        pattern = translate_pattern("「(.+)」", "cp932")
+        self.assertEqual(pattern, rb"(?:\x81\x75)([^\r\n]+)(?:\x81\x76)")
+    
+    def test_dotall_keeps_dot(self):
+        """测试DOTALL时.保持原样"""
+        self.assertEqual(translate_pattern("a(.*)", "utf-8", dotall=True), b"a(.*)")
+    
+    def test_unsupported_patterns(self):
+        """测试字节语义不同的表达式被拒绝"""
+        for pattern in (r"(\w+)", r"[あい]", r"(.)", r"(?i)a", r"\x81"):
+            with self.assertRaises(ValueError, msg=pattern):
+                translate_pattern(pattern, "cp932")
+    
+    def test_unsupported_encoding(self):
+        """测试不支持的编码"""
+        with self.assertRaises(ValueError):
+            BytesRegex.compile(re.compile(MESSAGE_PATTERN), None, "utf-16")
+        with self.assertRaises(ValueError):
+            BytesRegex.compile(re.compile(MESSAGE_PATTERN, re.IGNORECASE), None, "utf-8")
+
+
+class TestBytesRegex(unittest.TestCase):
+    """字节匹配测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def _compare(self, path: str, message_pattern: str, name_pattern, encoding: str):
+        message_regex = re.compile(message_pattern)
+        name_regex = re.compile(name_pattern) if name_pattern else None
+        expected, _ = RegexProcessor._extract_from_single_file(path, message_regex, name_regex, encoding)
+        actual = BytesRegex.compile(message_regex, name_regex, encoding).extract_file(path)
+        self.assertIsNotNone(actual)
+        self.assertEqual(_entries(actual), _entries(expected))
+        return actual
+    
+    def test_matches_text_mode_sjis(self):
+        """测试SJIS脚本的字节匹配结果与文本匹配一致（含CRLF与多行）"""
+        text = "【太郎】「表示テスト」\r\n地の文\r\n「ソース」\r\n【花子】「能力\r\n二行目」\n"
+        path = self._write("a.txt", text.encode("cp932"))
+        actual = self._compare(path, MESSAGE_PATTERN, NAME_PATTERN, "cp932")
+        self.assertEqual(_entries(actual), [("表示テスト", "太郎"), ("ソース", None)])
+    
+    def test_matches_text_mode_utf8(self):
+        """测试UTF-8脚本与ASCII字符类"""
+        text = '#name "太郎"\ntext "こんにちは"\ntext "世界"\n'
+        path = self._write("b.txt", text.encode("utf-8"))
+        actual = self._compare(path, r'text "([^"]*)"', r'#name "([^"]+)"', "utf-8")
+        self.assertEqual(_entries(actual), [("こんにちは", "太郎"), ("世界", None)])
+    
+    def test_empty_file(self):
+        """测试空文件"""
+        path = self._write("empty.txt", b"")
+        scanner = BytesRegex.compile(re.compile(MESSAGE_PATTERN), None, "cp932")
+        self.assertEqual(len(scanner.extract_file(path)), 0)
+    
+    def test_misaligned_match_falls_back(self):
+        """测试匹配落在双字节字符的第二字节上时放弃字节匹配"""
+        # 「ゾ」的SJIS编码为0x83 0x5D，第二字节与]相同
+        data = "[ゾ]".encode("cp932")
+        scanner = BytesRegex.compile(re.compile(r"\[(.+?)\]"), None, "cp932")
+        self.assertIsNone(scanner.extract(data))
+        self.assertEqual(_entries(scanner.extract("[ab]".encode("cp932"))), [("ab", None)])
+    
+    def test_newline_sensitive_pattern_with_cr(self):
+        """测试依赖换行符的表达式遇到CR时放弃字节匹配"""
+        scanner = BytesRegex.compile(re.compile(r"^text (.+)$", re.MULTILINE), None, "utf-8")
+        self.assertIsNone(scanner.extract(b"text a\r\n"))
+        self.assertEqual(_entries(scanner.extract(b"text a\ntext b\n")), [("a", None), ("b", None)])
+
+
+class TestBytesModeExtraction(unittest.TestCase):
+    """字节模式提取测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.script_folder = os.path.join(self.temp_dir, "script_jp")
+        os.makedirs(self.script_folder)
+        
+        for i in range(3):
+            with open(os.path.join(self.script_folder, f"scene{i}.txt"), 'wb') as f:
+                f.write(f"【太郎】「ゾンビ{i}」\r\n「[ゾ]{i}」\r\n".encode("cp932"))
+        
+        self.processor = RegexProcessor()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _load_all(self, json_folder: str):
+        return {
+            name: _entries(TranslationData.load_from_file(os.path.join(json_folder, name)))
+            for name in sorted(os.listdir(json_folder)) if name.endswith(".json")
+        }
+    
+    def test_bytes_mode_matches_text_mode(self):
+        """测试字节模式与文本模式提取结果一致"""
+        for parallel in (False, True):
+            text_folder = os.path.join(self.temp_dir, f"text{parallel}")
+            bytes_folder = os.path.join(self.temp_dir, f"bytes{parallel}")
+            for folder, bytes_mode in ((text_folder, False), (bytes_folder, True)):
+                result = self.processor.extract_with_regex(
+                    self.script_folder, folder, MESSAGE_PATTERN, NAME_PATTERN, "cp932",
+                    parallel=parallel, max_workers=2, bytes_mode=bytes_mode
+                )
+                self.assertTrue(result.success, result.message)
+                self.assertEqual(result.total_matches, 6)
+            self.assertEqual(self._load_all(bytes_folder), self._load_all(text_folder))
+    
+    def test_misaligned_files_fall_back(self):
+        """测试匹配位置不在字符边界上的文件改用文本匹配"""
+        text_folder = os.path.join(self.temp_dir, "text")
+        bytes_folder = os.path.join(self.temp_dir, "bytes")
+        for folder, bytes_mode in ((text_folder, False), (bytes_folder, True)):
+            result = self.processor.extract_with_regex(
+                self.script_folder, folder, r"\[(.+?)\]", None, "cp932", bytes_mode=bytes_mode
+            )
+            self.assertTrue(result.success, result.message)
+        self.assertEqual(self._load_all(bytes_folder), self._load_all(text_folder))
+    
+    def test_unsupported_pattern_uses_text_mode(self):
+        """测试不支持的表达式改用文本匹配并提示"""
+        messages = []
+        json_folder = os.path.join(self.temp_dir, "json")
+        result = self.processor.extract_with_regex(
+            self.script_folder, json_folder, r"「(\w+)」", None, "cp932",
+            output_callback=messages.append, bytes_mode=True
+        )
+        self.assertTrue(result.success, result.message)
+        self.assertEqual(result.total_matches, 3)
+        self.assertTrue(any("改用文本匹配" in message for message in messages))
+
+
+if __name__ == '__main__':
+    unittest.main()
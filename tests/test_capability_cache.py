@@ -0,0 +1,77 @@
+"""
+测试工具能力探测缓存
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest.mock import Mock
+
+from src.utils.capability_cache import CapabilityCache
+from src.utils.msgtool_executor import MsgToolExecutor
+from src.utils.command_executor import ExecutionResult, ExecutionStatus
+from src.core.vntext_processor import VNTextProcessor
+
+
+class TestCapabilityCache(unittest.TestCase):
+    """能力探测缓存测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        CapabilityCache.invalidate()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        CapabilityCache.invalidate()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_probe_runs_once_until_path_changes(self):
+        """测试路径不变时只探测一次，文件变化后重新探测"""
+        tool_path = os.path.join(self.temp_dir, "tool.exe")
+        probe = Mock(side_effect=["v1", "v2"])
+        
+        self.assertEqual(CapabilityCache.get_or_probe("version", tool_path, probe), "v1")
+        self.assertEqual(CapabilityCache.get_or_probe("version", tool_path, probe), "v1")
+        self.assertEqual(probe.call_count, 1)
+        
+        with open(tool_path, "w") as f:
+            f.write("new tool")
+        self.assertEqual(CapabilityCache.get_or_probe("version", tool_path, probe), "v2")
+    
+    def test_process_level_probe_and_invalidate(self):
+        """测试无路径的探测及显式失效"""
+        probe = Mock(side_effect=[True, False])
+        
+        self.assertTrue(CapabilityCache.get_or_probe("console_utf8", None, probe))
+        self.assertTrue(CapabilityCache.get_or_probe("console_utf8", None, probe))
+        CapabilityCache.invalidate(name="console_utf8")
+        self.assertFalse(CapabilityCache.get_or_probe("console_utf8", None, probe))
+    
+    def test_msgtool_version_cached_only_on_success(self):
+        """测试msg-tool版本信息只缓存成功结果"""
+        executor = MsgToolExecutor(self.temp_dir)
+        failed = ExecutionResult(ExecutionStatus.FAILED, 1, "", "", 0.0, "--version")
+        completed = ExecutionResult(ExecutionStatus.COMPLETED, 0, "msg-tool 1.0", "", 0.0, "--version")
+        executor.execute = Mock(side_effect=[failed, completed])
+        
+        self.assertEqual(executor.get_version().status, ExecutionStatus.FAILED)
+        self.assertEqual(executor.get_version().stdout, "msg-tool 1.0")
+        self.assertEqual(executor.get_version().stdout, "msg-tool 1.0")
+        self.assertEqual(executor.execute.call_count, 2)
+    
+    def test_vntextpatch_status_follows_directory(self):
+        """测试VNTextPatch状态在目录内容变化后刷新"""
+        processor = VNTextProcessor(self.temp_dir)
+        self.assertFalse(processor.check_vntextpatch_availability().success)
+        
+        with open(os.path.join(self.temp_dir, "VNTextPatch.exe"), "w") as f:
+            f.write("dummy")
+        result = processor.check_vntextpatch_availability(refresh=True)
+        self.assertTrue(result.success)
+        self.assertIn("VNTextPatchGBK.exe ✗", result.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
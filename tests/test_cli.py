@@ -0,0 +1,121 @@
+"""
+测试命令行入口
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import json
+import shutil
+import subprocess
+import sys
+from contextlib import redirect_stdout, redirect_stderr
+
+from src import cli
+from src.core.sjis_handler import SJISReplacementManifest
+
+
+MESSAGE_PATTERN = r"「(.*?)」"
+NAME_PATTERN = r"【(.*?)】"
+
+
+class TestCli(unittest.TestCase):
+    """命令行入口测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.script_folder = os.path.join(self.temp_dir, "script_jp")
+        self.json_folder = os.path.join(self.temp_dir, "json_jp")
+        self.output_folder = os.path.join(self.temp_dir, "script_cn")
+        self.config_dir = os.path.join(self.temp_dir, "config")
+        os.makedirs(self.script_folder)
+        os.makedirs(self.config_dir)
+        
+        for i in range(2):
+            with open(os.path.join(self.script_folder, f"scene{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"【太郎】「こんにちは{i}」\n")
+        
+        # 配置文件提供正则与编码
+        with open(os.path.join(self.config_dir, "user_config.ini"), 'w', encoding='utf-8') as f:
+            f.write("[RegexSettings]\n")
+            f.write(f"message_regex = {MESSAGE_PATTERN}\n")
+            f.write(f"name_regex = {NAME_PATTERN}\n")
+            f.write("[Encoding]\njapanese_encoding = utf-8\nchinese_encoding = utf-8\n")
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def run_cli(self, *argv):
+        """运行命令行并解析JSON结果"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            code = cli.main(list(argv) + ["--config", self.config_dir])
+        return code, json.loads(stdout.getvalue())
+    
+    def test_regex_extract_and_inject(self):
+        """测试正则模式提取与注入，参数从配置目录读取"""
+        code, report = self.run_cli(
+            "extract", "--mode", "regex",
+            "--script", self.script_folder, "--json", self.json_folder, "--progress"
+        )
+        self.assertEqual(code, 0, report["message"])
+        self.assertTrue(report["success"])
+        self.assertEqual(report["result"]["processed_files"], 2)
+        self.assertEqual(report["result"]["total_matches"], 2)
+        self.assertGreaterEqual(report["timings"]["total"], report["timings"]["run"])
+        
+        code, report = self.run_cli(
+            "inject", "--mode", "regex", "--script", self.script_folder,
+            "--json-jp", self.json_folder, "--json", self.json_folder,
+            "--output", self.output_folder
+        )
+        self.assertEqual(code, 0, report["message"])
+        self.assertEqual(len(report["result"]["file_stats"]), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.output_folder, "scene0.txt")))
+    
+    def test_regex_inject_sjis_folder_incremental(self):
+        """测试命令行启用生成_replaced文件夹时的增量SJIS替换"""
+        self.run_cli(
+            "extract", "--mode", "regex", "--script", self.script_folder, "--json", self.json_folder
+        )
+        code, report = self.run_cli(
+            "inject", "--mode", "regex", "--script", self.script_folder,
+            "--json-jp", self.json_folder, "--json", self.json_folder,
+            "--output", self.output_folder,
+            "--sjis-replace", "--sjis-folder", "--sjis-incremental"
+        )
+        self.assertEqual(code, 0, report["message"])
+        self.assertTrue(os.path.exists(
+            os.path.join(self.json_folder + "_replaced", SJISReplacementManifest.FILENAME)
+        ))
+    
+    def test_failure_exit_code(self):
+        """测试处理失败时返回非零退出码"""
+        code, report = self.run_cli(
+            "extract", "--mode", "regex",
+            "--script", os.path.join(self.temp_dir, "missing"), "--json", self.json_folder
+        )
+        self.assertEqual(code, 1)
+        self.assertFalse(report["success"])
+    
+    def test_no_gui_imports(self):
+        """测试命令行入口不导入tkinter/ttkbootstrap"""
+        code = (
+            "import sys; from src import cli; "
+            "cli.build_parser(); "
+            "import src.core.regex_processor, src.core.vntext_processor, src.core.msgtool_processor; "
+            "print(any(m.split('.')[0] in ('tkinter', '_tkinter', 'ttkbootstrap') or m.startswith('src.gui') "
+            "for m in sys.modules))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+        )
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
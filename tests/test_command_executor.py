@@ -0,0 +1,515 @@
+"""
+测试命令执行器功能
+"""
+
+import asyncio
+import unittest
+import tempfile
+import os
+import sys
+import shutil
+import signal
+import threading
+import time
+
+from src.utils.command_executor import (
+    CommandExecutor, AsyncCommandExecutor, VNTextPatchExecutor, ExecutionStatus,
+    ExecutionResult, OutputCaptureConfig
+)
+from src.core.file_operations import TempFileManager
+from src.utils.msgtool_executor import MsgToolExecutor
+
+
+# 模拟VNTextPatch/msg-tool的脚本：提取时将每个脚本内容写入同名JSON，
+# 注入时将JSON内容追加到脚本后输出；处理内容为fail的脚本后以错误码退出
+FAKE_VNTEXTPATCH = r'''
+import os, sys
+mode = sys.argv[1]
+args = [arg for arg in sys.argv[2:] if not arg.startswith("--")]
+src = args[0]
+failed = False
+for root, _, files in os.walk(src):
+    for name in files:
+        path = os.path.join(root, name)
+        rel = os.path.relpath(path, src)
+        stem = os.path.splitext(rel)[0]
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        if mode in ("extractlocal", "export"):
+            out = os.path.join(args[1], stem + ".json")
+            data = content
+        else:
+            with open(os.path.join(args[1], stem + ".json"), encoding="utf-8") as f:
+                data = content + f.read()
+            out = os.path.join(args[2], rel)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(data)
+        print("processed", rel)
+        failed = failed or content == "fail"
+sys.exit(1 if failed else 0)
+'''
+
+
+class TestCommandExecutor(unittest.TestCase):
+    """命令执行器测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.executor = CommandExecutor()
+    
+    def python_command(self, code):
+        """构建执行Python代码的命令"""
+        return [sys.executable, "-c", code]
+    
+    def test_captures_complete_output(self):
+        """测试完整捕获大量输出及末尾无换行的内容"""
+        code = (
+            "import sys\n"
+            "for i in range(20000): print('line', i)\n"
+            "sys.stderr.write('err\\r\\nlast')\n"
+            "sys.stdout.write('tail')"
+        )
+        lines = []
+        result = self.executor.execute(self.python_command(code), output_callback=lines.append)
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        stdout_lines = result.stdout.split("\n")
+        self.assertEqual(len(stdout_lines), 20001)
+        self.assertEqual(stdout_lines[-1], "tail")
+        self.assertEqual(result.stderr, "err\nlast")
+        self.assertEqual(len(lines), 20003)
+        self.assertIn("line 19999", lines)
+        self.assertIn("last", lines)
+    
+    def test_shell_command_and_return_code(self):
+        """测试显式指定shell时字符串命令经shell执行并返回退出码"""
+        command = f'"{sys.executable}" -c "import sys; print(42); sys.exit(3)"'
+        result = self.executor.execute(command, shell=True)
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertEqual(result.return_code, 3)
+        self.assertEqual(result.stdout.strip(), "42")
+    
+    def test_string_command_requires_shell(self):
+        """测试未指定shell的字符串命令不会被执行"""
+        marker = os.path.join(tempfile.gettempdir(), f"shell_marker_{os.getpid()}")
+        result = self.executor.execute(f"echo x > {marker}")
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertIn("shell=True", result.error_message)
+        self.assertFalse(os.path.exists(marker))
+    
+    def test_timeout(self):
+        """测试超时后终止进程并保留已有输出"""
+        code = "import time; print('started', flush=True); time.sleep(30)"
+        result = self.executor.execute(self.python_command(code), timeout=1)
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertEqual(result.error_message, "命令执行超时")
+        self.assertIn("started", result.stdout)
+        self.assertLess(result.execution_time, 10)
+    
+    def test_background_child_holding_pipes(self):
+        """测试进程退出后后台子进程仍占用管道时按退出码完成，不等待子进程"""
+        code = (
+            "import subprocess, sys\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+            "print(child.pid)"
+        )
+        self.executor.TERMINATE_GRACE = 0.5
+        result = self.executor.execute(self.python_command(code), timeout=10)
+        os.kill(int(result.stdout.split()[0]), signal.SIGTERM)
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        self.assertEqual(result.return_code, 0)
+        self.assertLess(result.execution_time, 5)
+    
+    def test_cancel_from_other_thread(self):
+        """测试从其他线程取消执行"""
+        started = threading.Event()
+        code = "import time; print('started', flush=True); time.sleep(30)"
+        
+        def on_output(line):
+            if line == "started":
+                started.set()
+        
+        def cancel_when_started():
+            started.wait(10)
+            self.executor.cancel()
+        
+        timer = threading.Thread(target=cancel_when_started)
+        timer.start()
+        result = self.executor.execute(self.python_command(code), output_callback=on_output)
+        timer.join()
+        
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+        self.assertLess(result.execution_time, 10)
+    
+    def test_cancel_before_process_starts(self):
+        """测试准备执行后、进程创建前的取消不会丢失"""
+        async def run():
+            self.executor._begin_run()
+            self.executor.cancel()
+            return await self.executor._execute_prepared(
+                self.python_command("import time; time.sleep(30)")
+            )
+        
+        result = asyncio.run(run())
+        
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+        self.assertLess(result.execution_time, 10)
+    
+    def test_execute_many_runs_concurrently(self):
+        """测试在同一事件循环中并发执行多条命令"""
+        code = "import time; time.sleep(0.5); print('done')"
+        jobs = [(CommandExecutor(), self.python_command(code)) for _ in range(4)]
+        
+        start = time.time()
+        results = CommandExecutor.execute_many(jobs)
+        
+        self.assertLess(time.time() - start, 1.8)
+        self.assertEqual([r.stdout.strip() for r in results], ["done"] * 4)
+
+
+class TestOutputCapture(unittest.TestCase):
+    """输出捕获测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_ring_buffer_keeps_head_and_tail(self):
+        """测试环形缓冲只保留首尾行并统计省略行数"""
+        log_path = os.path.join(self.temp_dir, "logs", "run.log")
+        executor = CommandExecutor(capture=OutputCaptureConfig(
+            head_lines=3, tail_lines=5, spill_path=log_path
+        ))
+        lines = []
+        code = "for i in range(1000): print(i)"
+        result = executor.execute([sys.executable, "-c", code], output_callback=lines.append)
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(result.dropped_lines, 992)
+        kept = result.stdout.splitlines()
+        self.assertEqual(kept[:3], ["0", "1", "2"])
+        self.assertIn("992", kept[3])
+        self.assertEqual(kept[4:], [str(i) for i in range(995, 1000)])
+        
+        # 回调与日志文件仍获得完整输出
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(result.log_file, log_path)
+        with open(log_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 1000)
+    
+    def test_unbounded_by_default(self):
+        """测试默认完整保留输出"""
+        result = CommandExecutor().execute([sys.executable, "-c", "for i in range(500): print(i)"])
+        
+        self.assertEqual(result.dropped_lines, 0)
+        self.assertIsNone(result.log_file)
+        self.assertEqual(len(result.stdout.splitlines()), 500)
+
+
+class TestAsyncCommandExecutor(unittest.TestCase):
+    """异步任务调度测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.scheduler = AsyncCommandExecutor(max_workers=1, max_results=3)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.scheduler.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def sleep_command(self, seconds, text=""):
+        """构建休眠后输出文本的命令"""
+        return [sys.executable, "-c", f"import time; time.sleep({seconds}); print({text!r})"]
+    
+    def wait_until_running(self, task_id):
+        """等待任务开始运行"""
+        deadline = time.time() + 10
+        while task_id not in self.scheduler.get_running_tasks() and time.time() < deadline:
+            time.sleep(0.01)
+    
+    def test_priority_queue_order(self):
+        """测试按优先级执行，同优先级先进先出"""
+        order = []
+        done = lambda task_id, result: order.append(task_id)
+        
+        self.scheduler.execute_async("blocker", self.sleep_command(0.5), completion_callback=done)
+        self.wait_until_running("blocker")
+        self.scheduler.execute_async("low", self.sleep_command(0), completion_callback=done)
+        self.scheduler.execute_async("high", self.sleep_command(0), completion_callback=done, priority=5)
+        self.scheduler.execute_async("low2", self.sleep_command(0), completion_callback=done)
+        
+        self.assertEqual(self.scheduler.get_pending_tasks(), ["high", "low", "low2"])
+        self.scheduler.wait("low2", timeout=20)
+        self.assertEqual(order, ["blocker", "high", "low", "low2"])
+    
+    def test_worker_limit_and_metrics(self):
+        """测试并发上限与任务耗时统计"""
+        scheduler = AsyncCommandExecutor(max_workers=2)
+        try:
+            for i in range(4):
+                scheduler.execute_async(f"job{i}", self.sleep_command(0.3, f"out{i}"))
+            for i in range(4):
+                result = scheduler.wait(f"job{i}", timeout=20)
+                self.assertEqual(result.stdout.strip(), f"out{i}")
+            
+            metrics = [scheduler.get_metrics(f"job{i}") for i in range(4)]
+            self.assertTrue(all(m.status == ExecutionStatus.COMPLETED for m in metrics))
+            # 后两个任务需要等待前两个完成
+            self.assertGreater(min(m.queue_time for m in metrics[2:]), 0.2)
+            self.assertGreater(min(m.run_time for m in metrics), 0.2)
+        finally:
+            scheduler.shutdown()
+    
+    def test_cancel_pending_and_running(self):
+        """测试取消排队中与运行中的任务"""
+        self.scheduler.execute_async("running", self.sleep_command(30))
+        self.scheduler.execute_async("pending", self.sleep_command(30))
+        self.wait_until_running("running")
+        
+        self.assertTrue(self.scheduler.cancel_task("pending"))
+        self.assertEqual(self.scheduler.get_result("pending").status, ExecutionStatus.CANCELLED)
+        self.assertTrue(self.scheduler.cancel_task("running"))
+        result = self.scheduler.wait("running", timeout=10)
+        
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+        self.assertLess(result.execution_time, 10)
+        self.assertFalse(self.scheduler.cancel_task("running"))
+    
+    def test_cancel_immediately_after_start(self):
+        """测试任务刚标记为运行中时取消"""
+        self.scheduler.execute_async("job", self.sleep_command(30))
+        while self.scheduler.get_status("job") != ExecutionStatus.RUNNING:
+            pass
+        self.assertTrue(self.scheduler.cancel_task("job"))
+        result = self.scheduler.wait("job", timeout=10)
+        
+        self.assertIsNotNone(result)
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+    
+    @unittest.skipIf(sys.platform == "win32", "使用POSIX信号检查进程")
+    def test_cancel_terminates_process_tree(self):
+        """测试取消shell命令时同时结束其子进程"""
+        pid_file = os.path.join(self.temp_dir, "child.pid")
+        child = os.path.join(self.temp_dir, "child.py")
+        parent = os.path.join(self.temp_dir, "parent.py")
+        with open(child, "w") as f:
+            f.write(f"import os, time\nopen({pid_file!r}, 'w').write(str(os.getpid()))\ntime.sleep(30)\n")
+        with open(parent, "w") as f:
+            f.write(f"import subprocess, sys\nsubprocess.run([sys.executable, {child!r}])\n")
+        self.scheduler.execute_async("tree", f'"{sys.executable}" "{parent}"', shell=True)
+        
+        deadline = time.time() + 10
+        while not os.path.exists(pid_file) and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        with open(pid_file) as f:
+            child_pid = int(f.read())
+        
+        self.scheduler.cancel_task("tree")
+        self.scheduler.wait("tree", timeout=10)
+        
+        deadline = time.time() + 5
+        alive = True
+        while alive and time.time() < deadline:
+            try:
+                os.kill(child_pid, 0)
+                time.sleep(0.05)
+            except ProcessLookupError:
+                alive = False
+        self.assertFalse(alive)
+    
+    def test_result_eviction(self):
+        """测试结果按LRU与TTL淘汰"""
+        for i in range(4):
+            self.scheduler.execute_async(f"job{i}", self.sleep_command(0))
+            self.scheduler.wait(f"job{i}", timeout=20)
+            if i == 2:
+                self.scheduler.get_result("job0")  # 访问后不会被优先淘汰
+        
+        self.assertIsNone(self.scheduler.get_result("job1"))
+        self.assertIsNotNone(self.scheduler.get_result("job0"))
+        self.assertIsNotNone(self.scheduler.get_result("job2"))
+        
+        self.scheduler.result_ttl = 0
+        time.sleep(0.01)
+        self.assertIsNone(self.scheduler.get_result("job3"))
+
+
+class TestVNTextPatchExecutor(unittest.TestCase):
+    """VNTextPatch执行器测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp(prefix="vn text ")
+        self.script_folder = os.path.join(self.temp_dir, "script_jp")
+        self.json_folder = os.path.join(self.temp_dir, "json_jp")
+        self.output_folder = os.path.join(self.temp_dir, "script_cn")
+        os.makedirs(os.path.join(self.script_folder, "sub"))
+        
+        for i in range(6):
+            folder = self.script_folder if i % 2 else os.path.join(self.script_folder, "sub")
+            with open(os.path.join(folder, f"scene{i}.ks"), 'w', encoding='utf-8') as f:
+                f.write(f"script{i}" * (i + 1))
+        
+        tool_path = os.path.join(self.temp_dir, "fake_vntextpatch.py")
+        with open(tool_path, 'w', encoding='utf-8') as f:
+            f.write(FAKE_VNTEXTPATCH)
+        
+        self.executor = VNTextPatchExecutor(self.temp_dir)
+        self.executor._tool_argv = lambda exe_name: [sys.executable, tool_path]
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_extract_and_inject_sharded(self):
+        """测试分片提取与注入"""
+        lines = []
+        result = self.executor.extract_sharded(
+            self.script_folder, self.json_folder, shards=3, max_concurrency=2,
+            output_callback=lines.append
+        )
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        self.assertEqual(len(result.command.splitlines()), 3)
+        self.assertEqual(len([line for line in lines if "processed" in line]), 6)
+        with open(os.path.join(self.json_folder, "sub", "scene0.json"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "script0")
+        
+        result = self.executor.inject_sharded(
+            self.script_folder, self.json_folder, self.output_folder, shards=3
+        )
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        with open(os.path.join(self.output_folder, "scene3.ks"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "script3" * 8)
+        
+        # 暂存目录已清理
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            ["fake_vntextpatch.py", "json_jp", "script_cn", "script_jp"]
+        )
+    
+    def test_failed_shard_keeps_staging(self):
+        """测试存在失败的分片时不合并输出并保留暂存目录"""
+        with open(os.path.join(self.script_folder, "scene5.ks"), 'w', encoding='utf-8') as f:
+            f.write("fail")
+        result = self.executor.extract_sharded(self.script_folder, self.json_folder, shards=3)
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertFalse(os.path.exists(self.json_folder))
+        staging = [name for name in os.listdir(self.temp_dir) if name.startswith("vntext_shards_")]
+        self.assertEqual(len(staging), 1)
+        self.assertIn(os.path.join(self.temp_dir, staging[0]), result.error_message)
+    
+    def test_inconsistent_sjis_ext_not_merged(self):
+        """测试各分片的sjis_ext.bin不一致时不合并注入输出"""
+        staging_dir = os.path.join(self.temp_dir, "staging")
+        shard_outputs = []
+        for i in range(2):
+            shard_output = os.path.join(staging_dir, f"output_{i}")
+            os.makedirs(shard_output)
+            with open(os.path.join(shard_output, "sjis_ext.bin"), 'wb') as f:
+                f.write(bytes([i]))
+            shard_outputs.append(shard_output)
+        
+        result = ExecutionResult(ExecutionStatus.COMPLETED, 0, "", "", 0.0, "")
+        with TempFileManager(self.temp_dir) as temp_manager:
+            temp_manager.temp_dirs.append(staging_dir)
+            self.executor._complete_shards(
+                result, shard_outputs, self.output_folder, temp_manager, staging_dir,
+                check_sjis_ext=True
+            )
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertIn("sjis_ext.bin不一致", result.error_message)
+        self.assertFalse(os.path.exists(self.output_folder))
+        self.assertTrue(os.path.exists(os.path.join(shard_outputs[1], "sjis_ext.bin")))
+
+
+
+class TestMsgToolShardedExecution(unittest.TestCase):
+    """msg-tool分片执行测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.script_folder = os.path.join(self.temp_dir, "script_jp")
+        self.json_folder = os.path.join(self.temp_dir, "json_jp")
+        self.output_folder = os.path.join(self.temp_dir, "script_cn")
+        os.makedirs(os.path.join(self.script_folder, "a", "b"))
+        
+        self.sizes = [4000, 1000, 1000, 1000, 500, 500]
+        for i, size in enumerate(self.sizes):
+            folder = os.path.join(self.script_folder, "a", "b") if i % 3 == 0 else self.script_folder
+            with open(os.path.join(folder, f"s{i}.bin"), 'w', encoding='utf-8') as f:
+                f.write("x" * size)
+        
+        tool_path = os.path.join(self.temp_dir, "fake_msgtool.py")
+        with open(tool_path, 'w', encoding='utf-8') as f:
+            f.write(FAKE_VNTEXTPATCH)
+        
+        self.executor = MsgToolExecutor(self.temp_dir)
+        self.executor._tool_command = lambda: [sys.executable, tool_path]
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_sharded_roundtrip_reports_timings(self):
+        """测试分片提取/注入保持相对路径并报告分片耗时"""
+        lines = []
+        result = self.executor.extract_sharded(
+            self.script_folder, self.json_folder, shards=2, output_callback=lines.append
+        )
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        self.assertTrue(os.path.exists(os.path.join(self.json_folder, "a", "b", "s3.json")))
+        self.assertEqual(len(os.listdir(self.json_folder)), 5)
+        
+        # 按字节数均衡：最大文件单独成片
+        timings = sorted(result.shard_timings, key=lambda t: t.total_bytes)
+        self.assertEqual([t.total_bytes for t in timings], [4000, 4000])
+        self.assertEqual(sum(t.file_count for t in timings), 6)
+        self.assertTrue(any(line.startswith("[分片1]") and "耗时" in line for line in lines))
+        
+        result = self.executor.inject_sharded(
+            self.script_folder, self.json_folder, self.output_folder, shards=2
+        )
+        
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        self.assertEqual(len(result.shard_timings), 2)
+        with open(os.path.join(self.output_folder, "a", "b", "s0.bin"), encoding='utf-8') as f:
+            self.assertEqual(len(f.read()), 8000)
+    
+    def test_failed_shard_not_merged(self):
+        """测试注入存在失败的分片时不合并输出并保留暂存目录"""
+        result = self.executor.extract_sharded(self.script_folder, self.json_folder, shards=2)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED, result.error_message)
+        
+        with open(os.path.join(self.script_folder, "s5.bin"), 'w', encoding='utf-8') as f:
+            f.write("fail")
+        result = self.executor.inject_sharded(
+            self.script_folder, self.json_folder, self.output_folder, shards=2
+        )
+        
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertFalse(os.path.exists(self.output_folder))
+        staging = [name for name in os.listdir(self.temp_dir) if name.startswith("msgtool_shards_")]
+        self.assertEqual(len(staging), 1)
+        self.assertIn(staging[0], result.error_message)
+
+
+if __name__ == '__main__':
+    unittest.main()
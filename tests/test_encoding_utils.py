@@ -7,6 +7,7 @@ import tempfile
 import os
 
 from src.utils.encoding_utils import EncodingUtils, EncodingValidator
+from src.utils.mapped_file import MappedFile
 
 
 class TestEncodingUtils(unittest.TestCase):
@@ -15,6 +16,7 @@ class TestEncodingUtils(unittest.TestCase):
     def setUp(self):
         """设置测试环境"""
         self.temp_dir = tempfile.mkdtemp()
+        EncodingUtils.clear_detection_cache()
     
     def tearDown(self):
         """清理测试环境"""
@@ -35,6 +37,96 @@ class TestEncodingUtils(unittest.TestCase):
         self.assertEqual(content, test_content)
         self.assertEqual(encoding, "utf-8")
     
+    def test_detect_encoding_sampled(self):
+        """测试采样检测编码并缓存结果"""
+        test_file = os.path.join(self.temp_dir, "script.txt")
+        text = "「こんにちは、今日はいい天気ですね」\n" * 4000
+        with open(test_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        
+        self.assertEqual(EncodingUtils.detect_encoding(test_file, sample_size=4096).lower(), "utf-8")
+        
+        # 文件变化后缓存失效
+        with open(test_file, 'wb') as f:
+            f.write("测试内容，这是一段较长的中文文本。".encode("gbk"))
+        encoding = EncodingUtils.detect_encoding(test_file, sample_size=4096)
+        self.assertNotEqual(encoding.lower(), "utf-8")
+    
+    def test_directory_encoding_is_only_a_hint(self):
+        """测试同目录的编码只作为提示，不覆盖可信的检测结果"""
+        sjis_file = os.path.join(self.temp_dir, "a.txt")
+        with open(sjis_file, 'wb') as f:
+            f.write((
+                "「おはようございます。今日もいい天気ですね」\n"
+                "「そうですね、散歩に行きましょうか」\n"
+                "彼女は静かに微笑んで、窓の外を眺めていた。\n"
+            ).encode("cp932"))
+        self.assertEqual(EncodingUtils.detect_encoding(sjis_file).lower(), "cp932")
+        
+        # GBK编码的内容也能按cp932严格解码
+        gbk_file = os.path.join(self.temp_dir, "b.txt")
+        gbk_data = (
+            "在世上，每人都有自己的梦。我们应该努力工，学习新的知识，边的友。"
+            "中到很困难，但是只要持下去，就一定能够成功。我们一去公园散步，"
+            "看到了美的花和绿色的木。孩子们在草地上耍，老人们在长椅上聊。"
+        ).encode("gbk")
+        gbk_data.decode("cp932")
+        with open(gbk_file, 'wb') as f:
+            f.write(gbk_data)
+        self.assertNotEqual(EncodingUtils.detect_encoding(gbk_file).lower(), "cp932")
+        
+        # 只含ASCII字节时沿用同目录的编码
+        ascii_file = os.path.join(self.temp_dir, "c.txt")
+        with open(ascii_file, 'wb') as f:
+            f.write(b"*label\n@jump target\n")
+        self.assertEqual(EncodingUtils.detect_encoding(ascii_file).lower(), "cp932")
+    
+    def test_read_file_with_detected_encoding(self):
+        """测试自动检测编码读取文件"""
+        test_file = os.path.join(self.temp_dir, "auto.txt")
+        text = "测试内容，这是一段较长的中文文本。\r\n" * 200
+        with open(test_file, 'wb') as f:
+            f.write(text.encode("gbk"))
+        
+        content, encoding = EncodingUtils.read_file_with_encoding(test_file)
+        
+        self.assertEqual(content, text.replace("\r\n", "\n"))
+        self.assertEqual(text.encode("gbk").decode(encoding), text)
+    
+    def test_read_empty_and_invalid_encoding(self):
+        """测试读取空文件与无效编码名称时回退UTF-8"""
+        empty_file = os.path.join(self.temp_dir, "empty.txt")
+        open(empty_file, 'wb').close()
+        self.assertEqual(EncodingUtils.read_file_with_encoding(empty_file, "sjis"), ("", "sjis"))
+        
+        test_file = os.path.join(self.temp_dir, "utf8.txt")
+        with open(test_file, 'wb') as f:
+            f.write("テスト\r".encode("utf-8"))
+        self.assertEqual(
+            EncodingUtils.read_file_with_encoding(test_file, "invalid_encoding"), ("テスト\n", "utf-8")
+        )
+    
+    def test_mapped_file(self):
+        """测试内存映射读取与零拷贝切片"""
+        test_file = os.path.join(self.temp_dir, "mapped.txt")
+        data = "「一行目」\r\n「二行目」\r".encode("cp932")
+        with open(test_file, 'wb') as f:
+            f.write(data)
+        
+        with MappedFile(test_file) as mapped:
+            self.assertEqual(mapped.size, len(data))
+            self.assertEqual(mapped.buffer[:4], data[:4])
+            with mapped.view(2, 1000) as view:
+                self.assertEqual(view.tobytes(), data[2:])
+            self.assertEqual(mapped.decode("cp932"), "「一行目」\n「二行目」\n")
+        
+        empty_file = os.path.join(self.temp_dir, "empty.txt")
+        open(empty_file, 'wb').close()
+        with MappedFile(empty_file) as mapped:
+            self.assertEqual(mapped.size, 0)
+            self.assertEqual(len(mapped.view()), 0)
+            self.assertEqual(mapped.decode("utf-8"), "")
+    
     def test_encoding_validation(self):
         """测试编码验证"""
         self.assertTrue(EncodingValidator.validate_encoding_name("utf-8"))
@@ -0,0 +1,85 @@
+"""
+测试滚动日志写入器
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest.mock import patch
+
+from src.utils.log_writer import RotatingLogWriter
+
+
+class TestRotatingLogWriter(unittest.TestCase):
+    """滚动日志写入器测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "logs", "output.log")
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_rotation_and_copy(self):
+        """测试按大小滚动并按时间顺序复制完整日志"""
+        writer = RotatingLogWriter(self.log_path, max_bytes=100, backup_count=10)
+        lines = [f"第{i:03d}行\n" for i in range(50)]
+        for line in lines:
+            writer.write(line)
+            writer.flush()
+        
+        self.assertGreater(len(writer.get_log_files()), 1)
+        dest = os.path.join(self.temp_dir, "saved.log")
+        writer.copy_to(dest)
+        writer.close()
+        
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "".join(lines))
+    
+    def test_backup_count_limits_history(self):
+        """测试超出backup_count的旧日志被丢弃"""
+        writer = RotatingLogWriter(self.log_path, max_bytes=10, backup_count=2)
+        for i in range(10):
+            writer.write(f"line {i:02d}\n")
+            writer.flush()
+        writer.close()
+        
+        self.assertEqual(len(writer.get_log_files()), 3)
+        self.assertFalse(os.path.exists(self.log_path + ".3"))
+    
+    def test_reset(self):
+        """测试清空日志"""
+        writer = RotatingLogWriter(self.log_path, max_bytes=10, backup_count=2)
+        writer.write("old text that rotates\n")
+        writer.reset()
+        writer.write("new\n")
+        writer.close()
+        
+        self.assertEqual(writer.get_log_files(), [self.log_path])
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "new\n")
+    
+    def test_failed_rotation_keeps_writing(self):
+        """测试滚动或清空时文件操作失败后仍继续写入当前文件"""
+        writer = RotatingLogWriter(self.log_path, max_bytes=10, backup_count=2)
+        with patch("src.utils.log_writer.os.replace", side_effect=PermissionError):
+            writer.write("first line\n")
+            writer.flush()
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "first line\n")
+        with patch("src.utils.log_writer.os.remove", side_effect=PermissionError):
+            writer.reset()
+            writer.flush()
+        writer.write("after\n")
+        writer.close()
+        
+        self.assertTrue(writer._file.closed)
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "after\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+测试正文/人名扫描
+"""
+
+import unittest
+import re
+
+from src.core.message_scanner import iter_messages
+
+
+MESSAGE_PATTERN = re.compile(r"「(.*?)」")
+NAME_PATTERN = re.compile(r"【(.*?)】")
+
+CONTENT = (
+    "【太郎】「こんにちは」\n"
+    "地の文\n"
+    "「おはよう」\n"
+    "【花子】\n【次郎】\n「さようなら」\n"
+    "【三郎】「」\n"
+    "【末尾】\n"
+)
+
+
+def _collect(content, message_regex, name_regex=None):
+    return [
+        (message_match.group(1), name_match.group(1) if name_match else None)
+        for message_match, name_match in iter_messages(content, message_regex, name_regex)
+    ]
+
+
+class TestIterMessages(unittest.TestCase):
+    """正文/人名扫描测试"""
+    
+    def test_first_name_before_each_message(self):
+        """测试每条正文取前一条正文之后的第一个人名"""
+        self.assertEqual(
+            _collect(CONTENT, MESSAGE_PATTERN, NAME_PATTERN),
+            [("こんにちは", "太郎"), ("おはよう", None), ("さようなら", "花子"), ("", "三郎")]
+        )
+    
+    def test_name_inside_message_match(self):
+        """测试人名位于正文匹配的前缀中"""
+        message_regex = re.compile(r"(?:【.*?】)?「(.*?)」")
+        self.assertEqual(_collect(CONTENT, message_regex, NAME_PATTERN)[0], ("こんにちは", "太郎"))
+    
+    def test_bytes_patterns(self):
+        """测试bytes表达式"""
+        results = _collect(
+            CONTENT.encode("utf-8"),
+            re.compile(MESSAGE_PATTERN.pattern.encode("utf-8")),
+            re.compile(NAME_PATTERN.pattern.encode("utf-8"))
+        )
+        self.assertEqual(results[0], ("こんにちは".encode("utf-8"), "太郎".encode("utf-8")))
+    
+    def test_is_lazy(self):
+        """测试按需生成匹配"""
+        scanner = iter_messages(CONTENT, MESSAGE_PATTERN, NAME_PATTERN)
+        message_match, name_match = next(scanner)
+        self.assertEqual((message_match.group(1), name_match.group(1)), ("こんにちは", "太郎"))
+    
+    def test_patterns_without_groups(self):
+        """测试没有捕获组的表达式"""
+        self.assertEqual(_collect(CONTENT, re.compile(r"「.*?」"), NAME_PATTERN), [])
+        self.assertEqual(
+            _collect(CONTENT, MESSAGE_PATTERN, re.compile(r"【.*?】")),
+            [("こんにちは", None), ("おはよう", None), ("さようなら", None), ("", None)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
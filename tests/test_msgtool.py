@@ -36,16 +36,17 @@ class TestMsgToolExecutor(unittest.TestCase):
         self.assertIn("artemis - AST文件", engines)
         self.assertIn("bgi/ethornell - 通用脚本", engines)
     
-    def test_escape_path(self):
-        """测试路径转义"""
-        # 不含空格的路径
-        normal_path = "C:\\test\\folder"
-        self.assertEqual(self.executor._escape_path(normal_path), normal_path)
-        
-        # 含空格的路径
-        space_path = "C:\\test folder\\subfolder"
-        expected = '"C:\\test folder\\subfolder"'
-        self.assertEqual(self.executor._escape_path(space_path), expected)
+    def test_build_commands_pass_paths_verbatim(self):
+        """测试命令构建为参数列表，含空格与特殊字符的路径原样作为单个参数"""
+        script_folder = "C:\\test folder\\a&b"
+        json_folder = "C:\\json \"x\""
+        
+        command = self.executor._build_export_command(script_folder, json_folder)
+        self.assertEqual(command[0], os.path.abspath(self.executor.tool_path))
+        self.assertEqual(command[-2:], [script_folder, json_folder])
+        
+        command = self.executor._build_import_command(script_folder, json_folder, "out dir")
+        self.assertEqual(command[-3:], [script_folder, json_folder, "out dir"])
     
     def test_get_script_type_param(self):
         """测试引擎类型参数提取"""
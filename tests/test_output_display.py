@@ -0,0 +1,120 @@
+"""
+测试输出显示组件的批量处理
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+from unittest.mock import Mock, patch
+
+from src.gui.widgets.output_display import OutputDisplay, RealTimeOutputDisplay
+
+
+class TestOutputDisplayBatching(unittest.TestCase):
+    """输出批量处理测试"""
+    
+    def create_display(self, **kwargs):
+        """创建不依赖真实窗口的输出组件"""
+        with patch.object(OutputDisplay, '_create_widgets'), \
+                patch.object(OutputDisplay, '_start_output_monitoring'):
+            display = OutputDisplay(Mock(), **kwargs)
+        display.text_widget = Mock()
+        display.auto_scroll_var = Mock()
+        display.auto_scroll_var.get.return_value = True
+        display.progress_var = Mock()
+        display.progress_label = Mock()
+        display._is_monitoring = True
+        return display
+    
+    def test_coalesces_tag_runs_into_one_insert(self):
+        """测试同标签的连续文本合并为一次插入、一次滚动"""
+        display = self.create_display()
+        display.append_line("a")
+        display.append_line("b")
+        display.add_error_text("c")
+        display.add_error_text("d")
+        display.append_line("e")
+        
+        display._process_output_queue()
+        
+        display.text_widget.insert.assert_called_once_with(
+            "end", "a\nb\n", (), "c\nd\n", "error", "e\n", ()
+        )
+        display.text_widget.see.assert_called_once_with("end")
+        display.parent.after.assert_called_once_with(100, display._process_output_queue)
+    
+    def test_budget_limits_items_per_tick(self):
+        """测试每轮处理条数受预算限制，剩余部分尽快在下一轮处理"""
+        display = self.create_display(max_items_per_tick=3)
+        for i in range(5):
+            display.append_line(str(i))
+        
+        display._process_output_queue()
+        display.text_widget.insert.assert_called_once_with("end", "0\n1\n2\n", ())
+        display.parent.after.assert_called_once_with(1, display._process_output_queue)
+        
+        display._process_output_queue()
+        display.text_widget.insert.assert_called_with("end", "3\n4\n", ())
+        display.parent.after.assert_called_with(100, display._process_output_queue)
+    
+    def test_clear_and_coalesced_progress(self):
+        """测试清空保持先后顺序，同一批中的进度更新只应用最后一个且不拆分文本"""
+        display = self.create_display()
+        display.append_line("dropped")
+        display.clear()
+        display.append_line("kept")
+        display.update_progress(50, "half")
+        display.append_line("after")
+        display.update_progress(75, "most")
+        
+        display._process_output_queue()
+        
+        display.text_widget.delete.assert_called_once()
+        inserted = [c.args for c in display.text_widget.insert.call_args_list]
+        self.assertEqual(inserted, [("end", "kept\nafter\n", ())])
+        display.progress_var.set.assert_called_once_with(75)
+        display.progress_label.config.assert_called_once_with(text="most")
+    
+    def test_capped_mode_trims_widget_and_logs_everything(self):
+        """测试限制行数时删除最早的行，完整输出写入日志并用于保存"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            log_path = os.path.join(temp_dir, "output.log")
+            display = self.create_display(max_lines=100, log_path=log_path)
+            display.text_widget.index.return_value = "130.0"
+            for i in range(3):
+                display.append_line(f"line {i}")
+            
+            display._process_output_queue()
+            
+            display.text_widget.delete.assert_called_once_with("1.0", "31.0")
+            with patch("tkinter.filedialog.asksaveasfilename",
+                       return_value=os.path.join(temp_dir, "saved.txt")):
+                display._save_log()
+            display.text_widget.get.assert_not_called()
+            with open(os.path.join(temp_dir, "saved.txt"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "line 0\nline 1\nline 2\n")
+            display.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_temporary_log_removed_on_close(self):
+        """测试未指定日志路径时使用临时文件并在关闭时删除"""
+        display = self.create_display(max_lines=10)
+        log_path = display.log_path
+        self.assertTrue(os.path.exists(log_path))
+        
+        display.close()
+        self.assertFalse(os.path.exists(log_path))
+    
+    def test_classify_line(self):
+        """测试日志级别识别"""
+        self.assertEqual(RealTimeOutputDisplay.classify_line("ERROR: bad"), "error")
+        self.assertEqual(RealTimeOutputDisplay.classify_line("处理完成，但有警告"), "warning")
+        self.assertEqual(RealTimeOutputDisplay.classify_line("Success"), "success")
+        self.assertIsNone(RealTimeOutputDisplay.classify_line("processing scene01.ks"))
+
+
+if __name__ == '__main__':
+    unittest.main()
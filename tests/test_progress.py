@@ -0,0 +1,130 @@
+"""
+测试进度报告工具
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest.mock import patch
+
+from src.utils.progress import ProgressEvent, ProgressReporter, ToolOutputProgressParser
+
+
+class TestProgressEvent(unittest.TestCase):
+    """进度事件测试"""
+    
+    def test_percent_prefers_bytes(self):
+        """测试优先按字节数计算进度"""
+        event = ProgressEvent(files_done=1, files_total=4, bytes_done=300, bytes_total=400, elapsed=3.0)
+        self.assertAlmostEqual(event.percent, 75.0)
+        self.assertAlmostEqual(event.throughput, 100.0)
+        self.assertAlmostEqual(event.eta, 1.0)
+    
+    def test_percent_by_files(self):
+        """测试没有字节总数时按文件数计算进度"""
+        event = ProgressEvent(files_done=1, files_total=4, bytes_done=0, bytes_total=0, elapsed=2.0)
+        self.assertAlmostEqual(event.percent, 25.0)
+        self.assertAlmostEqual(event.eta, 6.0)
+    
+    def test_eta_unknown_before_progress(self):
+        """测试尚无进度时无法估计剩余时间"""
+        event = ProgressEvent(files_done=0, files_total=4, bytes_done=0, bytes_total=100, elapsed=1.0)
+        self.assertIsNone(event.eta)
+        self.assertEqual(event.format(), "0/4 个文件 | 0.00 MB/s")
+    
+    def test_format(self):
+        """测试进度文本格式"""
+        event = ProgressEvent(
+            files_done=2, files_total=4, bytes_done=1024 * 1024, bytes_total=2 * 1024 * 1024, elapsed=1.0
+        )
+        self.assertEqual(event.format(), "2/4 个文件 | 1.00 MB/s | 剩余 00:01")
+
+
+class TestProgressReporter(unittest.TestCase):
+    """进度报告器测试"""
+    
+    def test_throttle_and_finish(self):
+        """测试事件按间隔节流且完成事件总会发送"""
+        events = []
+        reporter = ProgressReporter(events.append, files_total=100, bytes_total=1000, min_interval=10)
+        
+        with patch("src.utils.progress.time.time", return_value=reporter._start_time + 20):
+            for i in range(100):
+                reporter.advance(f"file{i}", 10)
+        
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].files_done, 1)
+        
+        reporter.finish()
+        self.assertEqual(len(events), 2)
+        self.assertTrue(events[-1].finished)
+        self.assertEqual(events[-1].files_done, 100)
+        self.assertEqual(events[-1].bytes_done, 1000)
+        self.assertEqual(events[-1].eta, 0.0)
+
+
+class TestToolOutputProgressParser(unittest.TestCase):
+    """工具输出进度解析测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "sub"))
+        for name, size in (("a.ks", 10), ("b.ks", 20), (os.path.join("sub", "c.ks"), 30)):
+            with open(os.path.join(self.temp_dir, name), "wb") as f:
+                f.write(b"x" * size)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_parse_file_names(self):
+        """测试识别输出中的文件名（含路径与.json后缀），每个文件只计一次"""
+        events = []
+        parser = ToolOutputProgressParser.create(self.temp_dir, events.append, min_interval=0)
+        self.assertEqual(parser.reporter.files_total, 3)
+        self.assertEqual(parser.reporter.bytes_total, 60)
+        
+        output = []
+        callback = parser.wrap(output.append)
+        callback("Extracting C:\\game\\scenario\\a.ks")
+        callback("a.ks done")
+        callback("Writing b.json")
+        callback("无关的输出行")
+        callback("sub/c.ks")
+        parser.finish()
+        
+        self.assertEqual(len(output), 5)
+        self.assertEqual([event.files_done for event in events], [1, 2, 3, 3])
+        self.assertEqual(events[-1].bytes_done, 60)
+        self.assertTrue(events[-1].finished)
+    
+    def test_duplicate_names_in_subfolders(self):
+        """测试不同子目录中的同名文件分别计数"""
+        os.makedirs(os.path.join(self.temp_dir, "other"))
+        for name, size in ((os.path.join("sub", "a.ks"), 40), (os.path.join("other", "a.ks"), 50)):
+            with open(os.path.join(self.temp_dir, name), "wb") as f:
+                f.write(b"x" * size)
+        
+        events = []
+        parser = ToolOutputProgressParser.create(self.temp_dir, events.append, min_interval=0)
+        self.assertEqual(parser.reporter.files_total, 5)
+        
+        # 带目录的输出只计对应的文件
+        parser.feed("Extracting C:\\game\\sub\\a.ks")
+        self.assertEqual((events[-1].files_done, events[-1].bytes_done), (1, 40))
+        parser.feed("Writing sub/a.json")
+        self.assertEqual(len(events), 1)
+        
+        # 只有文件名时剩余的同名文件一并计为完成
+        parser.feed("a.ks")
+        self.assertEqual((events[-1].files_done, events[-1].bytes_done), (3, 100))
+        parser.feed("b.ks")
+        parser.feed("c.ks")
+        parser.finish()
+        self.assertEqual((events[-1].files_done, events[-1].bytes_done), (5, 150))
+
+
+if __name__ == '__main__':
+    unittest.main()
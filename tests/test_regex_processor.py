@@ -0,0 +1,551 @@
+"""
+测试正则表达式处理器功能
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+
+from src.core.regex_processor import RegexProcessor
+from src.core.file_operations import ScriptFileIterator
+from src.models.translation_data import TranslationData, SpanIndex
+from src.models.manifest import ExtractionManifest, InjectionManifest
+
+
+MESSAGE_PATTERN = r"「(.*?)」"
+NAME_PATTERN = r"【(.*?)】"
+
+
+class TestRegexProcessor(unittest.TestCase):
+    """正则表达式处理器测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.script_folder = os.path.join(self.temp_dir, "script_jp")
+        self.json_folder = os.path.join(self.temp_dir, "json_jp")
+        os.makedirs(self.script_folder)
+        
+        # 创建测试脚本
+        for i in range(4):
+            script_path = os.path.join(self.script_folder, f"scene{i}.txt")
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write(f"【太郎】「こんにちは{i}」\n")
+                f.write(f"「おはよう{i}」\n")
+                f.write(f"【花子】「さようなら{i}」\n")
+        
+        self.processor = RegexProcessor()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _extract(self, json_folder: str, **kwargs):
+        return self.processor.extract_with_regex(
+            self.script_folder, json_folder, MESSAGE_PATTERN,
+            NAME_PATTERN, "utf-8", **kwargs
+        )
+    
+    def test_extract_sequential(self):
+        """测试逐个提取"""
+        result = self._extract(self.json_folder)
+        
+        self.assertTrue(result.success, result.message)
+        self.assertEqual(result.processed_files, 4)
+        self.assertEqual(result.total_matches, 12)
+        
+        data = TranslationData.load_from_file(
+            os.path.join(self.json_folder, "scene0.json")
+        )
+        self.assertEqual(data[0].message, "こんにちは0")
+        self.assertEqual(data[0].name, "太郎")
+        self.assertIsNone(data[1].name)
+        self.assertEqual(data[2].name, "花子")
+    
+    def test_extract_reports_progress(self):
+        """测试提取时发送按字节统计的结构化进度"""
+        events = []
+        result = self._extract(self.json_folder, progress_callback=events.append)
+        
+        self.assertTrue(result.success, result.message)
+        final = events[-1]
+        self.assertTrue(final.finished)
+        self.assertEqual(final.files_done, 4)
+        self.assertEqual(final.files_total, 4)
+        self.assertEqual(final.bytes_done, final.bytes_total)
+        self.assertGreater(final.bytes_total, 0)
+        self.assertEqual(final.percent, 100)
+    
+    def test_extract_parallel_matches_sequential(self):
+        """测试并行提取与逐个提取结果一致"""
+        parallel_folder = os.path.join(self.temp_dir, "json_jp_parallel")
+        lines = []
+        
+        sequential = self._extract(self.json_folder)
+        parallel = self._extract(
+            parallel_folder, output_callback=lines.append,
+            parallel=True, max_workers=2
+        )
+        
+        self.assertTrue(parallel.success, parallel.message)
+        self.assertEqual(parallel.processed_files, sequential.processed_files)
+        self.assertEqual(parallel.total_matches, sequential.total_matches)
+        self.assertEqual(len(lines), 4)
+        
+        for filename in os.listdir(self.json_folder):
+            if not filename.endswith(".json"):
+                continue
+            expected = TranslationData.load_from_file(
+                os.path.join(self.json_folder, filename)
+            ).to_json_list()
+            actual = TranslationData.load_from_file(
+                os.path.join(parallel_folder, filename)
+            ).to_json_list()
+            self.assertEqual(actual, expected)
+    
+    def test_extract_incremental_skips_unchanged(self):
+        """测试增量提取跳过内容与参数均未变化的脚本"""
+        first = self._extract(self.json_folder, incremental=True)
+        self.assertTrue(first.success, first.message)
+        
+        lines = []
+        second = self._extract(self.json_folder, output_callback=lines.append, incremental=True)
+        self.assertEqual(second.processed_files, 4)
+        self.assertEqual(second.total_matches, 12)
+        self.assertEqual(lines, ["跳过 4 个未修改的文件"])
+        
+        # 修改一个脚本并删除另一个JSON，只重新提取这两个文件
+        with open(os.path.join(self.script_folder, "scene1.txt"), 'a', encoding='utf-8') as f:
+            f.write("「追加」\n")
+        os.remove(os.path.join(self.json_folder, "scene2.json"))
+        
+        lines = []
+        third = self._extract(self.json_folder, output_callback=lines.append, incremental=True)
+        self.assertEqual(third.total_matches, 13)
+        self.assertEqual(
+            sorted(lines[1:]), ["处理文件: scene1.txt", "处理文件: scene2.txt"]
+        )
+        self.assertEqual(len(TranslationData.load_from_file(
+            os.path.join(self.json_folder, "scene1.json")
+        )), 4)
+        
+        # 正则变化时全部重新提取
+        lines = []
+        fourth = self.processor.extract_with_regex(
+            self.script_folder, self.json_folder, MESSAGE_PATTERN, None,
+            "utf-8", lines.append, incremental=True
+        )
+        self.assertEqual(fourth.total_matches, 13)
+        self.assertEqual(len(lines), 4)
+        self.assertIsNone(TranslationData.load_from_file(
+            os.path.join(self.json_folder, "scene0.json")
+        )[0].name)
+    
+    def test_extract_non_incremental_by_default(self):
+        """测试默认不写入清单；关闭增量时重新提取全部文件且不删除已有清单"""
+        manifest_path = os.path.join(self.json_folder, ExtractionManifest.FILENAME)
+        self._extract(self.json_folder)
+        self.assertEqual(os.listdir(self.json_folder), [
+            name for name in os.listdir(self.json_folder) if name.endswith(".json")
+        ])
+        
+        self._extract(self.json_folder, incremental=True)
+        self.assertTrue(os.path.exists(manifest_path))
+        
+        lines = []
+        result = self._extract(self.json_folder, output_callback=lines.append)
+        self.assertEqual(result.processed_files, 4)
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(os.path.exists(manifest_path))
+    
+    def _prepare_translation(self, **extract_kwargs) -> str:
+        """提取日文JSON并生成对应的译文JSON"""
+        self._extract(self.json_folder, **extract_kwargs)
+        json_cn_folder = os.path.join(self.temp_dir, "json_cn")
+        os.makedirs(json_cn_folder)
+        
+        for filename in os.listdir(self.json_folder):
+            if not filename.endswith(".json"):
+                continue
+            data = TranslationData.load_from_file(
+                os.path.join(self.json_folder, filename)
+            )
+            translated = TranslationData()
+            for entry in data:
+                name = "名:" + entry.name if entry.name else None
+                translated.add_entry("译:" + entry.message, name)
+            translated.save_to_file(os.path.join(json_cn_folder, filename))
+        
+        return json_cn_folder
+    
+    @staticmethod
+    def _output_files(folder: str):
+        """输出文件夹中的脚本文件（不含注入清单）"""
+        return [name for name in os.listdir(folder) if name != InjectionManifest.FILENAME]
+    
+    def _inject(self, json_cn_folder: str, output_folder: str, **kwargs):
+        return self.processor.inject_with_regex(
+            self.script_folder, self.json_folder, json_cn_folder, output_folder,
+            MESSAGE_PATTERN, NAME_PATTERN, "utf-8", "utf-8", **kwargs
+        )
+    
+    def test_inject_sequential(self):
+        """测试逐个注入"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        result = self._inject(json_cn_folder, output_folder)
+        
+        self.assertTrue(result.success, result.message)
+        self.assertEqual(result.processed_files, 4)
+        self.assertEqual(result.failed_files, 0)
+        # 默认不在输出文件夹中写入注入清单
+        self.assertFalse(os.path.exists(os.path.join(output_folder, InjectionManifest.FILENAME)))
+        
+        with open(os.path.join(output_folder, "scene1.txt"), encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn("【名:太郎】「译:こんにちは1」", content)
+        self.assertIn("「译:おはよう1」", content)
+    
+    def _read_outputs(self, folder: str):
+        """读取输出文件夹中的全部脚本"""
+        outputs = {}
+        for filename in self._output_files(folder):
+            with open(os.path.join(folder, filename), encoding='utf-8') as f:
+                outputs[filename] = f.read()
+        return outputs
+    
+    def test_inject_incremental_skips_unchanged(self):
+        """测试增量注入只重新生成输入变化的文件，并仅在指定时删除源脚本已不存在的输出"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        first = self._inject(json_cn_folder, output_folder, incremental=True)
+        
+        lines = []
+        second = self._inject(json_cn_folder, output_folder, output_callback=lines.append, incremental=True)
+        self.assertEqual(lines, ["跳过 4 个输入未变化的文件"])
+        self.assertEqual(second.total_matches, first.total_matches)
+        self.assertEqual(second.processed_files, 4)
+        
+        # 修改一个文件的译文并删除一个脚本
+        translated = TranslationData()
+        translated.add_entry("改:こんにちは3", "名:太郎")
+        translated.add_entry("改:おはよう3")
+        translated.add_entry("改:さようなら3", "名:花子")
+        translated.save_to_file(os.path.join(json_cn_folder, "scene3.json"))
+        os.remove(os.path.join(self.script_folder, "scene1.txt"))
+        
+        lines = []
+        third = self._inject(json_cn_folder, output_folder, output_callback=lines.append, incremental=True)
+        self.assertEqual(third.processed_files, 3)
+        self.assertIn("处理文件: scene3.txt", lines)
+        self.assertNotIn("处理文件: scene0.txt", lines)
+        self.assertTrue(os.path.exists(os.path.join(output_folder, "scene1.txt")))
+        
+        lines = []
+        self._inject(
+            json_cn_folder, output_folder, output_callback=lines.append,
+            incremental=True, remove_stale_outputs=True
+        )
+        self.assertIn("删除 1 个源脚本已不存在的输出文件", lines)
+        self.assertFalse(os.path.exists(os.path.join(output_folder, "scene1.txt")))
+        
+        full_folder = os.path.join(self.temp_dir, "script_cn_full")
+        self._inject(json_cn_folder, full_folder)
+        self.assertFalse(os.path.exists(os.path.join(full_folder, InjectionManifest.FILENAME)))
+        self.assertEqual(self._read_outputs(output_folder), self._read_outputs(full_folder))
+    
+    def test_inject_incremental_tracks_shared_names(self):
+        """测试共享翻译映射时，之前文件的人名译文变化会使后续文件重新生成"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        self._inject(json_cn_folder, output_folder, incremental=True)
+        
+        # 人名映射先加入者优先，第一个文件的人名译文决定后续文件的人名
+        filenames = [filename for filename, _ in ScriptFileIterator(self.script_folder)]
+        index = filenames[0][len("scene")]
+        translated = TranslationData()
+        translated.add_entry(f"译:こんにちは{index}", "新名:太郎")
+        translated.add_entry(f"译:おはよう{index}")
+        translated.add_entry(f"译:さようなら{index}", "名:花子")
+        translated.save_to_file(os.path.join(json_cn_folder, f"scene{index}.json"))
+        
+        lines = []
+        self._inject(json_cn_folder, output_folder, output_callback=lines.append, incremental=True)
+        self.assertEqual(len([line for line in lines if line.startswith("处理文件")]), 4)
+        
+        full_folder = os.path.join(self.temp_dir, "script_cn_full")
+        self._inject(json_cn_folder, full_folder)
+        outputs = self._read_outputs(output_folder)
+        self.assertEqual(outputs, self._read_outputs(full_folder))
+        self.assertIn("新名:太郎", outputs[filenames[-1]])
+    
+    def test_inject_parallel_incremental(self):
+        """测试并行增量注入跳过未变化的文件"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        first = self._inject(json_cn_folder, output_folder, parallel=True, max_workers=2, incremental=True)
+        
+        lines = []
+        second = self._inject(
+            json_cn_folder, output_folder, output_callback=lines.append,
+            parallel=True, max_workers=2, incremental=True
+        )
+        self.assertEqual(lines, ["跳过 4 个输入未变化的文件"])
+        self.assertEqual(second.total_matches, first.total_matches)
+    
+    def test_inject_stats(self):
+        """测试注入统计在单次替换中完成"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        # 追加一条没有译文的消息，并让一条译文保持原文
+        with open(os.path.join(self.script_folder, "scene0.txt"), 'a', encoding='utf-8') as f:
+            f.write("「新しい台詞」\n")
+        cn_path = os.path.join(json_cn_folder, "scene0.json")
+        data = TranslationData.load_from_file(cn_path)
+        data[1].message = "おはよう0"
+        data.save_to_file(cn_path)
+        
+        result = self._inject(json_cn_folder, output_folder)
+        
+        self.assertTrue(result.success, result.message)
+        stats = {s.filename: s for s in result.file_stats}
+        self.assertEqual(stats["scene0.txt"].hits, 2)
+        self.assertEqual(stats["scene0.txt"].untranslated, 1)
+        self.assertEqual(stats["scene0.txt"].misses, 1)
+        self.assertEqual(stats["scene1.txt"].hits, 3)
+        self.assertEqual(result.total_matches, 11)
+        self.assertEqual(result.total_misses, 1)
+        self.assertEqual(result.total_untranslated, 1)
+    
+    def test_inject_parallel_matches_sequential(self):
+        """测试并行注入与逐个注入结果一致"""
+        json_cn_folder = self._prepare_translation()
+        sequential_folder = os.path.join(self.temp_dir, "script_cn")
+        parallel_folder = os.path.join(self.temp_dir, "script_cn_parallel")
+        
+        sequential = self._inject(json_cn_folder, sequential_folder)
+        parallel = self._inject(
+            json_cn_folder, parallel_folder, parallel=True, max_workers=2
+        )
+        
+        self.assertTrue(parallel.success, parallel.message)
+        self.assertEqual(parallel.processed_files, sequential.processed_files)
+        self.assertEqual(parallel.total_matches, sequential.total_matches)
+        
+        for filename in self._output_files(sequential_folder):
+            with open(os.path.join(sequential_folder, filename), encoding='utf-8') as f:
+                expected = f.read()
+            with open(os.path.join(parallel_folder, filename), encoding='utf-8') as f:
+                actual = f.read()
+            self.assertEqual(actual, expected)
+    
+    
+    def test_inject_with_spans_matches_regex(self):
+        """测试按位置索引注入与正则注入结果一致"""
+        json_cn_folder = self._prepare_translation(emit_spans=True)
+        self.assertTrue(os.path.exists(os.path.join(self.json_folder, "scene0.spans")))
+        regex_folder = os.path.join(self.temp_dir, "script_cn")
+        spans_folder = os.path.join(self.temp_dir, "script_cn_spans")
+        
+        regex_result = self._inject(json_cn_folder, regex_folder)
+        spans_result = self._inject(json_cn_folder, spans_folder, use_spans=True)
+        
+        self.assertTrue(spans_result.success, spans_result.message)
+        self.assertEqual(spans_result.total_matches, regex_result.total_matches)
+        for filename in self._output_files(regex_folder):
+            with open(os.path.join(regex_folder, filename), encoding='utf-8') as f:
+                expected = f.read()
+            with open(os.path.join(spans_folder, filename), encoding='utf-8') as f:
+                actual = f.read()
+            self.assertEqual(actual, expected)
+    
+    def test_inject_with_spans_replaces_exact_occurrence(self):
+        """测试按位置注入只替换捕获组所在位置"""
+        script_path = os.path.join(self.script_folder, "scene0.txt")
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write("「あ」あ\n")
+        pattern = r"「(あ)」あ"
+        json_cn_folder = os.path.join(self.temp_dir, "json_cn")
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        os.makedirs(json_cn_folder)
+        
+        self.processor.extract_with_regex(
+            self.script_folder, self.json_folder, pattern, None, "utf-8",
+            emit_spans=True
+        )
+        translated = TranslationData()
+        translated.add_entry("啊")
+        translated.save_to_file(os.path.join(json_cn_folder, "scene0.json"))
+        
+        self.processor.inject_with_regex(
+            self.script_folder, self.json_folder, json_cn_folder, output_folder,
+            pattern, None, "utf-8", "utf-8", use_spans=True
+        )
+        
+        with open(os.path.join(output_folder, "scene0.txt"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "「啊」あ\n")
+    
+    def test_inject_with_stale_spans_falls_back(self):
+        """测试脚本变化后索引失效时回退到正则注入"""
+        json_cn_folder = self._prepare_translation(emit_spans=True)
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        with open(os.path.join(self.script_folder, "scene0.txt"), 'a', encoding='utf-8') as f:
+            f.write("# comment\n")
+        span_index = SpanIndex.load_from_file(os.path.join(self.json_folder, "scene0.spans"))
+        with open(os.path.join(self.script_folder, "scene0.txt"), encoding='utf-8') as f:
+            self.assertFalse(span_index.matches_content(f.read()))
+        
+        result = self._inject(json_cn_folder, output_folder, use_spans=True)
+        
+        self.assertTrue(result.success, result.message)
+        with open(os.path.join(output_folder, "scene0.txt"), encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn("「译:おはよう0」", content)
+        self.assertTrue(content.endswith("# comment\n"))
+    
+    
+    def test_inject_positional(self):
+        """测试按顺序注入，同一原文在不同位置可使用不同译文"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        # 让同一文件中出现两条相同原文，分别对应不同译文
+        script_path = os.path.join(self.script_folder, "scene0.txt")
+        with open(script_path, 'a', encoding='utf-8') as f:
+            f.write("「こんにちは0」\n")
+        for folder, message in ((self.json_folder, "こんにちは0"), (json_cn_folder, "再见")):
+            path = os.path.join(folder, "scene0.json")
+            data = TranslationData.load_from_file(path)
+            data.add_entry(message)
+            data.save_to_file(path)
+        
+        result = self._inject(json_cn_folder, output_folder, positional=True)
+        
+        self.assertTrue(result.success, result.message)
+        self.assertEqual(result.total_matches, 13)
+        self.assertEqual(self.processor.get_translation_stats()["message_count"], 0)
+        with open(script_path.replace("script_jp", "script_cn"), encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn("【名:太郎】「译:こんにちは0」", content)
+        self.assertTrue(content.endswith("「再见」\n"))
+    
+    def test_inject_positional_falls_back_on_mismatch(self):
+        """测试顺序不一致时回退到本文件的字典查找"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        # 在脚本开头插入一条已存在的原文，使后续位置全部错开
+        script_path = os.path.join(self.script_folder, "scene0.txt")
+        with open(script_path, encoding='utf-8') as f:
+            content = f.read()
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write("「おはよう0」\n" + content)
+        
+        result = self._inject(json_cn_folder, output_folder, positional=True)
+        
+        self.assertTrue(result.success, result.message)
+        stats = {s.filename: s for s in result.file_stats}
+        self.assertEqual(stats["scene0.txt"].hits, 4)
+        with open(os.path.join(output_folder, "scene0.txt"), encoding='utf-8') as f:
+            self.assertEqual(f.read().count("译:"), 4)
+    
+    def test_inject_positional_rejects_length_mismatch(self):
+        """测试译文条数与原文不一致时该文件注入失败，不按错位的译文写入"""
+        json_cn_folder = self._prepare_translation()
+        output_folder = os.path.join(self.temp_dir, "script_cn")
+        
+        cn_path = os.path.join(json_cn_folder, "scene0.json")
+        data = TranslationData.load_from_file(cn_path)
+        data.add_entry("多出的译文")
+        data.save_to_file(cn_path)
+        
+        # 不指定人名表达式，确保不会经由人名字典间接检查条数
+        messages = []
+        result = self.processor.inject_with_regex(
+            self.script_folder, self.json_folder, json_cn_folder, output_folder,
+            MESSAGE_PATTERN, None, "utf-8", "utf-8",
+            positional=True, output_callback=messages.append
+        )
+        
+        self.assertEqual(result.failed_files, 1)
+        self.assertTrue(any("日文和中文数据长度不匹配" in message for message in messages))
+        with open(os.path.join(self.script_folder, "scene0.txt"), encoding='utf-8') as f:
+            original = f.read()
+        with open(os.path.join(output_folder, "scene0.txt"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), original)
+    
+    
+    def test_inject_sjis_in_memory_matches_folder(self):
+        """测试内存中SJIS替换与生成_replaced文件夹的结果一致"""
+        json_cn_folder = self._prepare_translation()
+        chars = "".join(list(self.processor.sjis_handler.mapper.get_mapping_dict())[:3])
+        for filename in os.listdir(json_cn_folder):
+            path = os.path.join(json_cn_folder, filename)
+            data = TranslationData.load_from_file(path)
+            data[0].message += chars
+            data.save_to_file(path)
+        
+        folder_output = os.path.join(self.temp_dir, "script_cn")
+        memory_output = os.path.join(self.temp_dir, "script_cn_memory")
+        folder_result = self._inject(
+            json_cn_folder, folder_output, sjis_replacement=True, sjis_in_memory=False
+        )
+        shutil.rmtree(json_cn_folder + "_replaced")
+        memory_result = self._inject(
+            json_cn_folder, memory_output, sjis_replacement=True, parallel=True, max_workers=2
+        )
+        
+        self.assertTrue(memory_result.success, memory_result.message)
+        self.assertFalse(os.path.exists(json_cn_folder + "_replaced"))
+        self.assertEqual(memory_result.sjis_config, folder_result.sjis_config)
+        for filename in self._output_files(folder_output):
+            with open(os.path.join(folder_output, filename), encoding='utf-8') as f:
+                expected = f.read()
+            with open(os.path.join(memory_output, filename), encoding='utf-8') as f:
+                actual = f.read()
+            self.assertEqual(actual, expected)
+            self.assertNotIn(chars, actual)
+    
+    def test_inject_sjis_in_memory_config_order(self):
+        """测试各文件替换不同字符时，内存替换的配置字符串与替换文件夹完全一致"""
+        json_cn_folder = self._prepare_translation()
+        chars = list(self.processor.sjis_handler.mapper.get_mapping_dict())[:6]
+        for i, filename in enumerate(sorted(os.listdir(json_cn_folder), reverse=True)):
+            path = os.path.join(json_cn_folder, filename)
+            data = TranslationData.load_from_file(path)
+            data[0].message += chars[i]
+            data.save_to_file(path)
+        
+        # 没有对应脚本的译文、缺少日文JSON（直接复制原文件）的译文也计入替换结果
+        extra = TranslationData()
+        extra.add_entry("译:" + chars[4])
+        extra.save_to_file(os.path.join(json_cn_folder, "extra.json"))
+        copied_jp = os.path.join(self.json_folder, "scene1.json")
+        os.rename(copied_jp, copied_jp + ".bak")
+        path = os.path.join(json_cn_folder, "scene1.json")
+        data = TranslationData.load_from_file(path)
+        data[1].message += chars[5]
+        data.save_to_file(path)
+        
+        folder_result = self._inject(
+            json_cn_folder, os.path.join(self.temp_dir, "script_cn"),
+            sjis_replacement=True, sjis_in_memory=False
+        )
+        shutil.rmtree(json_cn_folder + "_replaced")
+        for parallel in (False, True):
+            memory_result = self._inject(
+                json_cn_folder, os.path.join(self.temp_dir, f"script_cn_memory{parallel}"),
+                sjis_replacement=True, parallel=parallel, max_workers=2
+            )
+            self.assertTrue(memory_result.success, memory_result.message)
+            self.assertEqual(memory_result.sjis_config, folder_result.sjis_config)
+        for char in chars:
+            self.assertIn(char, folder_result.sjis_config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+测试SJIS字符替换功能
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+
+from src.core.sjis_handler import SJISHandler, SJISCharacterMapper
+
+
+class TestSJISHandler(unittest.TestCase):
+    """SJIS字符替换测试"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.json_cn_folder = os.path.join(self.temp_dir, "json_cn")
+        os.makedirs(self.json_cn_folder)
+        self.handler = SJISHandler()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _write_json(self, filename: str, content: str):
+        with open(os.path.join(self.json_cn_folder, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_replace_text(self):
+        """测试文本替换与字符统计"""
+        char_dict = {"这": "這", "说": "説"}
+        output, hanzi, kanji, count = SJISHandler.replace_text("这是说这", char_dict)
+        
+        self.assertEqual(output, "這是説這")
+        self.assertEqual(hanzi, ["这", "说"])
+        self.assertEqual(kanji, ["這", "説"])
+        self.assertEqual(count, 3)
+    
+    def test_translation_table_matches_mapping(self):
+        """测试转换表与映射字典一致"""
+        mapper = self.handler.mapper
+        char_dict = mapper.get_mapping_dict()
+        table = mapper.get_translation_table()
+        
+        self.assertEqual(len(table), len(char_dict))
+        for orig_char, replace_char in char_dict.items():
+            self.assertEqual(orig_char.translate(table), replace_char)
+        
+        filtered = mapper.get_translation_table("这")
+        self.assertEqual(len(filtered), 1)
+    
+    def test_process_json_folder(self):
+        """测试处理JSON文件夹并合并字符列表"""
+        table = self.handler.mapper.get_mapping_dict()
+        chars = [c for c in table if c not in "\"{}[]:, \n"][:3]
+        self._write_json("a.json", f'[{{"message": "{chars[0]}{chars[1]}{chars[0]}"}}]')
+        self._write_json("b.json", f'[{{"message": "{chars[1]}{chars[2]}"}}]')
+        
+        result = self.handler.process_json_folder(self.json_cn_folder)
+        
+        self.assertEqual(sorted(result.hanzi_chars), sorted(chars))
+        self.assertEqual(len(result.hanzi_chars), 3)
+        self.assertEqual(result.kanji_chars, [table[c] for c in result.hanzi_chars])
+        self.assertEqual(result.replacement_count, 5)
+        with open(os.path.join(result.replaced_folder, "a.json"), encoding='utf-8') as f:
+            self.assertIn(table[chars[0]] + table[chars[1]], f.read())
+
+    
+    def _prepare_files(self) -> list:
+        table = self.handler.mapper.get_mapping_dict()
+        chars = [c for c in table if c not in "\"{}[]:, \n"][:4]
+        for i, char in enumerate(chars):
+            self._write_json(f"{i}.json", f'[{{"message": "{char}{chars[0]}"}}]')
+        return chars
+    
+    def test_process_json_folder_incremental(self):
+        """测试增量处理只重写变化的文件"""
+        chars = self._prepare_files()
+        
+        first = self.handler.process_json_folder(self.json_cn_folder, incremental=True)
+        self.assertEqual(first.processed_files, 4)
+        self.assertEqual(first.skipped_files, 0)
+        
+        second = self.handler.process_json_folder(self.json_cn_folder, incremental=True)
+        self.assertEqual(second.processed_files, 0)
+        self.assertEqual(second.skipped_files, 4)
+        self.assertEqual(second.hanzi_chars, first.hanzi_chars)
+        self.assertEqual(second.replacement_count, first.replacement_count)
+        
+        # 修改一个文件并删除另一个文件
+        self._write_json("1.json", f'[{{"message": "{chars[1]}"}}]')
+        os.remove(os.path.join(self.json_cn_folder, "3.json"))
+        
+        third = self.handler.process_json_folder(self.json_cn_folder, incremental=True)
+        self.assertEqual(third.processed_files, 1)
+        self.assertEqual(third.skipped_files, 2)
+        self.assertEqual(third.replacement_count, 5)
+        self.assertFalse(os.path.exists(os.path.join(third.replaced_folder, "3.json")))
+        
+        # 映射子集变化时全部重写
+        fourth = self.handler.process_json_folder(
+            self.json_cn_folder, chars[0], incremental=True
+        )
+        self.assertEqual(fourth.processed_files, 3)
+        self.assertEqual(fourth.hanzi_chars, [chars[0]])
+    
+    def test_process_json_folder_parallel(self):
+        """测试并行处理与逐个处理结果一致"""
+        self._prepare_files()
+        
+        sequential = self.handler.process_json_folder(self.json_cn_folder)
+        with open(os.path.join(sequential.replaced_folder, "2.json"), encoding='utf-8') as f:
+            expected = f.read()
+        
+        parallel = self.handler.process_json_folder(
+            self.json_cn_folder, parallel=True, max_workers=2
+        )
+        
+        self.assertEqual(parallel.hanzi_chars, sequential.hanzi_chars)
+        self.assertEqual(parallel.kanji_chars, sequential.kanji_chars)
+        self.assertEqual(parallel.replacement_count, sequential.replacement_count)
+        with open(os.path.join(parallel.replaced_folder, "2.json"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), expected)
+
+    
+    def test_mapper_cache(self):
+        """测试映射缓存的生成、使用和失效"""
+        mapping_file = os.path.join(self.temp_dir, "table.txt")
+        with open(mapping_file, 'w', encoding='utf-8') as f:
+            f.write("这\t這\n说\t説\n")
+        
+        mapper = SJISCharacterMapper(mapping_file)
+        self.assertTrue(os.path.exists(mapper.cache_file))
+        self.assertEqual(mapper.get_mapping_dict(), {"这": "這", "说": "説"})
+        
+        # 缓存有效时不再解析源文件
+        cached = SJISCharacterMapper(mapping_file)
+        self.assertEqual(cached.get_mapping_dict(), mapper.get_mapping_dict())
+        self.assertEqual(cached.get_translation_table(), mapper.get_translation_table())
+        
+        # 源文件变化后自动重建
+        with open(mapping_file, 'a', encoding='utf-8') as f:
+            f.write("个\t個\n")
+        self.assertFalse(mapper.is_current())
+        rebuilt = SJISCharacterMapper(mapping_file)
+        self.assertEqual(rebuilt.get_replacement_for_char("个"), "個")
+    
+    def test_shared_mapper(self):
+        """测试进程内共享映射器实例"""
+        self.assertIs(SJISHandler().mapper, self.handler.mapper)
+        self.assertIs(
+            SJISCharacterMapper.get_shared(self.handler.mapper.mapping_file),
+            self.handler.mapper
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()